@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app import db
+from app.runtime_settings import verify_api_key
+from app.services import webhooks_service
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Never limited or shed: docs and the probes operators need during an incident.
+EXEMPT_PATHS = ("/docs", "/redoc", "/openapi.json", "/metrics", "/system/")
+# Long-poll and streaming reads: limited like any read, but they sit idle for
+# most of their life, so they do not count towards SHED_MAX_IN_FLIGHT.
+LONG_LIVED_PATHS = ("/events",)
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# Least recently used buckets are dropped past this many.
+MAX_IN_MEMORY_BUCKETS = 10_000
+
+
+@dataclass(frozen=True)
+class BucketLimit:
+    rate_per_second: float
+    burst: int
+
+
+class InMemoryRateLimitStore:
+    """Token buckets for this process only, at most ``max_buckets`` of them."""
+
+    def __init__(self, max_buckets: int = MAX_IN_MEMORY_BUCKETS) -> None:
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self.max_buckets = max_buckets
+
+    async def take(self, key: str, limit: BucketLimit, now: float) -> float:
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(limit.burst), now))
+            tokens = min(float(limit.burst), tokens + (now - updated) * limit.rate_per_second)
+            if tokens >= 1:
+                wait = 0.0
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / limit.rate_per_second
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # One insert evicts at most one bucket, so a flood of new keys costs O(1) each.
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+# Same bucket arithmetic as InMemoryRateLimitStore, applied atomically in Redis.
+_REDIS_TAKE = """
+local limit_rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * limit_rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / limit_rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / limit_rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitStore:
+    """Token buckets shared by every worker through Redis.
+
+    Requires the optional ``redis`` package. If Redis is unreachable the
+    request is admitted rather than failing the API.
+    """
+
+    def __init__(self, url: str) -> None:
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the 'redis' package is not installed") from exc
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(_REDIS_TAKE)
+
+    async def take(self, key: str, limit: BucketLimit, now: float) -> float:
+        try:
+            wait = await self._script(keys=[f"ventra:ratelimit:{key}"], args=[limit.rate_per_second, limit.burst, now])
+        except Exception as exc:
+            logger.warning("rate limit store unavailable, admitting request: %s", exc)
+            return 0.0
+        return float(wait)
+
+
+def route_class(method: str) -> str:
+    return "write" if method in WRITE_METHODS else "read"
+
+
+def default_limits() -> dict[str, BucketLimit]:
+    return {
+        "write": BucketLimit(settings.rate_limit_write_per_second, settings.rate_limit_write_burst),
+        "read": BucketLimit(settings.rate_limit_read_per_second, settings.rate_limit_read_burst),
+    }
+
+
+def default_store():
+    if settings.rate_limit_redis_url:
+        return RedisRateLimitStore(settings.rate_limit_redis_url)
+    return InMemoryRateLimitStore()
+
+
+def pool_saturated_wait(max_wait_seconds: float) -> bool:
+    """True when the primary pool has no idle connection and checkouts have been queueing.
+
+    The recent wait average only moves on checkouts, so it is trusted only
+    while the pool is actually exhausted; otherwise a past spike would keep
+    shedding after the load is gone.
+    """
+    pool = db.get_engine().pool
+    stats = getattr(pool, "stats", None)
+    if stats is None or not hasattr(pool, "checkedin"):
+        return False
+    return pool.checkedin() == 0 and stats.wait_seconds_recent > max_wait_seconds
+
+
+def webhook_backlog() -> int:
+    return webhooks_service.pending_deliveries()
+
+
+def _client_identity(scope) -> str:
+    # Only a key that verifies gets its own bucket; anything else is limited
+    # by address, so sending a new random key per request gains nothing.
+    for name, value in scope.get("headers") or ():
+        if name == b"x-api-key":
+            if verify_api_key(value.decode("latin-1")):
+                return "key:" + hashlib.sha256(value.strip()).hexdigest()[:16]
+            break
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("ascii")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """Rate limits and sheds load before a request reaches a handler (and its DB session).
+
+    Each valid API key (or client address when no valid key is sent) gets
+    one token bucket per route class. Requests over the limit get 429. When too many
+    requests are in flight, the DB pool is exhausted and queueing, or the
+    webhook backlog is too deep, new requests get 503 instead of joining the
+    queue, so latency for admitted requests stays bounded.
+    """
+
+    def __init__(
+        self,
+        app,
+        *,
+        enabled: bool | None = None,
+        store=None,
+        limits: dict[str, BucketLimit] | None = None,
+        max_in_flight: int | None = None,
+        max_pool_wait_seconds: float | None = None,
+        max_pending_webhooks: int | None = None,
+        clock=time.time,
+    ) -> None:
+        self.app = app
+        self.enabled = settings.rate_limit_enabled if enabled is None else enabled
+        self.store = store or (default_store() if self.enabled else None)
+        self.limits = limits or default_limits()
+        self.max_in_flight = settings.shed_max_in_flight if max_in_flight is None else max_in_flight
+        self.max_pool_wait_seconds = (
+            settings.shed_max_pool_wait_seconds if max_pool_wait_seconds is None else max_pool_wait_seconds
+        )
+        self.max_pending_webhooks = (
+            settings.shed_max_pending_webhooks if max_pending_webhooks is None else max_pending_webhooks
+        )
+        self.clock = clock
+        self.in_flight = 0
+
+    def overload_reason(self) -> str | None:
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return "too_many_requests_in_flight"
+        if self.max_pool_wait_seconds and pool_saturated_wait(self.max_pool_wait_seconds):
+            return "database_pool_saturated"
+        if self.max_pending_webhooks and webhook_backlog() >= self.max_pending_webhooks:
+            return "webhook_backlog_full"
+        return None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if not self.enabled or scope["type"] != "http" or scope["path"].startswith(EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        klass = route_class(scope["method"])
+        limit = self.limits.get(klass)
+        if limit is not None:
+            wait = await self.store.take(f"{_client_identity(scope)}:{klass}", limit, self.clock())
+            if wait > 0:
+                await _reject(send, 429, "rate_limited", wait)
+                return
+
+        reason = self.overload_reason()
+        if reason:
+            await _reject(send, 503, reason, settings.shed_retry_after_seconds)
+            return
+
+        if scope["path"].startswith(LONG_LIVED_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import typing
+
+from fastapi import APIRouter, Depends
+from fastapi.params import Depends as DependsParam
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import async_db_session, async_read_db_session, db_session, read_db_session
+
+# Sync session dependencies and the async dependency that replaces them.
+SESSION_DEPENDENCIES = {
+    db_session: async_db_session,
+    read_db_session: async_read_db_session,
+}
+
+
+def asyncify_router(router: APIRouter) -> APIRouter:
+    """Clone ``router`` with every DB-backed endpoint served from an ``AsyncSession``.
+
+    The endpoint bodies, services and repos stay synchronous: they run on the
+    async session's connection through ``AsyncSession.run_sync``, so database
+    waits (including row locks) suspend the coroutine instead of holding a
+    threadpool thread for the whole request.
+
+    ``run_sync`` executes the body on the event-loop thread, so it must not
+    block on anything but the database: webhooks go out as background tasks
+    (run in the threadpool), the VentraSim endpoint is read from memory and
+    SQLite busy retries back off with ``asyncio.sleep``.
+    """
+    async_router = APIRouter()
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+        async_router.add_api_route(
+            route.path,
+            _asyncify_endpoint(route.endpoint),
+            methods=list(route.methods),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            responses=route.responses,
+            name=route.name,
+            operation_id=route.operation_id,
+            include_in_schema=route.include_in_schema,
+        )
+    return async_router
+
+
+def _session_param(signature: inspect.Signature) -> tuple[str, typing.Callable] | tuple[None, None]:
+    for param in signature.parameters.values():
+        default = param.default
+        if isinstance(default, DependsParam) and default.dependency in SESSION_DEPENDENCIES:
+            return param.name, SESSION_DEPENDENCIES[default.dependency]
+    return None, None
+
+
+def _asyncify_endpoint(endpoint):
+    signature = inspect.signature(endpoint)
+    session_name, async_dependency = _session_param(signature)
+    if session_name is None:
+        return endpoint
+
+    hints = typing.get_type_hints(endpoint, include_extras=True)
+    parameters = []
+    for param in signature.parameters.values():
+        if param.name == session_name:
+            param = param.replace(annotation=AsyncSession, default=Depends(async_dependency))
+        elif param.name in hints:
+            param = param.replace(annotation=hints[param.name])
+        parameters.append(param)
+
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        async_db: AsyncSession = kwargs.pop(session_name)
+        return await async_db.run_sync(lambda db: endpoint(**kwargs, **{session_name: db}))
+
+    wrapper.__signature__ = signature.replace(parameters=parameters, return_annotation=inspect.Signature.empty)
+    del wrapper.__wrapped__
+    return wrapper
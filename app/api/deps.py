@@ -6,14 +6,15 @@ import json
 from fastapi import Header, HTTPException
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app import db_replica
+from app.db import get_async_db, get_async_read_db, get_async_replica_db, get_db, get_read_db, get_replica_db
 from app.domain.errors import IdempotencyConflictError
 from app.repos import idempotency_repo
-from app.runtime_settings import get_api_key
+from app.runtime_settings import verify_api_key
 
 
 def require_api_key(x_api_key: str | None = Header(default=None)) -> None:
-    if not x_api_key or x_api_key != get_api_key():
+    if not verify_api_key(x_api_key):
         raise HTTPException(status_code=401, detail="Unauthorized")
 
 
@@ -21,6 +22,28 @@ def db_session() -> Session:
     yield from get_db()
 
 
+async def async_db_session():
+    async for db in get_async_db():
+        yield db
+
+
+def read_db_session() -> Session:
+    """Session for read-only endpoints: the replica when healthy, else the primary."""
+    if db_replica.replica_available():
+        yield from get_replica_db()
+    else:
+        yield from get_read_db()
+
+
+async def async_read_db_session():
+    if db_replica.replica_available():
+        async for db in get_async_replica_db():
+            yield db
+    else:
+        async for db in get_async_read_db():
+            yield db
+
+
 def request_hash(payload: dict | None) -> str:
     canonical = json.dumps(payload or {}, sort_keys=True, separators=(",", ":"))
     return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from fastapi.responses import Response
+
+from app.serialization import dumps
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded straight to bytes (orjson when installed)."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -1,58 +1,28 @@
 from __future__ import annotations
 
-from datetime import datetime
 from uuid import UUID
 
 from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.api.deps import check_idempotency, db_session, require_api_key, store_idempotency
+from app.api.deps import check_idempotency, db_session, read_db_session, require_api_key, store_idempotency
+from app.api.responses import FastJSONResponse
+from app.api.schemas import ChargeResponse, OrderResponse
 from app.domain.errors import DomainError
-from app.domain.enums import ChargeStatus, OrderStatus
+from app.serialization import charge_to_dict, order_to_dict
 from app.services import charges_service
 from app.settings import settings
 
 router = APIRouter(tags=["charges"], dependencies=[Depends(require_api_key)])
 
 
-class ChargeResponse(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
-
-    id: UUID
-    order_id: UUID
-    status: ChargeStatus
-    expires_at: datetime
-    pix_emv: str
-    txid: str
-
-
-class OrderResponse(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
-
-    id: UUID
-    status: OrderStatus
-    amount_cents: int
-    currency: str
-    created_at: datetime
-    updated_at: datetime
-
-
 class PaidResponse(BaseModel):
     order: OrderResponse
     charge: ChargeResponse
 
 
-def _serialize_charge(charge) -> dict:
-    return ChargeResponse.model_validate(charge).model_dump(mode="json")
-
-
-def _serialize_order(order) -> dict:
-    return OrderResponse.model_validate(order).model_dump(mode="json")
-
-
-@router.post("/orders/{order_id}/charges/pix", status_code=201)
+@router.post("/orders/{order_id}/charges/pix", status_code=201, response_model=ChargeResponse)
 def create_pix_charge(
     order_id: UUID,
     request: Request,
@@ -76,10 +46,10 @@ def create_pix_charge(
                 except DomainError as exc:
                     raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
                 if existing:
-                    return JSONResponse(content=existing.response_json, status_code=existing.status_code)
+                    return FastJSONResponse(content=existing.response_json, status_code=existing.status_code)
 
             charge = charges_service.create_pix_charge(db, order_id=order_id, background_tasks=background_tasks)
-            response_json = _serialize_charge(charge)
+            response_json = charge_to_dict(charge)
             if idempotency_key and request_hash_value:
                 store_idempotency(
                     db,
@@ -92,7 +62,7 @@ def create_pix_charge(
     except DomainError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
 
-    return JSONResponse(content=response_json, status_code=201)
+    return FastJSONResponse(content=response_json, status_code=201)
 
 
 @router.post("/charges/{charge_id}/simulate-paid", response_model=PaidResponse)
@@ -122,7 +92,7 @@ def simulate_paid(
                 except DomainError as exc:
                     raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
                 if existing:
-                    return JSONResponse(content=existing.response_json, status_code=existing.status_code)
+                    return FastJSONResponse(content=existing.response_json, status_code=existing.status_code)
 
             order, charge, expired = charges_service.simulate_paid(
                 db, charge_id=charge_id, background_tasks=background_tasks
@@ -138,11 +108,11 @@ def simulate_paid(
                         response_json=response_json,
                         status_code=410,
                     )
-                return JSONResponse(content=response_json, status_code=410)
+                return FastJSONResponse(content=response_json, status_code=410)
 
             response_json = {
-                "order": _serialize_order(order),
-                "charge": _serialize_charge(charge),
+                "order": order_to_dict(order),
+                "charge": charge_to_dict(charge),
             }
             if idempotency_key and request_hash_value:
                 store_idempotency(
@@ -156,7 +126,16 @@ def simulate_paid(
     except DomainError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
 
-    return response_json
+    return FastJSONResponse(content=response_json)
+
+
+@router.get("/charges/by-txid/{txid}", response_model=ChargeResponse)
+def get_charge_by_txid(txid: str, db: Session = Depends(read_db_session)):
+    try:
+        charge = charges_service.get_charge_by_txid(db, txid)
+    except DomainError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    return FastJSONResponse(content=charge_to_dict(charge))
 
 
 @router.post("/charges/{charge_id}/cancel", response_model=ChargeResponse)
@@ -182,10 +161,10 @@ def cancel_charge(
                 except DomainError as exc:
                     raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
                 if existing:
-                    return JSONResponse(content=existing.response_json, status_code=existing.status_code)
+                    return FastJSONResponse(content=existing.response_json, status_code=existing.status_code)
 
             charge = charges_service.cancel_charge(db, charge_id=charge_id)
-            response_json = _serialize_charge(charge)
+            response_json = charge_to_dict(charge)
             if idempotency_key and request_hash_value:
                 store_idempotency(
                     db,
@@ -198,4 +177,4 @@ def cancel_charge(
     except DomainError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
 
-    return response_json
+    return FastJSONResponse(content=response_json)
@@ -1,34 +1,114 @@
 from __future__ import annotations
 
-from datetime import datetime
 from uuid import UUID
 
 from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.api.deps import check_idempotency, db_session, require_api_key, store_idempotency
+from app.api.responses import FastJSONResponse
+from app.api.schemas import OrderResponse
 from app.domain.errors import DomainError
 from app.domain.enums import OrderStatus
+from app.serialization import order_to_dict
 from app.services import escrow_service
 
 router = APIRouter(prefix="/orders", tags=["escrow"], dependencies=[Depends(require_api_key)])
 
+MAX_SETTLEMENT_BATCH = 5000
 
-class OrderResponse(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
 
-    id: UUID
-    status: OrderStatus
-    amount_cents: int
-    currency: str
-    created_at: datetime
-    updated_at: datetime
+class SettlementRequest(BaseModel):
+    order_ids: list[UUID] = Field(min_length=1, max_length=MAX_SETTLEMENT_BATCH)
 
 
-def _serialize_order(order) -> dict:
-    return OrderResponse.model_validate(order).model_dump(mode="json")
+class SettlementResultResponse(BaseModel):
+    order_id: UUID
+    ok: bool
+    status: OrderStatus | None = None
+    error: str | None = None
+
+
+class SettlementResponse(BaseModel):
+    settled: int
+    failed: int
+    results: list[SettlementResultResponse]
+
+
+def _serialize_settlement(results) -> dict:
+    settled = sum(1 for result in results if result.ok)
+    return {
+        "settled": settled,
+        "failed": len(results) - settled,
+        "results": [
+            {
+                "order_id": str(result.order_id),
+                "ok": result.ok,
+                "status": result.status,
+                "error": result.error,
+            }
+            for result in results
+        ],
+    }
+
+
+def _settle(settle_fn, body: SettlementRequest, request: Request, background_tasks, db: Session, idempotency_key):
+    endpoint = request.url.path
+    try:
+        with db.begin():
+            existing = None
+            request_hash_value = None
+            if idempotency_key:
+                try:
+                    existing, request_hash_value = check_idempotency(
+                        db,
+                        key=idempotency_key,
+                        endpoint=endpoint,
+                        payload=body.model_dump(mode="json"),
+                    )
+                except DomainError as exc:
+                    raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+                if existing:
+                    return FastJSONResponse(content=existing.response_json, status_code=existing.status_code)
+
+            results = settle_fn(db, order_ids=body.order_ids, background_tasks=background_tasks)
+            response_json = _serialize_settlement(results)
+            if idempotency_key and request_hash_value:
+                store_idempotency(
+                    db,
+                    key=idempotency_key,
+                    endpoint=endpoint,
+                    request_hash_value=request_hash_value,
+                    response_json=response_json,
+                    status_code=200,
+                )
+    except DomainError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+
+    return FastJSONResponse(content=response_json)
+
+
+@router.post("/release", response_model=SettlementResponse)
+def release_orders(
+    body: SettlementRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(db_session),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+):
+    return _settle(escrow_service.release_orders, body, request, background_tasks, db, idempotency_key)
+
+
+@router.post("/refund", response_model=SettlementResponse)
+def refund_orders(
+    body: SettlementRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(db_session),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+):
+    return _settle(escrow_service.refund_orders, body, request, background_tasks, db, idempotency_key)
 
 
 @router.post("/{order_id}/release", response_model=OrderResponse)
@@ -55,10 +135,10 @@ def release_order(
                 except DomainError as exc:
                     raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
                 if existing:
-                    return JSONResponse(content=existing.response_json, status_code=existing.status_code)
+                    return FastJSONResponse(content=existing.response_json, status_code=existing.status_code)
 
             order = escrow_service.release_order(db, order_id=order_id, background_tasks=background_tasks)
-            response_json = _serialize_order(order)
+            response_json = order_to_dict(order)
             if idempotency_key and request_hash_value:
                 store_idempotency(
                     db,
@@ -71,7 +151,7 @@ def release_order(
     except DomainError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
 
-    return response_json
+    return FastJSONResponse(content=response_json)
 
 
 @router.post("/{order_id}/refund", response_model=OrderResponse)
@@ -98,10 +178,10 @@ def refund_order(
                 except DomainError as exc:
                     raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
                 if existing:
-                    return JSONResponse(content=existing.response_json, status_code=existing.status_code)
+                    return FastJSONResponse(content=existing.response_json, status_code=existing.status_code)
 
             order = escrow_service.refund_order(db, order_id=order_id, background_tasks=background_tasks)
-            response_json = _serialize_order(order)
+            response_json = order_to_dict(order)
             if idempotency_key and request_hash_value:
                 store_idempotency(
                     db,
@@ -114,4 +194,4 @@ def refund_order(
     except DomainError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
 
-    return response_json
+    return FastJSONResponse(content=response_json)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import require_api_key
+from app.api.responses import FastJSONResponse
+from app.api.schemas import EventPageResponse
+from app.serialization import dumps
+from app.services import events_service
+
+router = APIRouter(prefix="/events", tags=["events"], dependencies=[Depends(require_api_key)])
+
+MAX_WAIT_SECONDS = 30
+STREAM_BATCH_SIZE = 500
+# Sent when a stream has been idle this long, so proxies keep it open.
+STREAM_HEARTBEAT_SECONDS = 15
+
+
+@router.get("", response_model=EventPageResponse)
+async def list_events(
+    after: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=1000),
+    wait: float = Query(default=0, ge=0, le=MAX_WAIT_SECONDS),
+):
+    """Events with ``seq`` greater than ``after``, oldest first.
+
+    Pass the returned ``next_cursor`` as ``after`` on the next call. With
+    ``wait`` the call is held until an event arrives or the wait runs out
+    (long polling).
+    """
+    events = await events_service.fetch(after, limit, wait)
+    return FastJSONResponse(content={"events": events, "next_cursor": events[-1]["seq"] if events else after})
+
+
+def _frame(event: dict) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event["seq"], event["event"].encode("utf-8"), dumps(event))
+
+
+async def _stream(request: Request, after: int):
+    while not await request.is_disconnected():
+        events = await events_service.fetch(after, STREAM_BATCH_SIZE, STREAM_HEARTBEAT_SECONDS)
+        if events:
+            after = events[-1]["seq"]
+            yield b"".join(_frame(event) for event in events)
+        else:
+            yield b": keep-alive\n\n"
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    after: int | None = Query(default=None, ge=0),
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+):
+    """Server-Sent Events; reconnecting clients resume from ``Last-Event-ID``."""
+    if after is None:
+        after = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        _stream(request, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,32 +1,21 @@
 from __future__ import annotations
 
-from datetime import datetime
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.api.deps import db_session, require_api_key
-from app.domain.enums import LedgerAccount, LedgerDirection
+from app.api.deps import read_db_session, require_api_key
+from app.api.responses import FastJSONResponse
+from app.api.schemas import LedgerEntryResponse
+from app.domain.enums import LedgerAccount
 from app.repos import ledger_repo, order_repo
+from app.serialization import ledger_entry_to_dict
 
 router = APIRouter(tags=["ledger"], dependencies=[Depends(require_api_key)])
 
 
-class LedgerEntryResponse(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
-
-    id: UUID
-    order_id: UUID
-    type: str
-    amount_cents: int
-    direction: LedgerDirection
-    account: LedgerAccount
-    created_at: datetime
-    meta: dict | None = None
-
-
 class BalanceResponse(BaseModel):
     available_balance_cents: int
     escrow_balance_cents: int
@@ -34,16 +23,16 @@ class BalanceResponse(BaseModel):
 
 
 @router.get("/orders/{order_id}/ledger", response_model=list[LedgerEntryResponse])
-def list_ledger(order_id: UUID, db: Session = Depends(db_session)):
+def list_ledger(order_id: UUID, db: Session = Depends(read_db_session)):
     order = order_repo.get(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     entries = ledger_repo.list_by_order(db, order_id)
-    return [LedgerEntryResponse.model_validate(entry).model_dump(mode="json") for entry in entries]
+    return FastJSONResponse(content=[ledger_entry_to_dict(entry) for entry in entries])
 
 
 @router.get("/balance", response_model=BalanceResponse)
-def get_balance(db: Session = Depends(db_session)):
+def get_balance(db: Session = Depends(read_db_session)):
     """
     Calculates the balance based on ledger entries.
 
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app import metrics
+from app.api.deps import require_api_key
+from app.db import engines
+from app.db_pool import pool_status
+from app.services import webhooks_service
+
+router = APIRouter(tags=["metrics"], dependencies=[Depends(require_api_key)])
+
+# pool_status() field -> (metric name, help)
+POOL_GAUGES = {
+    "checked_out": ("ventra_db_pool_checked_out", "Connections currently checked out of the pool."),
+    "idle": ("ventra_db_pool_idle", "Idle connections in the pool."),
+    "overflow": ("ventra_db_pool_overflow", "Overflow connections open beyond pool_size."),
+    "timeouts": ("ventra_db_pool_timeouts", "Checkouts that timed out waiting for a connection."),
+    "wait_seconds_recent": ("ventra_db_pool_wait_seconds_recent", "Recent average checkout wait in seconds."),
+}
+
+
+def _gauges() -> dict:
+    gauges = {name: (help_text, {}) for name, help_text in POOL_GAUGES.values()}
+    for role, engine in engines().items():
+        status = pool_status(engine)
+        for field, (name, _) in POOL_GAUGES.items():
+            if field in status:
+                gauges[name][1][(("pool", role),)] = status[field]
+    gauges["ventra_webhook_queue_depth"] = (
+        "Webhook deliveries queued on background tasks and not sent yet.",
+        {(): webhooks_service.pending_deliveries()},
+    )
+    return gauges
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics.render(_gauges()), media_type="text/plain; version=0.0.4")
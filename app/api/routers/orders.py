@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+import hashlib
 from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Request
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, ConfigDict, Field
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from app.api.deps import check_idempotency, db_session, require_api_key, store_idempotency
+from app.api.deps import check_idempotency, db_session, read_db_session, require_api_key, store_idempotency
+from app.api.responses import FastJSONResponse
+from app.api.schemas import OrderWithChargeResponse
 from app.domain.errors import DomainError
-from app.domain.enums import ChargeStatus, OrderStatus
+from app.domain.enums import OrderStatus
+from app.serialization import charge_to_dict, order_to_dict
 from app.services import orders_service
 
 router = APIRouter(prefix="/orders", tags=["orders"], dependencies=[Depends(require_api_key)])
@@ -21,36 +25,33 @@ class OrderCreate(BaseModel):
     currency: str = Field(min_length=3, max_length=3, default="BRL")
 
 
-class ChargeResponse(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
+class OrderListResponse(BaseModel):
+    items: list[OrderWithChargeResponse]
+    next_cursor: UUID | None = None
 
-    id: UUID
-    status: ChargeStatus
-    expires_at: datetime
-    pix_emv: str
-    txid: str
 
+def _order_etag(order, charge=None) -> str:
+    # Status is folded in alongside updated_at because some backends only keep
+    # second precision, so two transitions within one second must still differ.
+    parts = [str(order.id), order.status, order.updated_at.isoformat()]
+    if charge:
+        parts.extend([str(charge.id), charge.status, charge.updated_at.isoformat()])
+    digest = hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
 
-class OrderResponse(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
 
-    id: UUID
-    status: OrderStatus
-    amount_cents: int
-    currency: str
-    created_at: datetime
-    updated_at: datetime
-    charge: ChargeResponse | None = None
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = {value.strip() for value in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
 
 
 def _serialize_order(order, charge=None) -> dict:
-    payload = OrderResponse.model_validate(order).model_dump(mode="json")
-    if charge:
-        payload["charge"] = ChargeResponse.model_validate(charge).model_dump(mode="json")
+    payload = order_to_dict(order)
+    payload["charge"] = charge_to_dict(charge) if charge else None
     return payload
 
 
-@router.post("", status_code=201)
+@router.post("", status_code=201, response_model=OrderWithChargeResponse)
 def create_order(
     body: OrderCreate,
     request: Request,
@@ -76,7 +77,7 @@ def create_order(
                 except DomainError as exc:
                     raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
                 if existing:
-                    return JSONResponse(content=existing.response_json, status_code=existing.status_code)
+                    return FastJSONResponse(content=existing.response_json, status_code=existing.status_code)
 
             order = orders_service.create_order(db, amount_cents=body.amount_cents, currency=body.currency)
             response_json = _serialize_order(order)
@@ -92,12 +93,53 @@ def create_order(
     except DomainError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
 
-    return JSONResponse(content=response_json, status_code=201)
+    return FastJSONResponse(content=response_json, status_code=201)
 
 
-@router.get("/{order_id}", response_model=OrderResponse)
-def get_order(order_id: UUID, db: Session = Depends(db_session)):
+@router.get("", response_model=OrderListResponse)
+def list_orders(
+    status: OrderStatus | None = None,
+    currency: str | None = Query(default=None, min_length=3, max_length=3),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    min_amount_cents: int | None = Query(default=None, ge=0),
+    max_amount_cents: int | None = Query(default=None, ge=0),
+    cursor: UUID | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    db: Session = Depends(read_db_session),
+):
+    try:
+        rows, next_cursor = orders_service.list_orders(
+            db,
+            limit=limit,
+            cursor=cursor,
+            status=status.value if status else None,
+            currency=currency,
+            created_from=created_from,
+            created_to=created_to,
+            min_amount_cents=min_amount_cents,
+            max_amount_cents=max_amount_cents,
+        )
+    except DomainError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    return FastJSONResponse(
+        {
+            "items": [_serialize_order(order, charge) for order, charge in rows],
+            "next_cursor": str(next_cursor) if next_cursor else None,
+        }
+    )
+
+
+@router.get("/{order_id}", response_model=OrderWithChargeResponse)
+def get_order(
+    order_id: UUID,
+    db: Session = Depends(read_db_session),
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+):
     order, charge = orders_service.get_order_with_charge(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    return _serialize_order(order, charge)
+    etag = _order_etag(order, charge)
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return FastJSONResponse(content=_serialize_order(order, charge), headers={"ETag": etag})
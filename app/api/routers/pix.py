@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi import APIRouter, Body, Depends
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy.orm import Session
+
+from app.api.deps import db_session, require_api_key
+from app.services import pix_inbox_service
+
+router = APIRouter(prefix="/pix", tags=["pix"], dependencies=[Depends(require_api_key)])
+
+MAX_NOTIFICATIONS_PER_REQUEST = 1000
+
+
+class PixNotificationIn(BaseModel):
+    """A received Pix, in the shape of the BCB Pix API webhook callback."""
+
+    model_config = ConfigDict(populate_by_name=True, extra="allow")
+
+    end_to_end_id: str = Field(alias="endToEndId", min_length=1, max_length=64)
+    txid: str = Field(min_length=1, max_length=35)
+    valor: Decimal | None = Field(default=None, ge=0)
+    horario: datetime | None = None
+
+
+class PixNotificationBatch(BaseModel):
+    pix: list[PixNotificationIn] = Field(min_length=1, max_length=MAX_NOTIFICATIONS_PER_REQUEST)
+
+
+class IngestResponse(BaseModel):
+    accepted: int
+    duplicates: int
+
+
+def _to_inbox_row(notification: PixNotificationIn) -> dict:
+    return {
+        "end_to_end_id": notification.end_to_end_id,
+        "txid": notification.txid,
+        "amount_cents": int(notification.valor * 100) if notification.valor is not None else None,
+        "paid_at": notification.horario,
+        "payload": notification.model_dump(mode="json", by_alias=True),
+    }
+
+
+@router.post("/notifications", status_code=202, response_model=IngestResponse)
+def ingest_notifications(
+    body: PixNotificationBatch | PixNotificationIn = Body(...),
+    db: Session = Depends(db_session),
+):
+    notifications = body.pix if isinstance(body, PixNotificationBatch) else [body]
+    with db.begin():
+        accepted, duplicates = pix_inbox_service.ingest(db, [_to_inbox_row(item) for item in notifications])
+    pix_inbox_service.notify_workers()
+    return JSONResponse(content={"accepted": accepted, "duplicates": duplicates}, status_code=202)
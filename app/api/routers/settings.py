@@ -11,6 +11,7 @@ router = APIRouter(prefix="/settings", tags=["settings"], dependencies=[Depends(
 
 class ApiKeyPayload(BaseModel):
     api_key: str
+    revoke_existing: bool = False
 
 
 @router.post("/api-key")
@@ -18,5 +19,5 @@ def update_api_key(payload: ApiKeyPayload) -> dict:
     value = payload.api_key.strip()
     if not value:
         raise HTTPException(status_code=400, detail="api_key_required")
-    set_api_key(value)
+    set_api_key(value, revoke_existing=payload.revoke_existing)
     return {"ok": True}
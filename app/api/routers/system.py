@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query
+
+from app import db_replica, jobs
+from app.api.deps import require_api_key
+from app.db import engines
+from app.db_pool import pool_status
+from app.services import webhook_endpoint_resolver
+from app.settings import settings
+from app.tracing import exporter
+
+router = APIRouter(prefix="/system", tags=["system"], dependencies=[Depends(require_api_key)])
+
+
+@router.get("/db-pool")
+def get_db_pool_status() -> dict:
+    return {role: pool_status(engine) for role, engine in engines().items()}
+
+
+@router.get("/replica")
+def get_replica_status() -> dict:
+    return db_replica.status()
+
+
+@router.get("/jobs")
+def get_jobs() -> dict:
+    return jobs.status()
+
+
+@router.post("/webhook-endpoint/refresh")
+def refresh_webhook_endpoint(env: str | None = None) -> dict:
+    """Re-fetch the VentraSim endpoint now instead of waiting for the cache to expire on every worker."""
+    env = env or settings.env
+    webhook_endpoint_resolver.invalidate(env)
+    endpoint = webhook_endpoint_resolver.resolve_webhook_endpoint(env)
+    return {
+        "env": env,
+        "cache": settings.webhook_resolver_cache,
+        "endpoint_id": endpoint.endpoint_id if endpoint else None,
+        "url": endpoint.url if endpoint else None,
+        "updated_at": endpoint.updated_at if endpoint else None,
+    }
+
+
+@router.get("/traces")
+def get_traces(trace_id: str | None = None, limit: int = Query(default=20, ge=1, le=200)) -> dict:
+    if trace_id:
+        return {"traces": [{"trace_id": trace_id, "spans": exporter().spans(trace_id)}]}
+    return {"traces": exporter().traces(limit)}
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.api.deps import db_session, require_api_key
+from app.domain.enums import WebhookPayloadMode
+from app.domain.errors import DomainError
+from app.repos import webhook_repo
 from app.services import webhooks_service
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"], dependencies=[Depends(require_api_key)])
@@ -15,7 +21,39 @@ class WebhookTestRequest(BaseModel):
     data: dict = Field(default_factory=dict)
 
 
+class WebhookSubscriptionResponse(BaseModel):
+    id: UUID
+    url: str
+    is_enabled: bool
+    payload_mode: WebhookPayloadMode
+    created_at: datetime
+
+
+class WebhookSubscriptionUpdate(BaseModel):
+    payload_mode: WebhookPayloadMode | None = None
+    is_enabled: bool | None = None
+
+
 @router.post("/test")
 def send_test_webhook(body: WebhookTestRequest, background_tasks: BackgroundTasks, db: Session = Depends(db_session)):
-    webhooks_service.emit_event(db, body.event, body.data, background_tasks)
+    with db.begin():
+        webhooks_service.emit_event(db, body.event, body.data, background_tasks)
     return {"status": "queued"}
+
+
+@router.get("/subscriptions", response_model=list[WebhookSubscriptionResponse])
+def list_subscriptions(db: Session = Depends(db_session)):
+    return webhook_repo.list_all(db)
+
+
+@router.patch("/subscriptions/{subscription_id}", response_model=WebhookSubscriptionResponse)
+def update_subscription(subscription_id: UUID, body: WebhookSubscriptionUpdate, db: Session = Depends(db_session)):
+    """Choose thin (ids only) or fat (ids plus resource snapshots) payloads, or pause delivery."""
+    try:
+        with db.begin():
+            subscription = webhooks_service.update_subscription(
+                db, subscription_id, payload_mode=body.payload_mode, is_enabled=body.is_enabled
+            )
+    except DomainError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    return subscription
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.domain.enums import ChargeStatus, LedgerAccount, LedgerDirection, OrderStatus
+
+# These models document the API in OpenAPI. Handlers build their bodies with
+# the plain serializers in app.serialization and return them as
+# FastJSONResponse, so FastAPI does not validate the payload a second time.
+
+
+class ChargeResponse(BaseModel):
+    id: UUID
+    order_id: UUID
+    status: ChargeStatus
+    expires_at: datetime
+    pix_emv: str
+    txid: str
+
+
+class OrderResponse(BaseModel):
+    id: UUID
+    status: OrderStatus
+    amount_cents: int
+    currency: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class OrderWithChargeResponse(OrderResponse):
+    charge: ChargeResponse | None = None
+
+
+class LedgerEntryResponse(BaseModel):
+    id: UUID
+    order_id: UUID
+    type: str
+    amount_cents: int
+    direction: LedgerDirection
+    account: LedgerAccount
+    created_at: datetime
+    meta: dict | None = None
+
+
+class EventResponse(BaseModel):
+    seq: int
+    id: UUID
+    event: str
+    data: dict
+    created_at: datetime
+
+
+class EventPageResponse(BaseModel):
+    events: list[EventResponse]
+    next_cursor: int
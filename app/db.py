@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import threading
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app import db_sqlite
+from app.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 from app.settings import settings
 
 
@@ -11,18 +16,95 @@ class Base(DeclarativeBase):
     pass
 
 
+def _pool_options(poolclass) -> dict:
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _postgres_connect_args(database_url: str) -> dict:
+    if not settings.db_pgbouncer_mode:
+        return {}
+    # PgBouncer in transaction pooling mode hands each transaction to any server
+    # connection, so server-side prepared statements must be disabled.
+    driver = make_url(database_url).get_driver_name()
+    if driver == "psycopg":
+        return {"prepare_threshold": None}
+    if driver == "asyncpg":
+        return {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    return {}
+
+
 def build_engine(database_url: str):
     if database_url.startswith("sqlite"):
+        if not db_sqlite.is_memory_url(database_url):
+            return db_sqlite.configure_file_engine(
+                create_engine(
+                    database_url,
+                    connect_args=db_sqlite.file_connect_args(),
+                    **{**_pool_options(InstrumentedQueuePool), "pool_size": settings.sqlite_pool_size},
+                )
+            )
+        # In-memory databases only exist per connection, so share one (tests).
         return create_engine(
             database_url,
             connect_args={"check_same_thread": False},
             poolclass=StaticPool,
         )
-    return create_engine(database_url, pool_pre_ping=True)
+    return create_engine(
+        database_url,
+        connect_args=_postgres_connect_args(database_url),
+        **_pool_options(InstrumentedQueuePool),
+    )
+
+
+_engine_lock = threading.Lock()
+_engine = None
+
+
+def get_engine():
+    """The primary engine, built on first use rather than at import."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = build_engine(settings.database_url)
+    return _engine
+
+
+def __getattr__(name: str):
+    # Keeps `from app.db import engine` working without building it at import.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _LazySessionmaker(sessionmaker):
+    """Binds to the primary engine the first time a session is created."""
+
+    def _engine(self):
+        return get_engine()
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=self._engine())
+        return super().__call__(**local_kw)
+
 
+class _LazyReadSessionmaker(_LazySessionmaker):
+    """Read-only sessions on the primary; on SQLite they begin DEFERRED."""
 
-engine = build_engine(settings.database_url)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+    def _engine(self):
+        return db_sqlite.read_only(get_engine())
+
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+ReadSessionLocal = _LazyReadSessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
 
 
 def get_db():
@@ -31,3 +113,149 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+_replica_lock = threading.Lock()
+_replica_engine = None
+_replica_sessionmaker = None
+
+
+def get_replica_engine():
+    global _replica_engine, _replica_sessionmaker
+    if _replica_engine is None:
+        with _replica_lock:
+            if _replica_engine is None:
+                replica_engine = build_engine(settings.read_replica_url)
+                # Publish the sessionmaker first: get_replica_db reads it
+                # without the lock once the engine is set.
+                _replica_sessionmaker = sessionmaker(
+                    bind=replica_engine, autocommit=False, autoflush=False, expire_on_commit=False
+                )
+                _replica_engine = replica_engine
+    return _replica_engine
+
+
+def get_replica_db():
+    get_replica_engine()
+    db = _replica_sessionmaker()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Sync drivers mapped to the async driver for the same database.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+psycopg",
+}
+
+_async_lock = threading.Lock()
+_async_engine = None
+_async_sessionmaker = None
+_async_read_sessionmaker = None
+_async_replica_sessionmaker = None
+
+
+def async_database_url(database_url: str) -> str:
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def build_async_engine(database_url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    if database_url.startswith("sqlite"):
+        if not db_sqlite.is_memory_url(database_url):
+            engine = create_async_engine(
+                database_url,
+                connect_args=db_sqlite.file_connect_args(),
+                **{**_pool_options(InstrumentedAsyncQueuePool), "pool_size": settings.sqlite_pool_size},
+            )
+            db_sqlite.configure_file_engine(engine.sync_engine)
+            return engine
+        return create_async_engine(database_url, poolclass=StaticPool)
+    return create_async_engine(
+        database_url,
+        connect_args=_postgres_connect_args(database_url),
+        **_pool_options(InstrumentedAsyncQueuePool),
+    )
+
+
+def get_async_sessionmaker():
+    global _async_engine, _async_sessionmaker, _async_read_sessionmaker
+    if _async_sessionmaker is None:
+        with _async_lock:
+            if _async_sessionmaker is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker
+
+                url = settings.async_database_url or async_database_url(settings.database_url)
+                _async_engine = build_async_engine(url)
+                _async_read_sessionmaker = async_sessionmaker(
+                    bind=db_sqlite.read_only(_async_engine),
+                    autoflush=False,
+                    expire_on_commit=False,
+                )
+                _async_sessionmaker = async_sessionmaker(
+                    bind=_async_engine,
+                    autoflush=False,
+                    expire_on_commit=False,
+                )
+    return _async_sessionmaker
+
+
+def get_async_read_sessionmaker():
+    get_async_sessionmaker()
+    return _async_read_sessionmaker
+
+
+def engines() -> dict:
+    """Engines created so far in this process, keyed by role."""
+    created = {"primary": get_engine()}
+    if _async_engine is not None:
+        created["async"] = _async_engine.sync_engine
+    if _replica_engine is not None:
+        created["replica"] = _replica_engine
+    return created
+
+
+def get_async_replica_sessionmaker():
+    global _async_replica_sessionmaker
+    if _async_replica_sessionmaker is None:
+        with _async_lock:
+            if _async_replica_sessionmaker is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker
+
+                _async_replica_sessionmaker = async_sessionmaker(
+                    bind=build_async_engine(async_database_url(settings.read_replica_url)),
+                    autoflush=False,
+                    expire_on_commit=False,
+                )
+    return _async_replica_sessionmaker
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with get_async_read_sessionmaker()() as db:
+        yield db
+
+
+async def get_async_replica_db():
+    async with get_async_replica_sessionmaker()() as db:
+        yield db
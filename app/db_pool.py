@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Weight of the newest sample in the recent checkout wait average.
+RECENT_WAIT_ALPHA = 0.2
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.wait_seconds_recent = 0.0
+
+    def record_checkout(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._record_wait(waited)
+
+    def record_timeout(self, waited: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self._record_wait(waited)
+
+    def _record_wait(self, waited: float) -> None:
+        self.wait_seconds_total += waited
+        if waited > self.wait_seconds_max:
+            self.wait_seconds_max = waited
+        self.wait_seconds_recent += RECENT_WAIT_ALPHA * (waited - self.wait_seconds_recent)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_recent": round(self.wait_seconds_recent, 6),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout (queue wait, connect and pre-ping) and counts pool timeouts."""
+
+    stats: PoolStats
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except sa_exc.TimeoutError:
+            self.stats.record_timeout(time.perf_counter() - start)
+            raise
+        self.stats.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(engine) -> dict:
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
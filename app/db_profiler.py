@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.runtime_settings import verify_api_key
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+PROFILE_HEADER = "x-debug-sql"
+# Slowest distinct statements reported per request.
+TOP_STATEMENTS = 5
+MAX_LOGGED_SQL = 500
+
+_WHITESPACE = re.compile(r"\s+")
+# Statements that take row or database locks; their time includes any wait
+# for a lock held by another transaction (BEGIN IMMEDIATE on SQLite).
+_LOCKING = re.compile(r"^\s*(BEGIN\s+(IMMEDIATE|EXCLUSIVE)|UPDATE\b)|\bFOR\s+(NO\s+KEY\s+)?UPDATE\b", re.IGNORECASE)
+
+
+@dataclass
+class QueryProfile:
+    queries: int = 0
+    seconds: float = 0.0
+    lock_seconds: float = 0.0
+    # statement -> [executions, total seconds, slowest execution in seconds, takes locks]
+    statements: dict[str, list] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.seconds += seconds
+            stats = self.statements.get(statement)
+            if stats is None:
+                stats = self.statements[statement] = [0, 0.0, 0.0, bool(_LOCKING.search(statement))]
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+            if stats[3]:
+                self.lock_seconds += seconds
+
+    def slowest(self, limit: int = TOP_STATEMENTS) -> list[tuple[float, str]]:
+        """Distinct statements ordered by their slowest single execution."""
+        ranked = sorted(((stats[2], statement) for statement, stats in self.statements.items()), reverse=True)
+        return ranked[:limit]
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run at least ``threshold`` times: likely N+1 loops."""
+        return sorted(
+            ((statement, stats[0]) for statement, stats in self.statements.items() if stats[0] >= threshold),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+
+_current: ContextVar[QueryProfile | None] = ContextVar("sql_profile", default=None)
+
+
+def current() -> QueryProfile | None:
+    return _current.get()
+
+
+def normalize(statement: str) -> str:
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def fingerprint(statement: str, parameters) -> str:
+    """Stable id for a statement plus the shape of its bound parameters.
+
+    Only parameter names and types go into it, never values, so slow-query
+    logs can be grouped without leaking payment data.
+    """
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (dict, list, tuple)):
+        parameters = parameters[0]
+    if isinstance(parameters, dict):
+        shape = ",".join(f"{name}:{type(value).__name__}" for name, value in sorted(parameters.items()))
+    elif isinstance(parameters, (list, tuple)):
+        shape = ",".join(type(value).__name__ for value in parameters)
+    else:
+        shape = ""
+    return hashlib.sha1(f"{normalize(statement)}|{shape}".encode("utf-8")).hexdigest()[:16]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    profile = _current.get()
+    if profile is not None:
+        profile.record(statement, elapsed)
+    threshold_ms = settings.sql_slow_query_ms
+    if threshold_ms and elapsed * 1000 >= threshold_ms:
+        slow_query_logger.warning(
+            "slow query %.1fms fingerprint=%s executemany=%s sql=%s",
+            elapsed * 1000,
+            fingerprint(statement, parameters),
+            executemany,
+            normalize(statement)[:MAX_LOGGED_SQL],
+        )
+
+
+def _handle_error(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None:
+        starts = connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def install() -> None:
+    """Time every statement on every engine, including ones created later."""
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+def _requested(scope) -> bool:
+    if settings.sql_profiling:
+        return True
+    if not settings.sql_profiling_allow_header:
+        return False
+    headers = dict(scope.get("headers") or ())
+    if headers.get(PROFILE_HEADER.encode("ascii"), b"").strip().lower() not in (b"1", b"true", b"yes"):
+        return False
+    # Profiling adds headers and INFO logging per statement, so only callers
+    # with a valid API key may ask for it.
+    api_key = headers.get(b"x-api-key")
+    return api_key is not None and verify_api_key(api_key.decode("latin-1"))
+
+
+def _report(scope, profile: QueryProfile) -> list[tuple[bytes, bytes]]:
+    repeated = profile.repeated(settings.sql_repeat_threshold)
+    for statement, count in repeated:
+        logger.warning(
+            "possible N+1: %s %s ran the same statement %s times: %s",
+            scope["method"],
+            scope["path"],
+            count,
+            normalize(statement)[:MAX_LOGGED_SQL],
+        )
+    logger.info(
+        "%s %s ran %s queries in %.1fms; slowest: %s",
+        scope["method"],
+        scope["path"],
+        profile.queries,
+        profile.seconds * 1000,
+        "; ".join(f"{seconds * 1000:.1f}ms {normalize(sql)[:120]}" for seconds, sql in profile.slowest()),
+    )
+    return [
+        (b"x-sql-queries", str(profile.queries).encode("ascii")),
+        (b"x-sql-time-ms", f"{profile.seconds * 1000:.2f}".encode("ascii")),
+        (b"x-sql-lock-ms", f"{profile.lock_seconds * 1000:.2f}".encode("ascii")),
+        (b"x-sql-repeated", str(len(repeated)).encode("ascii")),
+        (b"server-timing", f'db;dur={profile.seconds * 1000:.2f};desc="{profile.queries} queries"'.encode("ascii")),
+    ]
+
+
+class SQLProfilerMiddleware:
+    """Profiles the SQL of a request when SQL_PROFILING is on or an API-key holder sends ``X-Debug-SQL: 1``.
+
+    The summary is returned in ``X-SQL-*`` and ``Server-Timing`` response
+    headers and logged; statements repeated SQL_REPEAT_THRESHOLD times or
+    more are logged as possible N+1 queries.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = _current.set(profile)
+
+        async def send_with_profile(message) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *_report(scope, profile)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _current.reset(token)
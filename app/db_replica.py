@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from sqlalchemy import text
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary. A replica that is streaming and
+# has replayed everything it received is considered current even if the
+# primary has been idle, since pg_last_xact_replay_timestamp() only moves on
+# new commits. Once streaming stops the receive LSN freezes and replay catches
+# up to it, so then only the replay timestamp tells how far behind it is.
+POSTGRES_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming')
+            AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+_state_lock = threading.Lock()
+_refreshing = False
+_checked_at: float | None = None
+_healthy = False
+_lag_seconds: float | None = None
+_last_error: str | None = None
+
+
+def replica_available() -> bool:
+    """Whether reads may go to the replica, based on the last lag check.
+
+    Never blocks: when the last check is older than the configured interval a
+    refresh is started in the background and the previous verdict is used.
+    Until the first check completes reads stay on the primary.
+    """
+    if not settings.read_replica_url:
+        return False
+    global _refreshing
+    with _state_lock:
+        stale = _checked_at is None or time.monotonic() - _checked_at >= settings.read_replica_check_interval_seconds
+        if stale and not _refreshing:
+            _refreshing = True
+            threading.Thread(target=_refresh, name="replica-lag-check", daemon=True).start()
+        return _healthy
+
+
+def status() -> dict:
+    with _state_lock:
+        return {
+            "configured": bool(settings.read_replica_url),
+            "healthy": _healthy,
+            "lag_seconds": _lag_seconds,
+            "max_lag_seconds": settings.read_replica_max_lag_seconds,
+            "last_error": _last_error,
+        }
+
+
+def _measure_lag() -> float:
+    from app.db import get_replica_engine
+
+    engine = get_replica_engine()
+    with engine.connect() as conn:
+        if engine.dialect.name != "postgresql":
+            return 0.0
+        lag = conn.execute(POSTGRES_LAG_SQL).scalar_one()
+    if lag is None:
+        raise RuntimeError("replica is not streaming and has not replayed any transaction")
+    return float(lag)
+
+
+def _refresh() -> None:
+    global _refreshing, _checked_at, _healthy, _lag_seconds, _last_error
+    lag = None
+    error = None
+    try:
+        lag = _measure_lag()
+    except Exception as exc:
+        error = str(exc)
+        logger.warning("Read replica unavailable; serving reads from primary: %s", exc)
+
+    healthy = lag is not None and lag <= settings.read_replica_max_lag_seconds
+    if lag is not None and not healthy:
+        logger.warning(
+            "Read replica lag %.1fs exceeds %.1fs; serving reads from primary",
+            lag,
+            settings.read_replica_max_lag_seconds,
+        )
+    with _state_lock:
+        _healthy = healthy
+        _lag_seconds = lag
+        _last_error = error
+        _checked_at = time.monotonic()
+        _refreshing = False
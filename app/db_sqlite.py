@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.util import await_only
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+BUSY_RETRY_BASE_DELAY_SECONDS = 0.05
+
+
+def is_memory_url(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def file_connect_args() -> dict:
+    return {
+        "check_same_thread": False,
+        "timeout": settings.sqlite_busy_timeout_ms / 1000,
+    }
+
+
+def configure_file_engine(engine: Engine) -> Engine:
+    """Tune a file-backed SQLite engine for concurrent single-node use.
+
+    Every pooled connection gets WAL journaling and the configured pragmas.
+    Transactions open with ``BEGIN IMMEDIATE`` by default: SQLite ignores
+    ``SELECT ... FOR UPDATE``, so taking the write lock up front is what keeps
+    the read-check-write sequences in the services serialized. Engines from
+    :func:`read_only` begin ``DEFERRED`` instead, so reads share WAL snapshots
+    rather than queueing for the write lock. The BEGIN is retried with backoff
+    when the database stays busy past ``busy_timeout``.
+    """
+    event.listen(engine, "connect", _on_connect)
+    event.listen(engine, "begin", _on_begin)
+    return engine
+
+
+def read_only(engine: Engine) -> Engine:
+    """The same engine and pool, for sessions that never write."""
+    return engine.execution_options(sqlite_begin_mode="DEFERRED")
+
+
+def _on_connect(dbapi_connection, connection_record) -> None:
+    # Let SQLAlchemy's "begin" event emit BEGIN instead of the sqlite3 module.
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def _on_begin(conn) -> None:
+    mode = conn.get_execution_options().get("sqlite_begin_mode", settings.sqlite_begin_mode)
+    statement = f"BEGIN {mode}"
+    attempts = max(settings.sqlite_busy_retries, 0) + 1
+    for attempt in range(1, attempts + 1):
+        try:
+            conn.exec_driver_sql(statement)
+            return
+        except OperationalError as exc:
+            if attempt == attempts or not _is_busy(exc):
+                raise
+            delay = BUSY_RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1))
+            logger.warning("SQLite busy on %s (attempt %s/%s); retrying in %.2fs", statement, attempt, attempts, delay)
+            if conn.dialect.is_async:
+                # The async engine runs this on the event loop; sleeping there
+                # would stall every request on the worker.
+                await_only(asyncio.sleep(delay))
+            else:
+                time.sleep(delay)
+
+
+def _is_busy(exc: OperationalError) -> bool:
+    message = str(exc.orig).lower()
+    return "database is locked" in message or "database is busy" in message
@@ -36,3 +36,17 @@ class LedgerEntryType(str, Enum):
     ESCROW_HELD = "ESCROW_HELD"
     RELEASED_TO_MERCHANT = "RELEASED_TO_MERCHANT"
     REFUNDED_TO_CUSTOMER = "REFUNDED_TO_CUSTOMER"
+
+
+class PixNotificationStatus(str, Enum):
+    PENDING = "PENDING"
+    PROCESSED = "PROCESSED"
+    DUPLICATE = "DUPLICATE"
+    FAILED = "FAILED"
+
+
+class WebhookPayloadMode(str, Enum):
+    # Ids only; consumers fetch the resources they need.
+    THIN = "thin"
+    # Ids plus snapshots of the order, charge and ledger legs the event changed.
+    FAT = "fat"
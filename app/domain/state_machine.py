@@ -30,3 +30,13 @@ def ensure_charge_transition(current: ChargeStatus, new: ChargeStatus) -> None:
     allowed = CHARGE_TRANSITIONS.get(current, set())
     if new not in allowed:
         raise InvalidStateError(f"Invalid charge transition {current} -> {new}")
+
+
+def order_sources(new: OrderStatus) -> set[OrderStatus]:
+    """Statuses an order may be in for a transition to ``new`` to be allowed."""
+    return {current for current, allowed in ORDER_TRANSITIONS.items() if new in allowed}
+
+
+def charge_sources(new: ChargeStatus) -> set[ChargeStatus]:
+    """Statuses a charge may be in for a transition to ``new`` to be allowed."""
+    return {current for current, allowed in CHARGE_TRANSITIONS.items() if new in allowed}
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.db import SessionLocal, get_engine
+from app.domain.enums import ChargeStatus
+from app.repos import charge_repo, event_repo, idempotency_repo
+from app.serialization import isoformat
+from app.settings import settings
+from app.tracing import start_trace
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class FileLeaderLock:
+    """One runner per job among processes sharing ``directory`` (SQLite deployments).
+
+    Uses non-blocking ``flock`` on one file per job; the OS drops the lock
+    when the holding process exits, so another worker takes over.
+    """
+
+    kind = "file"
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._held: dict[str, int] = {}
+
+    def acquire(self, name: str) -> bool:
+        if name in self._held:
+            return True
+        if fcntl is None:
+            # No flock here; a single process is assumed.
+            self._held[name] = -1
+            return True
+        os.makedirs(self.directory, exist_ok=True)
+        fd = os.open(os.path.join(self.directory, f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._held[name] = fd
+        return True
+
+    def release_all(self) -> None:
+        for fd in self._held.values():
+            if fd >= 0:
+                os.close(fd)
+        self._held.clear()
+
+
+def _advisory_key(name: str) -> int:
+    return int.from_bytes(hashlib.sha256(f"ventra-job:{name}".encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+class PostgresLeaderLock:
+    """One runner per job across every worker and host, via ``pg_try_advisory_lock``.
+
+    The locks live on one dedicated session outside the app pool. If that
+    connection drops, Postgres releases them and another worker is elected
+    on its next attempt.
+    """
+
+    kind = "postgres_advisory"
+
+    def __init__(self, database_url: str) -> None:
+        self._engine = create_engine(database_url, poolclass=NullPool)
+        self._connection = None
+        self._held: set[str] = set()
+
+    def _alive(self) -> bool:
+        if self._connection is None:
+            return False
+        try:
+            self._connection.exec_driver_sql("SELECT 1")
+            self._connection.commit()
+            return True
+        except Exception:
+            logger.warning("job leader lock connection lost; leadership released")
+            self._drop()
+            return False
+
+    def _drop(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+        self._connection = None
+        self._held.clear()
+
+    def acquire(self, name: str) -> bool:
+        if not self._alive():
+            self._connection = self._engine.connect()
+        if name in self._held:
+            return True
+        acquired = self._connection.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": _advisory_key(name)}
+        ).scalar_one()
+        # Session-level locks outlive the transaction; end it so the session idles cleanly.
+        self._connection.commit()
+        if acquired:
+            self._held.add(name)
+        return bool(acquired)
+
+    def release_all(self) -> None:
+        self._drop()
+        self._engine.dispose()
+
+
+def default_lock():
+    if get_engine().dialect.name == "postgresql":
+        if settings.db_pgbouncer_mode and not settings.jobs_lock_database_url:
+            logger.warning(
+                "advisory locks need a session-pooled connection; set JOBS_LOCK_DATABASE_URL to bypass PgBouncer"
+            )
+        return PostgresLeaderLock(settings.jobs_lock_database_url or settings.database_url)
+    directory = settings.jobs_lock_dir or os.path.join(
+        tempfile.gettempdir(), "ventra-jobs-" + hashlib.sha1(settings.database_url.encode("utf-8")).hexdigest()[:12]
+    )
+    return FileLeaderLock(directory)
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], int | None]
+    interval_seconds: float
+    leader: bool = False
+    runs: int = 0
+    failures: int = 0
+    last_started_at: datetime | None = None
+    last_duration_ms: float | None = None
+    last_result: int | None = None
+    last_error: str | None = None
+    last_failed_at: datetime | None = None
+    next_run_at: float = field(default=0.0, repr=False)
+
+    def status(self, now: float) -> dict:
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval_seconds,
+            "leader": self.leader,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_started_at": isoformat(self.last_started_at),
+            "last_duration_ms": self.last_duration_ms,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "last_failed_at": isoformat(self.last_failed_at),
+            "next_run_in_seconds": round(max(self.next_run_at - now, 0.0), 3),
+        }
+
+
+class JobRunner:
+    """Runs periodic jobs on one thread, each only in the process elected for it.
+
+    Every worker schedules every job; at each due time a worker first tries
+    to take the job's leader lock and skips the run if another worker holds
+    it. Intervals get +/- ``jitter`` so workers do not retry in lockstep.
+    """
+
+    def __init__(self, jobs: list[Job], lock, *, jitter: float = 0.1, clock=time.monotonic, rng=random.random):
+        self.jobs = jobs
+        self.lock = lock
+        self.jitter = jitter
+        self.clock = clock
+        self.rng = rng
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        now = clock()
+        for job in jobs:
+            # Spread the first runs instead of firing every job at startup.
+            job.next_run_at = now + job.interval_seconds * jitter * rng()
+
+    def _reschedule(self, job: Job, now: float) -> None:
+        job.next_run_at = now + job.interval_seconds * (1 + self.jitter * (2 * self.rng() - 1))
+
+    def run_pending(self) -> float:
+        """Run every due job this process leads; returns seconds until the next is due."""
+        for job in self.jobs:
+            if self._stop.is_set():
+                break
+            now = self.clock()
+            if job.next_run_at > now:
+                continue
+            try:
+                job.leader = self.lock.acquire(job.name)
+            except Exception:
+                logger.exception("job %s: leader election failed", job.name)
+                job.leader = False
+            if job.leader:
+                self._run(job)
+            self._reschedule(job, self.clock())
+        return max(0.0, min(job.next_run_at for job in self.jobs) - self.clock()) if self.jobs else 60.0
+
+    def _run(self, job: Job) -> None:
+        job.last_started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        try:
+            with start_trace(f"job.{job.name}"):
+                result = job.func()
+        except Exception as exc:
+            job.failures += 1
+            job.last_error = f"{type(exc).__name__}: {exc}"
+            job.last_failed_at = datetime.now(timezone.utc)
+            logger.exception("job %s failed", job.name)
+        else:
+            job.last_result = result
+            job.last_error = None
+        finally:
+            job.runs += 1
+            job.last_duration_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._stop.wait(self.run_pending())
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="job-runner", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.lock.release_all()
+
+    def status(self) -> list[dict]:
+        now = self.clock()
+        return [job.status(now) for job in self.jobs]
+
+
+def _in_batches(step: Callable) -> int:
+    """Run ``step(db)`` in its own transaction until it handles less than a full batch."""
+    total = 0
+    while True:
+        db = SessionLocal()
+        try:
+            with db.begin():
+                done = step(db)
+        finally:
+            db.close()
+        total += done
+        if done < settings.jobs_batch_size:
+            return total
+
+
+def expire_charges() -> int:
+    """Expire pending charges past ``expires_at``; payment attempts already do this lazily."""
+    now = datetime.now(timezone.utc)
+    return _in_batches(
+        lambda db: charge_repo.expire_overdue(
+            db, now, ChargeStatus.PENDING.value, ChargeStatus.EXPIRED.value, settings.jobs_batch_size
+        )
+    )
+
+
+def purge_idempotency_keys() -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.idempotency_key_ttl_hours)
+    return _in_batches(lambda db: idempotency_repo.delete_older_than(db, cutoff, settings.jobs_batch_size))
+
+
+def prune_events() -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.events_retention_days)
+    return _in_batches(lambda db: event_repo.delete_older_than(db, cutoff, settings.jobs_batch_size))
+
+
+def default_jobs() -> list[Job]:
+    jobs = [
+        Job("expire_charges", expire_charges, settings.jobs_expire_charges_interval_seconds),
+        Job("purge_idempotency_keys", purge_idempotency_keys, settings.jobs_cleanup_interval_seconds),
+    ]
+    if settings.events_retention_days > 0:
+        jobs.append(Job("prune_events", prune_events, settings.jobs_cleanup_interval_seconds))
+    return jobs
+
+
+_runner: JobRunner | None = None
+
+
+def start_jobs() -> None:
+    global _runner
+    if _runner is not None or not settings.jobs_enabled:
+        return
+    _runner = JobRunner(default_jobs(), default_lock(), jitter=settings.jobs_jitter)
+    _runner.start()
+    logger.info("job runner started (%s leader lock)", _runner.lock.kind)
+
+
+def stop_jobs() -> None:
+    global _runner
+    if _runner is not None:
+        _runner.stop()
+        _runner = None
+
+
+def status() -> dict:
+    runner = _runner
+    if runner is None:
+        return {"enabled": False, "leader_lock": None, "jobs": []}
+    return {"enabled": True, "leader_lock": runner.lock.kind, "jobs": runner.status()}
@@ -1,26 +1,97 @@
 from __future__ import annotations
 
+import logging
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.api.routers import charges, escrow, ledger, orders, settings, webhooks
-from app.db import SessionLocal
-from app.services import webhooks_service
+from app import db_profiler, jobs
+from app.api.admission import AdmissionMiddleware
+from app.api.async_routing import asyncify_router
+from app.api.routers import charges, escrow, events, ledger, metrics, orders, pix, settings, system, webhooks
+from app.db import SessionLocal, get_engine
+from app.metrics import MetricsMiddleware
+from app.services import pix_inbox_service, webhook_endpoint_resolver, webhooks_service
+from app.settings import async_db_enabled, settings as app_settings
+from app.tracing import TracingMiddleware
+from app.traffic_capture import TrafficCaptureMiddleware
+
+logger = logging.getLogger(__name__)
+
+ROUTERS = [
+    orders.router,
+    charges.router,
+    escrow.router,
+    ledger.router,
+    webhooks.router,
+    events.router,
+    settings.router,
+    pix.router,
+    system.router,
+    metrics.router,
+]
 
-app = FastAPI(title="Escrow Pix API", version="0.1.0")
 
-app.include_router(orders.router)
-app.include_router(charges.router)
-app.include_router(escrow.router)
-app.include_router(ledger.router)
-app.include_router(webhooks.router)
-app.include_router(settings.router)
+def include_routers(target: FastAPI) -> None:
+    # Done at import so the routes exist even when lifespan never runs
+    # (--lifespan off, mounted as a sub-app). Only ASYNC_DB is read here;
+    # the rest of the environment is still loaded on first use.
+    if getattr(target.state, "routers_included", False):
+        return
+    for router in ROUTERS:
+        target.include_router(asyncify_router(router) if async_db_enabled() else router)
+    target.state.routers_included = True
 
 
-@app.on_event("startup")
-def ensure_webhook_subscription():
+def ensure_webhook_subscription() -> None:
     db = SessionLocal()
     try:
         with db.begin():
             webhooks_service.ensure_default_subscription(db)
     finally:
         db.close()
+
+
+def warm_up(target: FastAPI) -> None:
+    """Startup work that must not hold back readiness."""
+    steps = (
+        ("webhook subscription", ensure_webhook_subscription),
+        ("webhook endpoint", webhook_endpoint_resolver.refresh),
+        ("database pool", lambda: get_engine().connect().close()),
+        ("openapi schema", target.openapi),
+    )
+    for name, step in steps:
+        try:
+            step()
+        except Exception:
+            logger.exception("startup warm-up step failed: %s", name)
+
+
+@asynccontextmanager
+async def lifespan(target: FastAPI):
+    if app_settings.startup_warmup == "blocking":
+        warm_up(target)
+    elif app_settings.startup_warmup == "background":
+        threading.Thread(target=warm_up, args=(target,), name="startup-warmup", daemon=True).start()
+    pix_inbox_service.start_workers()
+    jobs.start_jobs()
+    webhook_endpoint_resolver.start_refresher()
+    try:
+        yield
+    finally:
+        webhook_endpoint_resolver.stop_refresher()
+        jobs.stop_jobs()
+        pix_inbox_service.stop_workers()
+
+
+app = FastAPI(title="Escrow Pix API", version="0.1.0", lifespan=lifespan)
+include_routers(app)
+db_profiler.install()
+app.add_middleware(db_profiler.SQLProfilerMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(AdmissionMiddleware)
+# Outside admission so shed and rate-limited requests are part of the load shape.
+app.add_middleware(TrafficCaptureMiddleware)
+# Added last so it is outermost and also counts shed and rate-limited requests.
+app.add_middleware(MetricsMiddleware)
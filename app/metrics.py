@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+# Upper bounds in seconds; the last bucket is +Inf.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Business events counted by the services, with their help text.
+EVENTS = {
+    "orders_created": "Orders created.",
+    "charges_paid": "Pix charges confirmed as paid.",
+    "orders_released": "Orders released to the merchant.",
+    "orders_refunded": "Orders refunded to the customer.",
+}
+
+
+class _Shard:
+    """Counters written by a single thread, so updates need no lock."""
+
+    __slots__ = ("thread", "requests", "latency", "events")
+
+    def __init__(self, thread: threading.Thread | None = None) -> None:
+        self.thread = thread
+        # (method, route, status) -> count
+        self.requests: dict[tuple[str, str, int], int] = {}
+        # (method, route) -> [bucket counts..., +Inf count, sum of seconds]
+        self.latency: dict[tuple[str, str], list] = {}
+        self.events: dict[str, int] = {}
+
+
+_local = threading.local()
+_shards: list[_Shard] = []
+# Totals of shards whose thread has exited, folded in at scrape time.
+_retired = _Shard()
+_shards_lock = threading.Lock()
+
+
+def _shard() -> _Shard:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _Shard(threading.current_thread())
+        with _shards_lock:
+            _shards.append(shard)
+        _local.shard = shard
+    return shard
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    shard = _shard()
+    key = (method, route, status)
+    shard.requests[key] = shard.requests.get(key, 0) + 1
+    histogram = shard.latency.get((method, route))
+    if histogram is None:
+        histogram = shard.latency[(method, route)] = [0] * (len(LATENCY_BUCKETS) + 2)
+    histogram[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    histogram[-1] += seconds
+
+
+def increment(event: str, amount: int = 1) -> None:
+    events = _shard().events
+    events[event] = events.get(event, 0) + amount
+
+
+def increment_on_commit(db: Session, event: str, amount: int = 1) -> None:
+    """Count a business event once the caller's transaction commits; a rollback drops it."""
+    transaction = db.get_nested_transaction() or db.get_transaction()
+    db.info.setdefault("pending_metrics", []).append((transaction, event, amount))
+
+
+def _within(transaction, ancestor) -> bool:
+    while transaction is not None:
+        if transaction is ancestor:
+            return True
+        transaction = transaction.parent
+    return False
+
+
+def _after_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        # Releasing a savepoint; count on the real commit.
+        return
+    for _, event, amount in session.info.pop("pending_metrics", ()):
+        increment(event, amount)
+
+
+def _after_soft_rollback(session: Session, previous_transaction) -> None:
+    pending = session.info.get("pending_metrics")
+    if pending:
+        session.info["pending_metrics"] = [
+            entry for entry in pending if not _within(entry[0], previous_transaction)
+        ]
+
+
+def _after_transaction_end(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("pending_metrics", None)
+
+
+sa_event.listen(Session, "after_commit", _after_commit)
+sa_event.listen(Session, "after_soft_rollback", _after_soft_rollback)
+sa_event.listen(Session, "after_transaction_end", _after_transaction_end)
+
+
+def reset() -> None:
+    with _shards_lock:
+        for shard in [*_shards, _retired]:
+            shard.requests.clear()
+            shard.latency.clear()
+            shard.events.clear()
+
+
+def _merge(shard: _Shard, requests: dict, latency: dict, events: dict) -> None:
+    # Copies first: the owning thread may add keys while we iterate.
+    for key, count in list(shard.requests.items()):
+        requests[key] = requests.get(key, 0) + count
+    for key, histogram in list(shard.latency.items()):
+        total = latency.setdefault(key, [0] * len(histogram))
+        for index, value in enumerate(list(histogram)):
+            total[index] += value
+    for key, count in list(shard.events.items()):
+        events[key] = events.get(key, 0) + count
+
+
+def snapshot() -> tuple[dict, dict, dict]:
+    """Sum every shard: (requests, latency histograms, events)."""
+    with _shards_lock:
+        for shard in [shard for shard in _shards if not shard.thread.is_alive()]:
+            _merge(shard, _retired.requests, _retired.latency, _retired.events)
+            _shards.remove(shard)
+        shards = [*_shards, _retired]
+        requests: dict = {}
+        latency: dict = {}
+        events: dict = dict.fromkeys(EVENTS, 0)
+        for shard in shards:
+            _merge(shard, requests, latency, events)
+    return requests, latency, events
+
+
+def _labels(**labels) -> str:
+    parts = []
+    for name, value in labels.items():
+        text = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{text}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _bound(value: float) -> str:
+    return repr(value) if value != int(value) else f"{value:.1f}"
+
+
+def render(gauges: dict[str, tuple[str, dict[tuple, float]]] | None = None) -> str:
+    """Prometheus text exposition of everything collected so far.
+
+    ``gauges`` maps a metric name to ``(help, {label tuples: value})`` for
+    values read at scrape time (pool stats, queue depth).
+    """
+    requests, latency, events = snapshot()
+    lines = [
+        "# HELP ventra_http_requests_total HTTP requests by route and status code.",
+        "# TYPE ventra_http_requests_total counter",
+    ]
+    for (method, route, status), count in sorted(requests.items()):
+        lines.append(f"ventra_http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines.append("# HELP ventra_http_request_duration_seconds HTTP request latency by route.")
+    lines.append("# TYPE ventra_http_request_duration_seconds histogram")
+    for (method, route), histogram in sorted(latency.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), histogram[:-1]):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _bound(bound)
+            bucket_labels = _labels(method=method, route=route, le=le)
+            lines.append(f"ventra_http_request_duration_seconds_bucket{bucket_labels} {cumulative}")
+        labels = _labels(method=method, route=route)
+        lines.append(f"ventra_http_request_duration_seconds_sum{labels} {histogram[-1]:.6f}")
+        lines.append(f"ventra_http_request_duration_seconds_count{labels} {cumulative}")
+
+    for event, help_text in EVENTS.items():
+        name = f"ventra_{event}_total"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {events.get(event, 0)}")
+
+    for name, (help_text, samples) in (gauges or {}).items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples.items():
+            lines.append(f"{name}{_labels(**dict(labels)) if labels else ''} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and counts it by route template and status.
+
+    The route label is the matched path template (``/orders/{order_id}``),
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            observe_request(
+                scope["method"],
+                getattr(route, "path", None) or "unmatched",
+                status,
+                time.perf_counter() - start,
+            )
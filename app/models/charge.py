@@ -3,16 +3,21 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, UUID, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, UUID, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db import Base
+from app.domain.ids import uuid7
 
 
 class Charge(Base):
     __tablename__ = "charges"
+    __table_args__ = (
+        Index("ix_charges_order_id_created_at", "order_id", "created_at"),
+        Index("ux_charges_txid", "txid", unique=True),
+    )
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     order_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("orders.id"), nullable=False)
     status: Mapped[str] = mapped_column(String, nullable=False)
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -24,5 +29,8 @@ class Charge(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
 
     order = relationship("Order", back_populates="charges")
+
+    __mapper_args__ = {"version_id_col": version}
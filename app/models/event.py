@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import JSON
+
+from app.db import Base
+
+
+class Event(Base):
+    """Append-only feed of domain events, read by cursor through ``GET /events``."""
+
+    __tablename__ = "events"
+    # Pruning may empty the table; AUTOINCREMENT keeps SQLite from handing
+    # out a seq a consumer's cursor has already passed.
+    __table_args__ = (UniqueConstraint("id", name="uq_events_id"), {"sqlite_autoincrement": True})
+
+    # SQLite only autoincrements an INTEGER PRIMARY KEY.
+    seq: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    id: Mapped[str] = mapped_column(String, nullable=False)
+    event: Mapped[str] = mapped_column(String, nullable=False)
+    data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String, Text, UUID, func
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import JSON
+
+from app.db import Base
+from app.domain.ids import uuid7
+
+
+class PixNotification(Base):
+    __tablename__ = "pix_notifications"
+    __table_args__ = (
+        Index("ux_pix_notifications_end_to_end_id", "end_to_end_id", unique=True),
+        Index("ix_pix_notifications_status_received_at", "status", "received_at"),
+        Index("ix_pix_notifications_txid", "txid"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    end_to_end_id: Mapped[str] = mapped_column(String, nullable=False)
+    txid: Mapped[str] = mapped_column(String, nullable=False)
+    amount_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    paid_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    received_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -7,15 +7,20 @@ from sqlalchemy import Boolean, DateTime, String, Text, UUID, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db import Base
+from app.domain.enums import WebhookPayloadMode
+from app.domain.ids import uuid7
 
 
 class WebhookSubscription(Base):
     __tablename__ = "webhook_subscriptions"
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     url: Mapped[str] = mapped_column(Text, nullable=False)
     secret: Mapped[str] = mapped_column(String, nullable=False)
     is_enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    payload_mode: Mapped[str] = mapped_column(
+        String, nullable=False, default=WebhookPayloadMode.THIN.value, server_default=WebhookPayloadMode.THIN.value
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
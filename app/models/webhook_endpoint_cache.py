@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class WebhookEndpointCacheEntry(Base):
+    """The VentraSim webhook endpoint last resolved for an env, shared by every worker."""
+
+    __tablename__ = "webhook_endpoint_cache"
+
+    env: Mapped[str] = mapped_column(String, primary_key=True)
+    url: Mapped[str | None] = mapped_column(Text, nullable=True)
+    secret: Mapped[str | None] = mapped_column(String, nullable=True)
+    endpoint_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    updated_at: Mapped[str | None] = mapped_column(String, nullable=True)
+    fetched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    lease_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
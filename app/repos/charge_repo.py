@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, aliased
 
 from app.models.charge import Charge
+from app.tracing import traced
 
 
+@traced()
 def create(db: Session, order_id, status: str, expires_at, pix_emv: str, txid: str) -> Charge:
     charge = Charge(
         order_id=order_id,
@@ -18,15 +20,75 @@ def create(db: Session, order_id, status: str, expires_at, pix_emv: str, txid: s
     return charge
 
 
+@traced()
 def get(db: Session, charge_id) -> Charge | None:
     return db.get(Charge, charge_id)
 
 
-def get_for_update(db: Session, charge_id) -> Charge | None:
-    stmt = select(Charge).where(Charge.id == charge_id).with_for_update()
+@traced()
+def get_by_txid(db: Session, txid: str) -> Charge | None:
+    stmt = select(Charge).where(Charge.txid == txid)
     return db.execute(stmt).scalar_one_or_none()
 
 
-def get_for_order_latest(db: Session, order_id) -> Charge | None:
-    stmt = select(Charge).where(Charge.order_id == order_id).order_by(Charge.created_at.desc())
-    return db.execute(stmt).scalars().first()
+@traced()
+def transition(
+    db: Session,
+    to_status: str,
+    from_statuses,
+    *,
+    charge_id=None,
+    txid: str | None = None,
+    unexpired_at=None,
+    expected_version: int | None = None,
+) -> Charge | None:
+    """Conditionally move a charge (by id or txid) to ``to_status`` in a single UPDATE ... RETURNING.
+
+    With ``unexpired_at`` the update only applies while ``expires_at`` is later
+    than that instant. Returns ``None`` when no row matched.
+    """
+    stmt = update(Charge).where(Charge.status.in_(list(from_statuses)))
+    if charge_id is not None:
+        stmt = stmt.where(Charge.id == charge_id)
+    else:
+        stmt = stmt.where(Charge.txid == txid)
+    if unexpired_at is not None:
+        stmt = stmt.where(Charge.expires_at > unexpired_at)
+    if expected_version is not None:
+        stmt = stmt.where(Charge.version == expected_version)
+    stmt = stmt.values(status=to_status, version=Charge.version + 1).returning(Charge)
+    return db.execute(stmt, execution_options={"synchronize_session": "fetch"}).scalar_one_or_none()
+
+
+@traced()
+def expire_overdue(db: Session, now, pending_status: str, expired_status: str, limit: int) -> int:
+    """Move up to ``limit`` charges still ``pending_status`` past their ``expires_at`` to ``expired_status``."""
+    overdue = (
+        select(Charge.id)
+        .where(Charge.status == pending_status, Charge.expires_at <= now)
+        .order_by(Charge.expires_at)
+        .limit(limit)
+    )
+    ids = list(db.execute(overdue).scalars())
+    if not ids:
+        return 0
+    # Re-checks the status: a payment may have landed since the select.
+    stmt = (
+        update(Charge)
+        .where(Charge.id.in_(ids), Charge.status == pending_status)
+        .values(status=expired_status, version=Charge.version + 1)
+        .returning(Charge.id)
+    )
+    return len(db.execute(stmt, execution_options={"synchronize_session": False}).all())
+
+
+def latest_id_for_order(order_id_column):
+    """Correlated scalar subquery selecting the newest charge id for ``order_id_column``."""
+    candidate = aliased(Charge)
+    return (
+        select(candidate.id)
+        .where(candidate.order_id == order_id_column)
+        .order_by(candidate.created_at.desc(), candidate.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.models.event import Event
+from app.tracing import traced
+
+# Any constant works; it only has to differ from other advisory locks we take.
+EVENT_APPEND_LOCK = 0x56454E54
+
+
+@traced()
+def append(db: Session, rows: list[dict]) -> None:
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        # Sequence values are handed out before commit, so two writers could
+        # commit out of order and a reader would move its cursor past the
+        # slower one. Holding this until commit makes commit order follow
+        # seq order; SQLite already serializes writers. Callers append right
+        # before COMMIT (see events_service), so the lock covers no other work.
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": EVENT_APPEND_LOCK})
+    db.execute(insert(Event), rows)
+
+
+@traced()
+def list_after(db: Session, after: int, limit: int) -> list[Event]:
+    stmt = select(Event).where(Event.seq > after).order_by(Event.seq).limit(limit)
+    return list(db.execute(stmt).scalars().all())
+
+
+@traced()
+def last_seq(db: Session) -> int:
+    return db.execute(select(func.max(Event.seq))).scalar_one() or 0
+
+
+@traced()
+def delete_older_than(db: Session, cutoff, limit: int) -> int:
+    # The oldest rows have the lowest seq, so this walks the primary key.
+    oldest = select(Event.seq).where(Event.created_at < cutoff).order_by(Event.seq).limit(limit)
+    stmt = delete(Event).where(Event.seq.in_(oldest))
+    return db.execute(stmt, execution_options={"synchronize_session": False}).rowcount
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from sqlalchemy import delete, select, tuple_
 from sqlalchemy.orm import Session
 
 from app.models.idempotency import IdempotencyKey
+from app.tracing import traced
 
 
+@traced()
 def get(db: Session, key: str, endpoint: str) -> IdempotencyKey | None:
     stmt = select(IdempotencyKey).where(
         IdempotencyKey.key == key,
@@ -14,6 +16,7 @@ def get(db: Session, key: str, endpoint: str) -> IdempotencyKey | None:
     return db.execute(stmt).scalar_one_or_none()
 
 
+@traced()
 def create(
     db: Session,
     key: str,
@@ -31,3 +34,15 @@ def create(
     )
     db.add(record)
     return record
+
+
+@traced()
+def delete_older_than(db: Session, cutoff, limit: int) -> int:
+    oldest = (
+        select(IdempotencyKey.key, IdempotencyKey.endpoint)
+        .where(IdempotencyKey.created_at < cutoff)
+        .order_by(IdempotencyKey.created_at)
+        .limit(limit)
+    )
+    stmt = delete(IdempotencyKey).where(tuple_(IdempotencyKey.key, IdempotencyKey.endpoint).in_(oldest))
+    return db.execute(stmt, execution_options={"synchronize_session": False}).rowcount
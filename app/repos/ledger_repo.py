@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from sqlalchemy import case, func, select
+from sqlalchemy import case, func, insert, select
 from sqlalchemy.orm import Session
 
 from app.domain.enums import LedgerDirection
 from app.models.ledger import LedgerEntry
+from app.tracing import traced
 
 
+@traced()
 def add_entry(
     db: Session,
     order_id,
@@ -28,11 +30,18 @@ def add_entry(
     return entry
 
 
+@traced()
 def list_by_order(db: Session, order_id) -> list[LedgerEntry]:
-    stmt = select(LedgerEntry).where(LedgerEntry.order_id == order_id).order_by(LedgerEntry.created_at.asc())
+    # Entries of one transaction share created_at; time-ordered ids keep them in insertion order.
+    stmt = (
+        select(LedgerEntry)
+        .where(LedgerEntry.order_id == order_id)
+        .order_by(LedgerEntry.created_at.asc(), LedgerEntry.id.asc())
+    )
     return list(db.execute(stmt).scalars().all())
 
 
+@traced()
 def get_balance_for_account(db: Session, account: str) -> int:
     signed_amount = case(
         (LedgerEntry.direction == LedgerDirection.CREDIT.value, LedgerEntry.amount_cents),
@@ -40,3 +49,11 @@ def get_balance_for_account(db: Session, account: str) -> int:
     )
     stmt = select(func.coalesce(func.sum(signed_amount), 0)).where(LedgerEntry.account == account)
     return int(db.execute(stmt).scalar_one())
+
+
+@traced()
+def add_entries(db: Session, entries: list[dict]) -> None:
+    if not entries:
+        return
+    rows = [{**entry, "meta": entry.get("meta") or {}} for entry in entries]
+    db.execute(insert(LedgerEntry), rows)
@@ -1,21 +1,104 @@
 from __future__ import annotations
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.orm import Session, aliased
 
+from app.models.charge import Charge
 from app.models.order import Order
+from app.repos import charge_repo
+from app.tracing import traced
 
 
+@traced()
 def create(db: Session, amount_cents: int, currency: str) -> Order:
     order = Order(amount_cents=amount_cents, currency=currency, status="CREATED")
     db.add(order)
     return order
 
 
+@traced()
 def get(db: Session, order_id) -> Order | None:
     return db.get(Order, order_id)
 
 
-def get_for_update(db: Session, order_id) -> Order | None:
-    stmt = select(Order).where(Order.id == order_id).with_for_update()
-    return db.execute(stmt).scalar_one_or_none()
+@traced()
+def get_with_latest_charge(db: Session, order_id) -> tuple[Order | None, Charge | None]:
+    stmt = (
+        select(Order, Charge)
+        .outerjoin(Charge, Charge.id == charge_repo.latest_id_for_order(Order.id))
+        .where(Order.id == order_id)
+    )
+    row = db.execute(stmt).first()
+    if row is None:
+        return None, None
+    return row[0], row[1]
+
+
+@traced()
+def list_for_update(db: Session, order_ids) -> list[Order]:
+    # Rows are locked in primary key order so concurrent batches touching
+    # overlapping orders always acquire their locks in the same sequence.
+    stmt = select(Order).where(Order.id.in_(list(order_ids))).order_by(Order.id).with_for_update()
+    return list(db.execute(stmt).scalars().all())
+
+
+@traced()
+def set_status_bulk(db: Session, order_ids, status: str) -> list[Order]:
+    """Set ``status`` on every order in ``order_ids``; returns the updated rows."""
+    stmt = (
+        update(Order)
+        .where(Order.id.in_(list(order_ids)))
+        .values(status=status, version=Order.version + 1)
+        .returning(Order)
+    )
+    return list(db.execute(stmt, execution_options={"synchronize_session": "fetch"}).scalars().all())
+
+
+@traced()
+def transition(db: Session, order_id, to_status: str, from_statuses, expected_version: int | None = None) -> Order | None:
+    """Conditionally move an order to ``to_status`` in a single UPDATE ... RETURNING.
+
+    Returns ``None`` when the order does not exist, is not in one of
+    ``from_statuses`` or (if given) no longer has ``expected_version``.
+    """
+    stmt = update(Order).where(Order.id == order_id, Order.status.in_(list(from_statuses)))
+    if expected_version is not None:
+        stmt = stmt.where(Order.version == expected_version)
+    stmt = stmt.values(status=to_status, version=Order.version + 1).returning(Order)
+    return db.execute(stmt, execution_options={"synchronize_session": "fetch"}).scalar_one_or_none()
+
+
+@traced()
+def list_with_latest_charge(
+    db: Session,
+    *,
+    status: str | None = None,
+    currency: str | None = None,
+    created_from=None,
+    created_to=None,
+    min_amount_cents: int | None = None,
+    max_amount_cents: int | None = None,
+    after_id=None,
+    limit: int = 50,
+) -> list[tuple[Order, Charge | None]]:
+    stmt = select(Order, Charge).outerjoin(Charge, Charge.id == charge_repo.latest_id_for_order(Order.id))
+    if status is not None:
+        stmt = stmt.where(Order.status == status)
+    if currency is not None:
+        stmt = stmt.where(Order.currency == currency)
+    if created_from is not None:
+        stmt = stmt.where(Order.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Order.created_at < created_to)
+    if min_amount_cents is not None:
+        stmt = stmt.where(Order.amount_cents >= min_amount_cents)
+    if max_amount_cents is not None:
+        stmt = stmt.where(Order.amount_cents <= max_amount_cents)
+    if after_id is not None:
+        # The cursor only carries the id; its created_at is read back from the
+        # row itself so the comparison never depends on timestamp formatting.
+        anchor = aliased(Order)
+        anchor_created_at = select(anchor.created_at).where(anchor.id == after_id).scalar_subquery()
+        stmt = stmt.where(tuple_(Order.created_at, Order.id) < tuple_(anchor_created_at, after_id))
+    stmt = stmt.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit)
+    return [(order, charge) for order, charge in db.execute(stmt).all()]
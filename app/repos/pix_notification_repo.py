@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.domain.enums import PixNotificationStatus
+from app.models.pix_notification import PixNotification
+from app.tracing import traced
+
+
+def _upsert_insert(dialect_name: str):
+    # Imported on demand so loading the app does not pull in every dialect.
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        return pg_insert
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        return sqlite_insert
+    return None
+
+
+@traced()
+def insert_new(db: Session, rows: list[dict]) -> int:
+    """Insert inbox rows, skipping end-to-end ids that were already received."""
+    if not rows:
+        return 0
+    dialect_insert = _upsert_insert(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        stmt = (
+            dialect_insert(PixNotification)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["end_to_end_id"])
+            .returning(PixNotification.id)
+        )
+        return len(db.execute(stmt).all())
+
+    known = set(
+        db.execute(
+            select(PixNotification.end_to_end_id).where(
+                PixNotification.end_to_end_id.in_([row["end_to_end_id"] for row in rows])
+            )
+        ).scalars()
+    )
+    fresh = [row for row in rows if row["end_to_end_id"] not in known]
+    if fresh:
+        db.execute(insert(PixNotification), fresh)
+    return len(fresh)
+
+
+@traced()
+def claim_pending(db: Session, limit: int) -> list[PixNotification]:
+    stmt = (
+        select(PixNotification)
+        .where(PixNotification.status == PixNotificationStatus.PENDING.value)
+        .order_by(PixNotification.received_at, PixNotification.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return list(db.execute(stmt).scalars().all())
+
+
+@traced()
+def get_by_end_to_end_id(db: Session, end_to_end_id: str) -> PixNotification | None:
+    stmt = select(PixNotification).where(PixNotification.end_to_end_id == end_to_end_id)
+    return db.execute(stmt).scalar_one_or_none()
+
+
+@traced()
+def record_failed_attempt(db: Session, ids, error: str, max_attempts: int) -> None:
+    """Count an attempt whose batch rolled back; rows out of attempts are marked FAILED."""
+    stmt = (
+        update(PixNotification)
+        .where(PixNotification.id.in_(list(ids)), PixNotification.status == PixNotificationStatus.PENDING.value)
+        .values(
+            attempts=PixNotification.attempts + 1,
+            last_error=error,
+            status=case(
+                (PixNotification.attempts + 1 >= max_attempts, PixNotificationStatus.FAILED.value),
+                else_=PixNotification.status,
+            ),
+        )
+    )
+    db.execute(stmt, execution_options={"synchronize_session": False})
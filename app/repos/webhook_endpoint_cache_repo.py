@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.webhook_endpoint_cache import WebhookEndpointCacheEntry
+from app.tracing import traced
+
+
+@traced()
+def get(db: Session, env: str) -> WebhookEndpointCacheEntry | None:
+    stmt = select(WebhookEndpointCacheEntry).where(WebhookEndpointCacheEntry.env == env)
+    return db.execute(stmt).scalar_one_or_none()
+
+
+@traced()
+def upsert(db: Session, env: str, values: dict) -> None:
+    stmt = update(WebhookEndpointCacheEntry).where(WebhookEndpointCacheEntry.env == env).values(**values)
+    if db.execute(stmt).rowcount == 0:
+        db.execute(insert(WebhookEndpointCacheEntry).values(env=env, **values))
+
+
+@traced()
+def take_lease(db: Session, env: str, now: datetime, until: datetime) -> bool:
+    """Claim the fetch lease if it is free or expired; raises IntegrityError if another worker created the row first."""
+    stmt = (
+        update(WebhookEndpointCacheEntry)
+        .where(
+            WebhookEndpointCacheEntry.env == env,
+            or_(WebhookEndpointCacheEntry.lease_until.is_(None), WebhookEndpointCacheEntry.lease_until < now),
+        )
+        .values(lease_until=until)
+    )
+    if db.execute(stmt).rowcount:
+        return True
+    if get(db, env) is not None:
+        return False
+    db.execute(insert(WebhookEndpointCacheEntry).values(env=env, lease_until=until))
+    return True
+
+
+@traced()
+def release_lease(db: Session, env: str) -> None:
+    stmt = update(WebhookEndpointCacheEntry).where(WebhookEndpointCacheEntry.env == env).values(lease_until=None)
+    db.execute(stmt)
+
+
+@traced()
+def clear(db: Session, env: str) -> None:
+    # Keep the row (and any lease on it) so an in-flight fetch is not duplicated.
+    stmt = (
+        update(WebhookEndpointCacheEntry)
+        .where(WebhookEndpointCacheEntry.env == env)
+        .values(url=None, secret=None, endpoint_id=None, updated_at=None, fetched_at=None)
+    )
+    db.execute(stmt)
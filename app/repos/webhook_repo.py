@@ -4,19 +4,38 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.models.webhook import WebhookSubscription
+from app.tracing import traced
 
 
+@traced()
+def list_all(db: Session) -> list[WebhookSubscription]:
+    stmt = select(WebhookSubscription).order_by(WebhookSubscription.created_at, WebhookSubscription.id)
+    return list(db.execute(stmt).scalars().all())
+
+
+@traced()
+def get(db: Session, subscription_id) -> WebhookSubscription | None:
+    return db.get(WebhookSubscription, subscription_id)
+
+
+@traced()
 def list_enabled(db: Session) -> list[WebhookSubscription]:
     stmt = select(WebhookSubscription).where(WebhookSubscription.is_enabled.is_(True))
     return list(db.execute(stmt).scalars().all())
 
 
+@traced()
 def get_by_url(db: Session, url: str) -> WebhookSubscription | None:
     stmt = select(WebhookSubscription).where(WebhookSubscription.url == url)
     return db.execute(stmt).scalar_one_or_none()
 
 
-def create(db: Session, url: str, secret: str, is_enabled: bool = True) -> WebhookSubscription:
+@traced()
+def create(
+    db: Session, url: str, secret: str, is_enabled: bool = True, payload_mode: str | None = None
+) -> WebhookSubscription:
     sub = WebhookSubscription(url=url, secret=secret, is_enabled=is_enabled)
+    if payload_mode is not None:
+        sub.payload_mode = payload_mode
     db.add(sub)
     return sub
@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+import hashlib
+import hmac
 import json
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -9,34 +14,121 @@ from app.settings import settings
 RUNTIME_DIR = Path(".runtime")
 API_KEY_FILE = RUNTIME_DIR / "api_key.json"
 
+# Rotating keeps the previous keys valid so clients can switch over without
+# downtime; only the newest MAX_ACTIVE_API_KEYS survive.
+MAX_ACTIVE_API_KEYS = 3
+# How often request handlers stat() the key file to pick up edits made by
+# another process. Changes made through set_api_key apply immediately.
+API_KEY_RELOAD_INTERVAL_SECONDS = 1.0
 
-def _read_api_key_file() -> str | None:
-    if not API_KEY_FILE.exists():
+
+@dataclass(frozen=True)
+class _KeyCache:
+    digests: tuple[bytes, ...]
+    mtime_ns: int | None
+    checked_at: float
+
+
+_cache: _KeyCache | None = None
+_lock = threading.Lock()
+
+
+def hash_api_key(value: str) -> str:
+    return hashlib.sha256(value.strip().encode("utf-8")).hexdigest()
+
+
+def _file_mtime_ns() -> int | None:
+    try:
+        return API_KEY_FILE.stat().st_mtime_ns
+    except OSError:
         return None
+
+
+def _read_api_key_file() -> list[str]:
+    """Return the stored key hashes, newest first.
+
+    Files written before keys were hashed hold a single plaintext ``api_key``;
+    it is hashed on read and replaced on the next rotation.
+    """
     try:
         data = json.loads(API_KEY_FILE.read_text(encoding="utf-8"))
     except Exception:
-        return None
-    value = data.get("api_key") if isinstance(data, dict) else None
-    if isinstance(value, str) and value.strip():
-        return value.strip()
-    return None
+        return []
+    if not isinstance(data, dict):
+        return []
+    hashes = []
+    for entry in data.get("keys") or []:
+        digest = entry.get("sha256") if isinstance(entry, dict) else None
+        if isinstance(digest, str) and len(digest) == 64:
+            hashes.append(digest.lower())
+    legacy = data.get("api_key")
+    if not hashes and isinstance(legacy, str) and legacy.strip():
+        hashes.append(hash_api_key(legacy))
+    return hashes
+
+
+def _load() -> _KeyCache:
+    mtime_ns = _file_mtime_ns()
+    hashes = _read_api_key_file() if mtime_ns is not None else []
+    if not hashes:
+        hashes = [hash_api_key(settings.api_key)]
+    return _KeyCache(
+        digests=tuple(bytes.fromhex(value) for value in hashes),
+        mtime_ns=mtime_ns,
+        checked_at=time.monotonic(),
+    )
+
+
+def _active_keys() -> _KeyCache:
+    global _cache
+    cache = _cache
+    now = time.monotonic()
+    if cache is not None and now - cache.checked_at < API_KEY_RELOAD_INTERVAL_SECONDS:
+        return cache
+    with _lock:
+        cache = _cache
+        if cache is None or _file_mtime_ns() != cache.mtime_ns:
+            cache = _load()
+        else:
+            cache = _KeyCache(digests=cache.digests, mtime_ns=cache.mtime_ns, checked_at=now)
+        _cache = cache
+    return cache
+
+
+def reload_api_keys() -> None:
+    global _cache
+    with _lock:
+        _cache = _load()
 
 
-def get_api_key() -> str:
-    runtime_key = _read_api_key_file()
-    return runtime_key or settings.api_key
+def verify_api_key(value: str | None) -> bool:
+    if not value:
+        return False
+    candidate = hashlib.sha256(value.strip().encode("utf-8")).digest()
+    matched = False
+    # Check every active key so timing does not reveal which one matched.
+    for digest in _active_keys().digests:
+        matched |= hmac.compare_digest(candidate, digest)
+    return matched
 
 
-def set_api_key(value: str) -> None:
+def set_api_key(value: str, *, revoke_existing: bool = False) -> None:
+    global _cache
     clean = value.strip()
     if not clean:
         raise ValueError("api_key must not be empty")
-    RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
-    payload = {
-        "api_key": clean,
-        "updated_at": datetime.now(timezone.utc).isoformat(),
-    }
-    temp_path = API_KEY_FILE.with_suffix(".tmp")
-    temp_path.write_text(json.dumps(payload, ensure_ascii=True), encoding="utf-8")
-    temp_path.replace(API_KEY_FILE)
+    now = datetime.now(timezone.utc).isoformat()
+    with _lock:
+        new_hash = hash_api_key(clean)
+        previous = [] if revoke_existing else [digest.hex() for digest in _load().digests]
+        hashes = [new_hash] + [digest for digest in previous if digest != new_hash]
+        hashes = hashes[:MAX_ACTIVE_API_KEYS]
+        payload = {
+            "keys": [{"sha256": digest} for digest in hashes],
+            "updated_at": now,
+        }
+        RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
+        temp_path = API_KEY_FILE.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(payload, ensure_ascii=True), encoding="utf-8")
+        temp_path.replace(API_KEY_FILE)
+        _cache = _load()
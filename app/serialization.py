@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def isoformat(value: datetime | None) -> str | None:
+    """ISO 8601 in the same shape pydantic emits (``Z`` for UTC)."""
+    if value is None:
+        return None
+    text = value.isoformat()
+    if text.endswith("+00:00"):
+        return text[:-6] + "Z"
+    return text
+
+
+def order_to_dict(order) -> dict:
+    return {
+        "id": str(order.id),
+        "status": order.status,
+        "amount_cents": order.amount_cents,
+        "currency": order.currency,
+        "created_at": isoformat(order.created_at),
+        "updated_at": isoformat(order.updated_at),
+    }
+
+
+def charge_to_dict(charge) -> dict:
+    return {
+        "id": str(charge.id),
+        "order_id": str(charge.order_id),
+        "status": charge.status,
+        "expires_at": isoformat(charge.expires_at),
+        "pix_emv": charge.pix_emv,
+        "txid": charge.txid,
+    }
+
+
+def ledger_entry_to_dict(entry) -> dict:
+    return {
+        "id": str(entry.id),
+        "order_id": str(entry.order_id),
+        "type": entry.type,
+        "amount_cents": entry.amount_cents,
+        "direction": entry.direction,
+        "account": entry.account,
+        "created_at": isoformat(entry.created_at),
+        "meta": entry.meta,
+    }
+
+
+def ledger_leg_to_dict(entry) -> dict:
+    """A ledger entry written in the current transaction, before flush assigns its id and timestamp.
+
+    Takes the ORM object from ``ledger_repo.add_entry`` or a row dict passed to
+    ``ledger_repo.add_entries``.
+    """
+    get = entry.get if isinstance(entry, dict) else lambda name: getattr(entry, name)
+    return {
+        "order_id": str(get("order_id")),
+        "type": get("type"),
+        "amount_cents": get("amount_cents"),
+        "direction": get("direction"),
+        "account": get("account"),
+        "meta": get("meta") or {},
+    }
+
+
+def snapshot(*, order=None, charge=None, ledger_entries=()) -> dict:
+    """Resources embedded in fat webhook payloads, from objects the caller already holds."""
+    data = {}
+    if order is not None:
+        data["order"] = order_to_dict(order)
+    if charge is not None:
+        data["charge"] = charge_to_dict(charge)
+    if ledger_entries:
+        data["ledger_entries"] = [ledger_leg_to_dict(entry) for entry in ledger_entries]
+    return data
+
+
+def event_to_dict(event) -> dict:
+    return {
+        "seq": event.seq,
+        "id": event.id,
+        "event": event.event,
+        "data": event.data,
+        "created_at": isoformat(event.created_at),
+    }
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
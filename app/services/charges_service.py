@@ -5,18 +5,22 @@ from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.orm import Session
 
+from app import metrics
 from app.domain.enums import ChargeStatus, LedgerAccount, LedgerDirection, LedgerEntryType, OrderStatus
 from app.domain.errors import InvalidStateError, NotFoundError
-from app.domain.state_machine import ensure_charge_transition, ensure_order_transition
+from app.domain.state_machine import charge_sources, order_sources
 from app.repos import charge_repo, ledger_repo, order_repo
-from app.services import webhooks_service
+from app.serialization import snapshot
+from app.services import pix_brcode, webhooks_service
 from app.settings import settings
+from app.tracing import traced
 
 
 def _now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
 
+@traced()
 def create_pix_charge(db: Session, order_id, background_tasks=None):
     order = order_repo.get(db, order_id)
     if not order:
@@ -25,8 +29,14 @@ def create_pix_charge(db: Session, order_id, background_tasks=None):
         raise InvalidStateError("Order not awaiting payment")
 
     expires_at = _now_utc() + timedelta(minutes=settings.pix_charge_exp_minutes)
-    pix_emv = f"EMV-SANDBOX-{uuid.uuid4().hex}"
-    txid = uuid.uuid4().hex
+    txid = uuid.uuid4().hex[: pix_brcode.MAX_TXID_LENGTH]
+    pix_emv = pix_brcode.build_payload(
+        amount_cents=order.amount_cents,
+        txid=txid,
+        pix_key=settings.pix_key,
+        merchant_name=settings.pix_merchant_name,
+        merchant_city=settings.pix_merchant_city,
+    )
 
     charge = charge_repo.create(
         db,
@@ -45,42 +55,73 @@ def create_pix_charge(db: Session, order_id, background_tasks=None):
         "charge.created",
         {"order_id": str(order_id), "charge_id": str(charge.id)},
         background_tasks,
+        snapshot=snapshot(order=order, charge=charge),
     )
     return charge
 
 
+@traced()
 def simulate_paid(db: Session, charge_id, background_tasks=None):
-    charge = charge_repo.get_for_update(db, charge_id)
-    if not charge:
-        raise NotFoundError("Charge not found")
+    return _confirm_payment(db, charge_id=charge_id, background_tasks=background_tasks)
 
-    order = order_repo.get_for_update(db, charge.order_id)
-    if not order:
-        raise NotFoundError("Order not found")
 
-    if charge.status != ChargeStatus.PENDING.value:
-        raise InvalidStateError("Charge not pending")
+@traced()
+def confirm_payment_by_txid(db: Session, txid: str, amount_cents: int | None = None, background_tasks=None):
+    return _confirm_payment(db, txid=txid, amount_cents=amount_cents, background_tasks=background_tasks)
 
-    now = _now_utc()
-    expires_at = charge.expires_at
-    if expires_at.tzinfo is None and now.tzinfo is not None:
-        now = now.replace(tzinfo=None)
 
-    if now > expires_at:
-        ensure_charge_transition(ChargeStatus.PENDING, ChargeStatus.EXPIRED)
-        charge.status = ChargeStatus.EXPIRED.value
-        return order, charge, True
+@traced()
+def get_charge_by_txid(db: Session, txid: str):
+    charge = charge_repo.get_by_txid(db, txid)
+    if not charge:
+        raise NotFoundError("Charge not found")
+    return charge
 
-    if order.status != OrderStatus.AWAITING_PAYMENT.value:
-        raise InvalidStateError("Order not awaiting payment")
 
-    ensure_charge_transition(ChargeStatus.PENDING, ChargeStatus.PAID)
-    ensure_order_transition(OrderStatus.AWAITING_PAYMENT, OrderStatus.PAID_IN_ESCROW)
+def _load_charge(db: Session, charge_id=None, txid: str | None = None):
+    if charge_id is not None:
+        return charge_repo.get(db, charge_id)
+    return charge_repo.get_by_txid(db, txid)
+
+
+@traced()
+def _confirm_payment(
+    db: Session,
+    *,
+    charge_id=None,
+    txid: str | None = None,
+    amount_cents: int | None = None,
+    background_tasks=None,
+):
+    # Each transition is a conditional UPDATE ... RETURNING: the row is only
+    # touched if it is still in a state the state machine allows, so no row
+    # lock is held between reading the state and writing the new one. Any
+    # error raised after the charge update rolls it back with the transaction.
+    charge = charge_repo.transition(
+        db,
+        ChargeStatus.PAID.value,
+        _values(charge_sources(ChargeStatus.PAID)),
+        charge_id=charge_id,
+        txid=txid,
+        unexpired_at=_now_utc(),
+    )
+    if charge is None:
+        return _explain_unpaid_charge(db, charge_id=charge_id, txid=txid)
 
-    charge.status = ChargeStatus.PAID.value
-    order.status = OrderStatus.PAID_IN_ESCROW.value
+    order = order_repo.transition(
+        db,
+        charge.order_id,
+        OrderStatus.PAID_IN_ESCROW.value,
+        _values(order_sources(OrderStatus.PAID_IN_ESCROW)),
+    )
+    if order is None:
+        if order_repo.get(db, charge.order_id) is None:
+            raise NotFoundError("Order not found")
+        raise InvalidStateError("Order not awaiting payment")
+    if amount_cents is not None and amount_cents != order.amount_cents:
+        raise InvalidStateError("Paid amount does not match order")
 
-    ledger_repo.add_entry(
+    payment_leg = ledger_repo.add_entry(
         db,
         order_id=order.id,
         entry_type=LedgerEntryType.PAYMENT_CONFIRMED.value,
@@ -89,7 +130,7 @@ def simulate_paid(db: Session, charge_id, background_tasks=None):
         account=LedgerAccount.CUSTOMER.value,
         meta={"charge_id": str(charge.id)},
     )
-    ledger_repo.add_entry(
+    escrow_leg = ledger_repo.add_entry(
         db,
         order_id=order.id,
         entry_type=LedgerEntryType.ESCROW_HELD.value,
@@ -99,27 +140,59 @@ def simulate_paid(db: Session, charge_id, background_tasks=None):
         meta={"charge_id": str(charge.id)},
     )
 
+    resources = snapshot(order=order, charge=charge, ledger_entries=[payment_leg, escrow_leg])
     webhooks_service.emit_event(
         db,
         "charge.paid",
         {"order_id": str(order.id), "charge_id": str(charge.id)},
         background_tasks,
+        snapshot=resources,
     )
     webhooks_service.emit_event(
         db,
         "order.paid_in_escrow",
         {"order_id": str(order.id)},
         background_tasks,
+        snapshot=resources,
     )
+    metrics.increment_on_commit(db, "charges_paid")
     return order, charge, False
 
 
-def cancel_charge(db: Session, charge_id):
-    charge = charge_repo.get(db, charge_id)
+def _explain_unpaid_charge(db: Session, *, charge_id=None, txid: str | None = None):
+    """Work out why the PAID transition matched no row; expire the charge if that is why."""
+    charge = _load_charge(db, charge_id=charge_id, txid=txid)
     if not charge:
         raise NotFoundError("Charge not found")
     if charge.status != ChargeStatus.PENDING.value:
         raise InvalidStateError("Charge not pending")
-    ensure_charge_transition(ChargeStatus.PENDING, ChargeStatus.CANCELED)
-    charge.status = ChargeStatus.CANCELED.value
+
+    expired = charge_repo.transition(
+        db,
+        ChargeStatus.EXPIRED.value,
+        _values(charge_sources(ChargeStatus.EXPIRED)),
+        charge_id=charge.id,
+        expected_version=charge.version,
+    )
+    if expired is None:
+        raise InvalidStateError("Charge not pending")
+    return order_repo.get(db, expired.order_id), expired, True
+
+
+@traced()
+def cancel_charge(db: Session, charge_id):
+    charge = charge_repo.transition(
+        db,
+        ChargeStatus.CANCELED.value,
+        _values(charge_sources(ChargeStatus.CANCELED)),
+        charge_id=charge_id,
+    )
+    if charge is None:
+        if not charge_repo.get(db, charge_id):
+            raise NotFoundError("Charge not found")
+        raise InvalidStateError("Charge not pending")
     return charge
+
+
+def _values(statuses) -> list[str]:
+    return [status.value for status in statuses]
@@ -1,27 +1,42 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+
 from sqlalchemy.orm import Session
 
+from app import metrics
 from app.domain.enums import LedgerAccount, LedgerDirection, LedgerEntryType, OrderStatus
 from app.domain.errors import InvalidStateError, NotFoundError
-from app.domain.state_machine import ensure_order_transition
+from app.domain.state_machine import ensure_order_transition, order_sources
 from app.repos import ledger_repo, order_repo
+from app.serialization import snapshot
 from app.services import webhooks_service
+from app.tracing import traced
 
 
-def release_order(db: Session, order_id, background_tasks=None):
-    order = order_repo.get_for_update(db, order_id)
-    if not order:
+def _transition(db: Session, order_id, target: OrderStatus):
+    order = order_repo.transition(
+        db,
+        order_id,
+        target.value,
+        [status.value for status in order_sources(target)],
+    )
+    if order is not None:
+        return order
+
+    current = order_repo.get(db, order_id)
+    if not current:
         raise NotFoundError("Order not found")
-    if order.status == OrderStatus.DISPUTED.value:
+    if target == OrderStatus.RELEASED and current.status == OrderStatus.DISPUTED.value:
         raise InvalidStateError("Order disputed")
-    if order.status != OrderStatus.PAID_IN_ESCROW.value:
-        raise InvalidStateError("Order not paid in escrow")
+    raise InvalidStateError("Order not paid in escrow")
+
 
-    ensure_order_transition(OrderStatus.PAID_IN_ESCROW, OrderStatus.RELEASED)
-    order.status = OrderStatus.RELEASED.value
+@traced()
+def release_order(db: Session, order_id, background_tasks=None):
+    order = _transition(db, order_id, OrderStatus.RELEASED)
 
-    ledger_repo.add_entry(
+    debit = ledger_repo.add_entry(
         db,
         order_id=order.id,
         entry_type=LedgerEntryType.RELEASED_TO_MERCHANT.value,
@@ -30,7 +45,7 @@ def release_order(db: Session, order_id, background_tasks=None):
         account=LedgerAccount.ESCROW.value,
         meta={},
     )
-    ledger_repo.add_entry(
+    credit = ledger_repo.add_entry(
         db,
         order_id=order.id,
         entry_type=LedgerEntryType.RELEASED_TO_MERCHANT.value,
@@ -45,21 +60,17 @@ def release_order(db: Session, order_id, background_tasks=None):
         "order.released",
         {"order_id": str(order.id)},
         background_tasks,
+        snapshot=snapshot(order=order, ledger_entries=[debit, credit]),
     )
+    metrics.increment_on_commit(db, "orders_released")
     return order
 
 
+@traced()
 def refund_order(db: Session, order_id, background_tasks=None):
-    order = order_repo.get_for_update(db, order_id)
-    if not order:
-        raise NotFoundError("Order not found")
-    if order.status != OrderStatus.PAID_IN_ESCROW.value:
-        raise InvalidStateError("Order not paid in escrow")
+    order = _transition(db, order_id, OrderStatus.REFUNDED)
 
-    ensure_order_transition(OrderStatus.PAID_IN_ESCROW, OrderStatus.REFUNDED)
-    order.status = OrderStatus.REFUNDED.value
-
-    ledger_repo.add_entry(
+    debit = ledger_repo.add_entry(
         db,
         order_id=order.id,
         entry_type=LedgerEntryType.REFUNDED_TO_CUSTOMER.value,
@@ -68,7 +79,7 @@ def refund_order(db: Session, order_id, background_tasks=None):
         account=LedgerAccount.ESCROW.value,
         meta={},
     )
-    ledger_repo.add_entry(
+    credit = ledger_repo.add_entry(
         db,
         order_id=order.id,
         entry_type=LedgerEntryType.REFUNDED_TO_CUSTOMER.value,
@@ -83,5 +94,120 @@ def refund_order(db: Session, order_id, background_tasks=None):
         "order.refunded",
         {"order_id": str(order.id)},
         background_tasks,
+        snapshot=snapshot(order=order, ledger_entries=[debit, credit]),
     )
+    metrics.increment_on_commit(db, "orders_refunded")
     return order
+
+
+@dataclass(frozen=True)
+class SettlementResult:
+    order_id: object
+    ok: bool
+    status: str | None = None
+    error: str | None = None
+
+
+def release_orders(db: Session, order_ids, background_tasks=None) -> list[SettlementResult]:
+    return _settle_orders(
+        db,
+        order_ids,
+        target=OrderStatus.RELEASED,
+        entry_type=LedgerEntryType.RELEASED_TO_MERCHANT,
+        credit_account=LedgerAccount.MERCHANT,
+        event="order.released",
+        background_tasks=background_tasks,
+    )
+
+
+def refund_orders(db: Session, order_ids, background_tasks=None) -> list[SettlementResult]:
+    return _settle_orders(
+        db,
+        order_ids,
+        target=OrderStatus.REFUNDED,
+        entry_type=LedgerEntryType.REFUNDED_TO_CUSTOMER,
+        credit_account=LedgerAccount.CUSTOMER,
+        event="order.refunded",
+        background_tasks=background_tasks,
+    )
+
+
+@traced()
+def _settle_orders(
+    db: Session,
+    order_ids,
+    *,
+    target: OrderStatus,
+    entry_type: LedgerEntryType,
+    credit_account: LedgerAccount,
+    event: str,
+    background_tasks=None,
+) -> list[SettlementResult]:
+    ensure_order_transition(OrderStatus.PAID_IN_ESCROW, target)
+    requested = list(dict.fromkeys(order_ids))
+    orders = {order.id: order for order in order_repo.list_for_update(db, requested)}
+
+    results: list[SettlementResult] = []
+    settled = []
+    for order_id in requested:
+        order = orders.get(order_id)
+        if not order:
+            results.append(SettlementResult(order_id=order_id, ok=False, error="Order not found"))
+            continue
+        if target == OrderStatus.RELEASED and order.status == OrderStatus.DISPUTED.value:
+            results.append(
+                SettlementResult(order_id=order_id, ok=False, status=order.status, error="Order disputed")
+            )
+            continue
+        if order.status != OrderStatus.PAID_IN_ESCROW.value:
+            results.append(
+                SettlementResult(
+                    order_id=order_id, ok=False, status=order.status, error="Order not paid in escrow"
+                )
+            )
+            continue
+        settled.append(order)
+        results.append(SettlementResult(order_id=order_id, ok=True, status=target.value))
+
+    if not settled:
+        return results
+
+    updated = order_repo.set_status_bulk(db, [order.id for order in settled], target.value)
+    updated_by_id = {order.id: order for order in updated}
+    settled = [updated_by_id[order.id] for order in settled]
+
+    entries = []
+    for order in settled:
+        entries.append(
+            {
+                "order_id": order.id,
+                "type": entry_type.value,
+                "amount_cents": order.amount_cents,
+                "direction": LedgerDirection.DEBIT.value,
+                "account": LedgerAccount.ESCROW.value,
+            }
+        )
+        entries.append(
+            {
+                "order_id": order.id,
+                "type": entry_type.value,
+                "amount_cents": order.amount_cents,
+                "direction": LedgerDirection.CREDIT.value,
+                "account": credit_account.value,
+            }
+        )
+    ledger_repo.add_entries(db, entries)
+
+    webhooks_service.emit_events(
+        db,
+        [(event, {"order_id": str(order.id)}) for order in settled],
+        background_tasks,
+        snapshots=[
+            snapshot(order=order, ledger_entries=entries[2 * index : 2 * index + 2])
+            for index, order in enumerate(settled)
+        ],
+    )
+    metrics.increment_on_commit(
+        db, "orders_released" if target == OrderStatus.RELEASED else "orders_refunded", len(settled)
+    )
+    return results
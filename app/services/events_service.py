@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db import ReadSessionLocal
+from app.repos import event_repo
+from app.serialization import event_to_dict
+from app.settings import settings
+from app.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+
+class _Feed:
+    """Wakes long-polls and streams in this process when events are committed.
+
+    Other workers' events are picked up by polling every
+    EVENTS_POLL_INTERVAL_SECONDS, so this is only a latency shortcut.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.version = 0
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def notify(self) -> None:
+        with self._lock:
+            self.version += 1
+            waiters = list(self._waiters)
+        for loop, woken in waiters:
+            try:
+                loop.call_soon_threadsafe(woken.set)
+            except RuntimeError:
+                # The waiter's loop has been closed.
+                pass
+
+    async def wait(self, version: int, timeout: float) -> None:
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self.version != version:
+                return
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+_feed = _Feed()
+
+
+def _within(transaction, ancestor) -> bool:
+    while transaction is not None:
+        if transaction is ancestor:
+            return True
+        transaction = transaction.parent
+    return False
+
+
+def _before_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        # Releasing a savepoint; the rows wait for the real commit.
+        return
+    pending = session.info.pop("pending_events", None)
+    if not pending:
+        return
+    # Flush first so every row lock the transaction needs is taken before
+    # the feed's append lock; after it only the COMMIT follows.
+    session.flush()
+    event_repo.append(session, [row for _, rows in pending for row in rows])
+    session.info["events_appended"] = True
+
+
+def _after_commit(session: Session) -> None:
+    if session.info.pop("events_appended", False):
+        _feed.notify()
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("events_appended", None)
+
+
+def _after_soft_rollback(session: Session, previous_transaction) -> None:
+    pending = session.info.get("pending_events")
+    if pending:
+        # Events appended inside a rolled-back savepoint never happened.
+        session.info["pending_events"] = [
+            (transaction, rows) for transaction, rows in pending if not _within(transaction, previous_transaction)
+        ]
+
+
+def _after_transaction_end(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("pending_events", None)
+
+
+sa_event.listen(Session, "before_commit", _before_commit)
+sa_event.listen(Session, "after_commit", _after_commit)
+sa_event.listen(Session, "after_rollback", _after_rollback)
+sa_event.listen(Session, "after_soft_rollback", _after_soft_rollback)
+sa_event.listen(Session, "after_transaction_end", _after_transaction_end)
+
+
+@traced()
+def append(db: Session, payloads: list[dict]) -> None:
+    """Add webhook payloads to the event feed when the caller's transaction commits.
+
+    The rows are written as the last statement before COMMIT, so on
+    Postgres the feed's append lock is never held while the transaction
+    goes on to lock rows or wait on anything else.
+    """
+    rows = [
+        {
+            "id": payload["id"],
+            "event": payload["event"],
+            "data": payload["data"],
+            "created_at": datetime.fromisoformat(payload["created_at"]),
+        }
+        for payload in payloads
+    ]
+    transaction = db.get_nested_transaction() or db.get_transaction()
+    db.info.setdefault("pending_events", []).append((transaction, rows))
+
+
+def read_after(after: int, limit: int) -> list[dict]:
+    db = ReadSessionLocal()
+    try:
+        return [event_to_dict(row) for row in event_repo.list_after(db, after, limit)]
+    finally:
+        db.close()
+
+
+async def fetch(after: int, limit: int, wait: float = 0.0) -> list[dict]:
+    """Events after the cursor; with ``wait``, hold the call until one arrives or time runs out."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while True:
+        version = _feed.version
+        events = await run_in_threadpool(read_after, after, limit)
+        remaining = deadline - loop.time()
+        if events or remaining <= 0:
+            return events
+        await _feed.wait(version, min(remaining, settings.events_poll_interval_seconds))
@@ -2,11 +2,15 @@ from __future__ import annotations
 
 from sqlalchemy.orm import Session
 
+from app import metrics
 from app.domain.enums import OrderStatus
+from app.domain.errors import DomainError
 from app.domain.state_machine import ensure_order_transition
-from app.repos import order_repo, charge_repo
+from app.repos import order_repo
+from app.tracing import traced
 
 
+@traced()
 def create_order(db: Session, amount_cents: int, currency: str):
     order = order_repo.create(db, amount_cents=amount_cents, currency=currency)
     ensure_order_transition(OrderStatus.CREATED, OrderStatus.AWAITING_PAYMENT)
@@ -14,12 +18,24 @@ def create_order(db: Session, amount_cents: int, currency: str):
     # Ensure INSERT runs so defaults (id/timestamps) are available for responses/events.
     db.flush()
     db.refresh(order)
+    metrics.increment_on_commit(db, "orders_created")
     return order
 
 
+@traced()
 def get_order_with_charge(db: Session, order_id):
-    order = order_repo.get(db, order_id)
-    if not order:
-        return None, None
-    charge = charge_repo.get_for_order_latest(db, order_id)
-    return order, charge
+    return order_repo.get_with_latest_charge(db, order_id)
+
+
+@traced()
+def list_orders(db: Session, *, limit: int, cursor=None, **filters):
+    # An unknown cursor would compare against NULL and yield an empty page,
+    # which reads as the end of the listing.
+    if cursor is not None and order_repo.get(db, cursor) is None:
+        raise DomainError("Invalid cursor")
+    rows = order_repo.list_with_latest_charge(db, after_id=cursor, limit=limit + 1, **filters)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1][0].id
+    return rows, next_cursor
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import binascii
+import unicodedata
+from functools import lru_cache
+
+GUI_PIX = "br.gov.bcb.pix"
+MAX_TXID_LENGTH = 25
+MAX_MERCHANT_NAME_LENGTH = 25
+MAX_MERCHANT_CITY_LENGTH = 15
+CRC_INIT = 0xFFFF
+CRC_FIELD_PREFIX = "6304"
+
+
+def crc16_ccitt(data: bytes, crc: int = CRC_INIT) -> int:
+    """CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF), as required by the BR Code spec.
+
+    ``binascii.crc_hqx`` is the stdlib's table-driven implementation of this
+    polynomial. ``crc`` may be a previously computed state so a fixed prefix
+    is only hashed once.
+    """
+    return binascii.crc_hqx(data, crc)
+
+
+def _tlv(tag: str, value: str) -> str:
+    if len(value) > 99:
+        raise ValueError(f"EMV field {tag} is longer than 99 characters")
+    return f"{tag}{len(value):02d}{value}"
+
+
+def _ascii(value: str, max_length: int) -> str:
+    normalized = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    return normalized.strip()[:max_length]
+
+
+@lru_cache(maxsize=64)
+def _template(pix_key: str, merchant_name: str, merchant_city: str) -> tuple[str, int, str]:
+    """Static parts of the payload plus the CRC state after the leading static fields."""
+    merchant_account = _tlv("00", GUI_PIX) + _tlv("01", pix_key)
+    head = (
+        _tlv("00", "01")  # payload format indicator
+        + _tlv("01", "12")  # point of initiation: single use
+        + _tlv("26", merchant_account)
+        + _tlv("52", "0000")  # merchant category code
+        + _tlv("53", "986")  # BRL
+    )
+    middle = (
+        _tlv("58", "BR")
+        + _tlv("59", _ascii(merchant_name, MAX_MERCHANT_NAME_LENGTH))
+        + _tlv("60", _ascii(merchant_city, MAX_MERCHANT_CITY_LENGTH))
+    )
+    return head, crc16_ccitt(head.encode("ascii")), middle
+
+
+def _format_amount(amount_cents: int) -> str:
+    return f"{amount_cents // 100}.{amount_cents % 100:02d}"
+
+
+def build_payload(
+    *,
+    amount_cents: int,
+    txid: str,
+    pix_key: str,
+    merchant_name: str,
+    merchant_city: str,
+) -> str:
+    """Build a Pix BR Code (EMV MPM) payload ready to be rendered as a QR code."""
+    if amount_cents <= 0:
+        raise ValueError("amount_cents must be positive")
+    if not txid.isalnum() or not txid.isascii() or len(txid) > MAX_TXID_LENGTH:
+        raise ValueError(f"txid must be up to {MAX_TXID_LENGTH} ASCII alphanumeric characters")
+
+    head, head_crc, middle = _template(pix_key, merchant_name, merchant_city)
+    amount = _format_amount(amount_cents)
+    tail = f"54{len(amount):02d}{amount}{middle}62{len(txid) + 4:02d}05{len(txid):02d}{txid}{CRC_FIELD_PREFIX}"
+    crc = crc16_ccitt(tail.encode("ascii"), head_crc)
+    return f"{head}{tail}{crc:04X}"
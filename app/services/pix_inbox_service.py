@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.domain.enums import ChargeStatus, PixNotificationStatus
+from app.domain.errors import DomainError
+from app.repos import charge_repo, pix_notification_repo
+from app.services import charges_service
+from app.settings import settings
+from app.tracing import start_trace, traced
+
+logger = logging.getLogger(__name__)
+
+_wakeup = threading.Event()
+_stop = threading.Event()
+_workers: list[threading.Thread] = []
+
+
+class _DeferredTasks:
+    """Collects webhook deliveries so they are only sent after the batch commits."""
+
+    def __init__(self) -> None:
+        self._tasks = []
+
+    def add_task(self, func, *args, **kwargs) -> None:
+        self._tasks.append((func, args, kwargs))
+
+    def run(self) -> None:
+        for func, args, kwargs in self._tasks:
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception("deferred task %s failed", getattr(func, "__name__", func))
+        self._tasks.clear()
+
+
+@traced()
+def ingest(db: Session, notifications: list[dict]) -> tuple[int, int]:
+    """Append notifications to the inbox; returns (accepted, duplicates)."""
+    rows = {}
+    for notification in notifications:
+        rows.setdefault(
+            notification["end_to_end_id"],
+            {
+                "end_to_end_id": notification["end_to_end_id"],
+                "txid": notification["txid"],
+                "amount_cents": notification.get("amount_cents"),
+                "paid_at": notification.get("paid_at"),
+                "payload": notification.get("payload") or {},
+                "status": PixNotificationStatus.PENDING.value,
+                "attempts": 0,
+            },
+        )
+    accepted = pix_notification_repo.insert_new(db, list(rows.values()))
+    return accepted, len(notifications) - accepted
+
+
+def notify_workers() -> None:
+    _wakeup.set()
+
+
+def process_batch(db: Session, batch_size: int, background_tasks=None, claimed: list | None = None) -> int:
+    notifications = pix_notification_repo.claim_pending(db, batch_size)
+    if claimed is not None:
+        claimed.extend(notification.id for notification in notifications)
+    for notification in notifications:
+        # One trace per notification; deliveries it defers keep the trace.
+        with start_trace("pix_inbox.apply", txid=notification.txid):
+            _apply(db, notification, background_tasks)
+    return len(notifications)
+
+
+def _apply(db: Session, notification, background_tasks=None) -> None:
+    notification.attempts += 1
+    notification.processed_at = datetime.now(timezone.utc)
+
+    charge = charge_repo.get_by_txid(db, notification.txid)
+    if charge is not None and charge.status == ChargeStatus.PAID.value:
+        notification.status = PixNotificationStatus.DUPLICATE.value
+        return
+
+    try:
+        with db.begin_nested():
+            _, _, expired = charges_service.confirm_payment_by_txid(
+                db,
+                notification.txid,
+                amount_cents=notification.amount_cents,
+                background_tasks=background_tasks,
+            )
+    except DomainError as exc:
+        if charge is not None:
+            # Rows changed by UPDATE ... RETURNING are not expired by the
+            # savepoint rollback; reload the charge before it is checked again.
+            db.expire(charge)
+        notification.status = PixNotificationStatus.FAILED.value
+        notification.last_error = exc.detail
+        return
+    except Exception as exc:
+        # Unexpected errors may be transient: keep the row PENDING for the
+        # next batch, but give up after PIX_INBOX_MAX_ATTEMPTS so a poison
+        # notification cannot hold up the rows behind it forever.
+        if charge is not None:
+            db.expire(charge)
+        logger.exception("pix notification %s failed (attempt %s)", notification.end_to_end_id, notification.attempts)
+        notification.last_error = f"{type(exc).__name__}: {exc}"
+        if notification.attempts >= settings.pix_inbox_max_attempts:
+            notification.status = PixNotificationStatus.FAILED.value
+        return
+
+    if expired:
+        notification.status = PixNotificationStatus.FAILED.value
+        notification.last_error = "Charge expired"
+        return
+    notification.status = PixNotificationStatus.PROCESSED.value
+
+
+def run_once(batch_size: int | None = None) -> int:
+    deferred = _DeferredTasks()
+    claimed: list = []
+    db = SessionLocal()
+    try:
+        with db.begin():
+            processed = process_batch(db, batch_size or settings.pix_inbox_batch_size, deferred, claimed)
+    except Exception as exc:
+        if claimed:
+            # The rollback also undid the attempts bump; record it on its own
+            # so a batch that keeps failing runs out of attempts.
+            _record_failed_attempt(claimed, f"{type(exc).__name__}: {exc}")
+        raise
+    finally:
+        db.close()
+    deferred.run()
+    return processed
+
+
+def _record_failed_attempt(ids: list, error: str) -> None:
+    db = SessionLocal()
+    try:
+        with db.begin():
+            pix_notification_repo.record_failed_attempt(db, ids, error, settings.pix_inbox_max_attempts)
+    except Exception:
+        logger.exception("could not record failed pix inbox attempt")
+    finally:
+        db.close()
+
+
+def _worker_loop() -> None:
+    while not _stop.is_set():
+        try:
+            processed = run_once()
+        except Exception:
+            logger.exception("pix inbox batch failed")
+            processed = 0
+        if processed == 0:
+            _wakeup.wait(settings.pix_inbox_poll_interval_seconds)
+            _wakeup.clear()
+
+
+def start_workers(count: int | None = None) -> None:
+    count = settings.pix_inbox_workers if count is None else count
+    if _workers or count <= 0:
+        return
+    _stop.clear()
+    for index in range(count):
+        worker = threading.Thread(target=_worker_loop, name=f"pix-inbox-{index}", daemon=True)
+        worker.start()
+        _workers.append(worker)
+    logger.info("started %s pix inbox workers", count)
+
+
+def stop_workers(timeout: float = 5.0) -> None:
+    _stop.set()
+    _wakeup.set()
+    for worker in _workers:
+        worker.join(timeout)
+    _workers.clear()
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.exc import IntegrityError
+
+from app.db import SessionLocal, get_engine
+from app.repos import webhook_endpoint_cache_repo
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _to_dict(endpoint) -> dict:
+    return {
+        "env": endpoint.env,
+        "url": endpoint.url,
+        "secret": endpoint.secret,
+        "endpoint_id": endpoint.endpoint_id,
+        "updated_at": endpoint.updated_at,
+        "fetched_at": endpoint.fetched_at.isoformat(),
+    }
+
+
+def _from_dict(data: dict):
+    from app.services.webhook_endpoint_resolver import ResolvedWebhookEndpoint
+
+    return ResolvedWebhookEndpoint(
+        env=data["env"],
+        url=data["url"],
+        secret=data["secret"],
+        endpoint_id=int(data["endpoint_id"]),
+        updated_at=data.get("updated_at"),
+        fetched_at=datetime.fromisoformat(data["fetched_at"]),
+    )
+
+
+class FileEndpointCache:
+    """Resolved endpoints shared through files, for workers on one host.
+
+    One JSON file per env, replaced atomically; a ``.lease`` file created
+    with O_EXCL marks the worker currently fetching. Parsed files are kept
+    until their mtime changes, so a read is one ``stat``.
+    """
+
+    kind = "file"
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        _check_private(directory)
+        self._lock = threading.Lock()
+        self._parsed: dict[str, tuple[int, object]] = {}
+
+    def _path(self, env: str, suffix: str) -> str:
+        safe = hashlib.sha1(env.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{safe}{suffix}")
+
+    def get(self, env: str):
+        path = self._path(env, ".json")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            parsed = self._parsed.get(env)
+            if parsed and parsed[0] == mtime:
+                return parsed[1]
+        try:
+            with open(path, encoding="utf-8") as handle:
+                endpoint = _from_dict(json.load(handle))
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("ignoring unreadable webhook endpoint cache %s: %s", path, exc)
+            return None
+        with self._lock:
+            self._parsed[env] = (mtime, endpoint)
+        return endpoint
+
+    def put(self, endpoint) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(_to_dict(endpoint), handle)
+            os.replace(tmp, self._path(endpoint.env, ".json"))
+        except OSError:
+            os.unlink(tmp)
+            raise
+
+    def try_lease(self, env: str, seconds: float) -> bool:
+        path = self._path(env, ".lease")
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+            return True
+        except FileExistsError:
+            pass
+        try:
+            if time.time() - os.stat(path).st_mtime < seconds:
+                return False
+            # The holder died mid-fetch; take the lease over.
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return self.try_lease(env, seconds)
+
+    def release(self, env: str) -> None:
+        try:
+            os.unlink(self._path(env, ".lease"))
+        except FileNotFoundError:
+            pass
+
+    def invalidate(self, env: str) -> None:
+        try:
+            os.unlink(self._path(env, ".json"))
+        except FileNotFoundError:
+            pass
+
+
+def _check_private(directory: str) -> None:
+    # The files hold webhook secrets and decide where deliveries go, so a
+    # directory another user created (the default lives in the shared temp
+    # dir) must not be trusted.
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode):
+        raise ValueError(f"webhook endpoint cache {directory} is not a directory")
+    if hasattr(os, "getuid") and (info.st_uid != os.getuid() or info.st_mode & 0o077):
+        raise ValueError(
+            f"webhook endpoint cache {directory} must be owned by this user with mode 0700; "
+            "fix it or set WEBHOOK_RESOLVER_CACHE_DIR"
+        )
+
+
+class DatabaseEndpointCache:
+    """Resolved endpoints shared through the ``webhook_endpoint_cache`` table, for every worker and host.
+
+    Each call is one short transaction of its own, made from the refresher
+    thread rather than a request. A row without a url only carries the
+    fetch lease for an env nobody has resolved yet. Postgres only.
+    """
+
+    kind = "db"
+
+    def _run(self, work):
+        db = SessionLocal()
+        try:
+            with db.begin():
+                return work(db)
+        finally:
+            db.close()
+
+    def get(self, env: str):
+        def work(db):
+            row = webhook_endpoint_cache_repo.get(db, env)
+            if row is None or row.url is None:
+                return None
+            return _from_dict(
+                {
+                    "env": row.env,
+                    "url": row.url,
+                    "secret": row.secret,
+                    "endpoint_id": row.endpoint_id,
+                    "updated_at": row.updated_at,
+                    "fetched_at": _aware(row.fetched_at).isoformat(),
+                }
+            )
+
+        return self._run(work)
+
+    def put(self, endpoint) -> None:
+        values = _to_dict(endpoint)
+        del values["env"]
+        values["fetched_at"] = endpoint.fetched_at
+        self._run(lambda db: webhook_endpoint_cache_repo.upsert(db, endpoint.env, values))
+
+    def try_lease(self, env: str, seconds: float) -> bool:
+        now = datetime.now(timezone.utc)
+        try:
+            return self._run(
+                lambda db: webhook_endpoint_cache_repo.take_lease(db, env, now, now + timedelta(seconds=seconds))
+            )
+        except IntegrityError:
+            # Another worker created the row, and holds the lease, first.
+            return False
+
+    def release(self, env: str) -> None:
+        self._run(lambda db: webhook_endpoint_cache_repo.release_lease(db, env))
+
+    def invalidate(self, env: str) -> None:
+        self._run(lambda db: webhook_endpoint_cache_repo.clear(db, env))
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+_shared = None
+_shared_key: tuple | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    """The backend chosen by WEBHOOK_RESOLVER_CACHE, or None when each process caches on its own."""
+    global _shared, _shared_key
+    kind = settings.webhook_resolver_cache
+    if kind == "memory":
+        return None
+    if kind == "db" and get_engine().dialect.name == "sqlite":
+        # SQLite serializes writers, so every lease and refresh would queue
+        # behind request transactions.
+        raise ValueError("WEBHOOK_RESOLVER_CACHE=db needs Postgres; use file with SQLite")
+    directory = settings.webhook_resolver_cache_dir or os.path.join(tempfile.gettempdir(), "ventra-webhook-endpoints")
+    key = (kind, directory if kind == "file" else None)
+    with _shared_lock:
+        if _shared_key != key:
+            _shared = DatabaseEndpointCache() if kind == "db" else FileEndpointCache(directory)
+            _shared_key = key
+        return _shared
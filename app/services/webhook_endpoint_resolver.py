@@ -9,16 +9,23 @@ from typing import Dict, Tuple
 
 import httpx
 
+from app.services import webhook_endpoint_cache
 from app.settings import settings
+from app.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 CACHE_TTL_SECONDS = 30.0
 RESOLVER_TIMEOUT_SECONDS = 2.0
+# How often a worker without the fetch lease re-reads the shared entry while another worker fetches.
+SHARED_WAIT_POLL_SECONDS = 0.05
 
 _cache_lock = threading.Lock()
 _cache: Dict[str, Tuple["ResolvedWebhookEndpoint", float]] = {}
 
+_refresher_stop = threading.Event()
+_refresher: threading.Thread | None = None
+
 
 @dataclass(frozen=True)
 class ResolvedWebhookEndpoint:
@@ -30,30 +37,144 @@ class ResolvedWebhookEndpoint:
     fetched_at: datetime
 
 
+def current_webhook_endpoint(env: str) -> ResolvedWebhookEndpoint | None:
+    """The endpoint last resolved in this process, from memory only.
+
+    This is what the request path uses: it never waits on VentraSim or on
+    the shared cache. The refresher keeps it current, and the previous
+    endpoint stays in use while VentraSim is unreachable.
+    """
+    with _cache_lock:
+        entry = _cache.get(env)
+    return entry[0] if entry else None
+
+
+@traced()
 def resolve_webhook_endpoint(env: str) -> ResolvedWebhookEndpoint | None:
+    """Fetch the active VentraSim endpoint for ``env`` into this process.
+
+    Blocks on VentraSim and the shared cache, so it runs on the refresher
+    thread, at warm-up and from the refresh endpoint; never inside a
+    request's transaction. Without a shared cache each process fetches
+    every CACHE_TTL_SECONDS. With WEBHOOK_RESOLVER_CACHE set to file or db,
+    one worker holds the fetch lease while the others re-read the shared
+    entry every WEBHOOK_RESOLVER_REFRESH_SECONDS, so a change in VentraSim
+    reaches every worker within CACHE_TTL_SECONDS plus two such intervals.
+    """
     base_url = settings.ventrasim_base_url
     token = settings.ventra_internal_token
     if not base_url or not token:
         logger.debug("VentraSim resolver not configured (base_url=%s token=%s)", bool(base_url), bool(token))
         return None
 
-    cached = _get_cached(env)
+    shared = webhook_endpoint_cache.shared_cache()
+    if shared is not None:
+        return _resolve_shared(shared, env, base_url, token)
+    cached = _get_cached(env, CACHE_TTL_SECONDS)
     if cached:
         return cached
-
     return _fetch_endpoint(env, base_url, token)
 
 
-def _get_cached(env: str) -> ResolvedWebhookEndpoint | None:
+def _is_fresh(endpoint: ResolvedWebhookEndpoint) -> bool:
+    return (datetime.now(timezone.utc) - endpoint.fetched_at).total_seconds() < CACHE_TTL_SECONDS
+
+
+def _remember(endpoint: ResolvedWebhookEndpoint) -> ResolvedWebhookEndpoint:
+    with _cache_lock:
+        _cache[endpoint.env] = (endpoint, time.monotonic())
+    return endpoint
+
+
+def _resolve_shared(shared, env: str, base_url: str, token: str) -> ResolvedWebhookEndpoint | None:
+    try:
+        current = shared.get(env)
+    except Exception:
+        logger.exception("Shared webhook endpoint cache unavailable; fetching directly")
+        return _fetch_endpoint(env, base_url, token)
+    if current and _is_fresh(current):
+        return _remember(current)
+
+    deadline = time.monotonic() + RESOLVER_TIMEOUT_SECONDS
+    while True:
+        try:
+            leased = shared.try_lease(env, RESOLVER_TIMEOUT_SECONDS * 2)
+        except Exception:
+            logger.exception("Shared webhook endpoint cache unavailable; fetching directly")
+            return _fetch_endpoint(env, base_url, token)
+        if leased:
+            try:
+                resolved = _fetch_endpoint(env, base_url, token)
+                if resolved:
+                    shared.put(resolved)
+            finally:
+                shared.release(env)
+            # Keep sending to the previous endpoint while VentraSim is unreachable.
+            return resolved or current
+        if current:
+            # Another worker is refreshing; serve the stale entry meanwhile.
+            return _remember(current)
+        if time.monotonic() >= deadline:
+            logger.warning("Timed out waiting for another worker to resolve env %s; fetching directly", env)
+            return _fetch_endpoint(env, base_url, token)
+        time.sleep(SHARED_WAIT_POLL_SECONDS)
+        current = shared.get(env)
+        if current and _is_fresh(current):
+            return _remember(current)
+
+
+def refresh(env: str | None = None) -> ResolvedWebhookEndpoint | None:
+    try:
+        return resolve_webhook_endpoint(env or settings.env)
+    except Exception:
+        logger.exception("VentraSim endpoint refresh failed")
+        return None
+
+
+def _refresh_loop() -> None:
+    while not _refresher_stop.wait(settings.webhook_resolver_refresh_seconds):
+        refresh()
+
+
+def start_refresher() -> None:
+    """Keep this process's endpoint current on a background thread."""
+    global _refresher
+    if _refresher is not None or not settings.ventrasim_base_url or not settings.ventra_internal_token:
+        return
+    # Fails startup on an unusable WEBHOOK_RESOLVER_CACHE instead of on the first refresh.
+    webhook_endpoint_cache.shared_cache()
+    _refresher_stop.clear()
+    _refresher = threading.Thread(target=_refresh_loop, name="webhook-endpoint-refresher", daemon=True)
+    _refresher.start()
+
+
+def stop_refresher(timeout: float = 5.0) -> None:
+    global _refresher
+    _refresher_stop.set()
+    if _refresher is not None:
+        _refresher.join(timeout)
+        _refresher = None
+
+
+def invalidate(env: str) -> None:
+    """Drop the cached endpoint here and in the shared cache so the next resolve fetches it again."""
+    with _cache_lock:
+        _cache.pop(env, None)
+    shared = webhook_endpoint_cache.shared_cache()
+    if shared is not None:
+        shared.invalidate(env)
+
+
+def _get_cached(env: str, ttl: float) -> ResolvedWebhookEndpoint | None:
     with _cache_lock:
         entry = _cache.get(env)
         if not entry:
             return None
         endpoint, timestamp = entry
-        if time.monotonic() - timestamp >= CACHE_TTL_SECONDS:
-            del _cache[env]
+        if time.monotonic() - timestamp >= ttl:
+            # Left in place: current_webhook_endpoint keeps serving it until a fetch replaces it.
             return None
-        logger.info("Using cached VentraSim endpoint for env %s (id=%s)", env, endpoint.endpoint_id)
+        logger.debug("Using cached VentraSim endpoint for env %s (id=%s)", env, endpoint.endpoint_id)
         return endpoint
 
 
@@ -99,7 +220,6 @@ def _fetch_endpoint(env: str, base_url: str, token: str) -> ResolvedWebhookEndpo
         updated_at=updated_at,
         fetched_at=datetime.now(timezone.utc),
     )
-    with _cache_lock:
-        _cache[env] = (resolved, time.monotonic())
+    _remember(resolved)
     logger.info("Loaded VentraSim endpoint for env %s (id=%s)", env, resolved.endpoint_id)
     return resolved
\ No newline at end of file
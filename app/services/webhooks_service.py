@@ -5,15 +5,20 @@ import hashlib
 import hmac
 import json
 import logging
-import uuid
+import threading
 from datetime import datetime, timezone
 
 import httpx
 from sqlalchemy.orm import Session
 
+from app.domain.enums import WebhookPayloadMode
+from app.domain.errors import NotFoundError
+from app.domain.ids import uuid7
 from app.repos import webhook_repo
-from app.services.webhook_endpoint_resolver import ResolvedWebhookEndpoint, resolve_webhook_endpoint
+from app.services import events_service
+from app.services.webhook_endpoint_resolver import ResolvedWebhookEndpoint, current_webhook_endpoint
 from app.settings import settings
+from app.tracing import bind, traced
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +29,55 @@ class WebhookTarget:
     secret: str
     label: str
     endpoint_id: int | None = None
+    payload_mode: str = WebhookPayloadMode.THIN.value
 
 
 _warned_missing_resolver_config = False
 
+# Deliveries queued on background tasks but not sent yet; admission control
+# sheds load when this backlog grows.
+_pending_lock = threading.Lock()
+_pending_deliveries = 0
+
+
+def pending_deliveries() -> int:
+    return _pending_deliveries
+
+
+def _add_pending(count: int) -> None:
+    global _pending_deliveries
+    with _pending_lock:
+        _pending_deliveries += count
+
+
+class _QueuedDelivery:
+    """Counts deliveries as pending from queueing until they run.
+
+    Background tasks are dropped when a request ends in an error response, so
+    the count is also released when the task is garbage collected unrun. The
+    delivery runs under the trace span that queued it.
+    """
+
+    def __init__(self, send, count: int) -> None:
+        self._send = bind(send)
+        self._count = count
+        self._settled = False
+        _add_pending(count)
+
+    def __call__(self, *args, **kwargs) -> None:
+        try:
+            self._send(*args, **kwargs)
+        finally:
+            self._settle()
+
+    def _settle(self) -> None:
+        if not self._settled:
+            self._settled = True
+            _add_pending(-self._count)
+
+    def __del__(self) -> None:
+        self._settle()
+
 
 def _warn_missing_resolver_config_once() -> None:
     global _warned_missing_resolver_config
@@ -47,6 +97,7 @@ def _signature(secret: str, payload: bytes) -> str:
     return hmac.new(secret.encode("utf-8"), payload, hashlib.sha256).hexdigest()
 
 
+@traced()
 def send_webhook(
     url: str,
     secret: str,
@@ -54,6 +105,7 @@ def send_webhook(
     *,
     endpoint_id: int | None = None,
     label: str | None = None,
+    client: httpx.Client | None = None,
 ) -> None:
     payload_bytes = _canonical_payload(payload)
     signature = _signature(secret, payload_bytes)
@@ -67,16 +119,34 @@ def send_webhook(
         endpoint_id,
     )
     try:
-        with httpx.Client(timeout=5) as client:
+        if client is None:
+            with httpx.Client(timeout=5) as own_client:
+                response = own_client.post(url, content=payload_bytes, headers=headers)
+        else:
             response = client.post(url, content=payload_bytes, headers=headers)
-            response.raise_for_status()
+        response.raise_for_status()
     except httpx.HTTPError as exc:
         logger.warning("webhook %s -> %s failed: %s", event_name, url, exc)
 
 
-def emit_event(db: Session, event: str, data: dict, background_tasks=None) -> None:
+@traced()
+def send_webhooks(
+    url: str,
+    secret: str,
+    payloads: list[dict],
+    *,
+    endpoint_id: int | None = None,
+    label: str | None = None,
+) -> None:
+    # One connection per target for the whole batch instead of one per event.
+    with httpx.Client(timeout=5) as client:
+        for payload in payloads:
+            send_webhook(url, secret, payload, endpoint_id=endpoint_id, label=label, client=client)
+
+
+def _resolve_targets(db: Session) -> list[WebhookTarget]:
     subscriptions = webhook_repo.list_enabled(db)
-    resolved_endpoint: ResolvedWebhookEndpoint | None = resolve_webhook_endpoint(settings.env)
+    resolved_endpoint: ResolvedWebhookEndpoint | None = current_webhook_endpoint(settings.env)
     fallback_url = settings.webhook_url
     fallback_secret = settings.webhook_secret
 
@@ -89,23 +159,31 @@ def emit_event(db: Session, event: str, data: dict, background_tasks=None) -> No
                 secret=resolved_endpoint.secret,
                 label="ventrasim_resolver",
                 endpoint_id=resolved_endpoint.endpoint_id,
+                payload_mode=settings.webhook_payload_mode,
             )
         )
     elif fallback_url and fallback_secret:
-        if not settings.ventrasim_base_url or not settings.ventra_internal_token:
-            _warn_missing_resolver_config_once()
-        else:
-            logger.warning(
-                "VentraSim resolver failed for env %s; using WEBHOOK_URL/SECRET as fallback",
-                settings.env,
+        # GET/PATCH /webhooks/subscriptions expose the WEBHOOK_URL row, so its
+        # payload mode and pause win over WEBHOOK_PAYLOAD_MODE.
+        default_subscription = webhook_repo.get_by_url(db, fallback_url)
+        if default_subscription is None or default_subscription.is_enabled:
+            if not settings.ventrasim_base_url or not settings.ventra_internal_token:
+                _warn_missing_resolver_config_once()
+            else:
+                logger.warning(
+                    "VentraSim endpoint for env %s not resolved yet; using WEBHOOK_URL/SECRET as fallback",
+                    settings.env,
+                )
+            targets.append(
+                WebhookTarget(
+                    url=fallback_url,
+                    secret=fallback_secret,
+                    label="env_fallback",
+                    payload_mode=(
+                        default_subscription.payload_mode if default_subscription else settings.webhook_payload_mode
+                    ),
+                )
             )
-        targets.append(
-            WebhookTarget(
-                url=fallback_url,
-                secret=fallback_secret,
-                label="env_fallback",
-            )
-        )
 
     for subscription in subscriptions:
         if fallback_url and subscription.url == fallback_url:
@@ -115,35 +193,111 @@ def emit_event(db: Session, event: str, data: dict, background_tasks=None) -> No
                 url=subscription.url,
                 secret=subscription.secret,
                 label="db_subscription",
+                payload_mode=subscription.payload_mode,
             )
         )
+    return targets
 
-    if not targets:
-        logger.debug("No webhook targets configured for event %s", event)
-        return
 
-    payload = {
-        "id": str(uuid.uuid4()),
+def _build_payload(event: str, data: dict) -> dict:
+    return {
+        "id": str(uuid7()),
         "event": event,
         "data": data,
         "created_at": datetime.now(timezone.utc).isoformat(),
     }
 
+
+def _with_snapshot(payload: dict, snapshot: dict | None) -> dict:
+    if not snapshot:
+        return payload
+    return {**payload, "data": {**payload["data"], **snapshot}}
+
+
+def _for_target(target: WebhookTarget, thin, fat):
+    return fat if target.payload_mode == WebhookPayloadMode.FAT.value else thin
+
+
+@traced()
+def emit_event(db: Session, event: str, data: dict, background_tasks=None, *, snapshot: dict | None = None) -> None:
+    """Record ``event`` in the feed and queue it for every webhook target.
+
+    ``snapshot`` (see ``app.serialization.snapshot``) is added to ``data``
+    for fat-payload targets and in the feed, so consumers need not fetch
+    the resources back.
+    """
+    payload = _build_payload(event, data)
+    full_payload = _with_snapshot(payload, snapshot)
+    events_service.append(db, [full_payload])
+    if not settings.webhook_push_enabled:
+        return
+    targets = _resolve_targets(db)
+    if not targets:
+        logger.debug("No webhook targets configured for event %s", event)
+        return
+
     for target in targets:
+        body = _for_target(target, payload, full_payload)
         if background_tasks is None:
             send_webhook(
                 target.url,
                 target.secret,
-                payload,
+                body,
+                endpoint_id=target.endpoint_id,
+                label=target.label,
+            )
+        else:
+            background_tasks.add_task(
+                _QueuedDelivery(send_webhook, 1),
+                target.url,
+                target.secret,
+                body,
+                endpoint_id=target.endpoint_id,
+                label=target.label,
+            )
+
+
+@traced()
+def emit_events(
+    db: Session,
+    events: list[tuple[str, dict]],
+    background_tasks=None,
+    *,
+    snapshots: list[dict] | None = None,
+) -> None:
+    """Batch form of ``emit_event``; ``snapshots`` lines up with ``events``."""
+    if not events:
+        return
+    payloads = [_build_payload(event, data) for event, data in events]
+    full_payloads = (
+        [_with_snapshot(payload, snapshot) for payload, snapshot in zip(payloads, snapshots)]
+        if snapshots
+        else payloads
+    )
+    events_service.append(db, full_payloads)
+    if not settings.webhook_push_enabled:
+        return
+    targets = _resolve_targets(db)
+    if not targets:
+        logger.debug("No webhook targets configured for %s events", len(events))
+        return
+
+    for target in targets:
+        bodies = _for_target(target, payloads, full_payloads)
+        if background_tasks is None:
+            send_webhooks(
+                target.url,
+                target.secret,
+                bodies,
                 endpoint_id=target.endpoint_id,
                 label=target.label,
             )
         else:
             background_tasks.add_task(
-                send_webhook,
+                _QueuedDelivery(send_webhooks, len(payloads)),
                 target.url,
                 target.secret,
-                payload,
+                bodies,
                 endpoint_id=target.endpoint_id,
                 label=target.label,
             )
@@ -154,8 +308,29 @@ def ensure_default_subscription(db: Session) -> None:
         return
     existing = webhook_repo.get_by_url(db, settings.webhook_url)
     if existing:
-        if not existing.is_enabled:
-            existing.is_enabled = True
+        # Leave payload_mode and is_enabled alone: they may have been PATCHed.
         existing.secret = settings.webhook_secret
         return
-    webhook_repo.create(db, url=settings.webhook_url, secret=settings.webhook_secret)
+    webhook_repo.create(
+        db,
+        url=settings.webhook_url,
+        secret=settings.webhook_secret,
+        payload_mode=settings.webhook_payload_mode,
+    )
+
+
+def update_subscription(
+    db: Session,
+    subscription_id,
+    *,
+    payload_mode: WebhookPayloadMode | None = None,
+    is_enabled: bool | None = None,
+):
+    subscription = webhook_repo.get(db, subscription_id)
+    if not subscription:
+        raise NotFoundError("Webhook subscription not found")
+    if payload_mode is not None:
+        subscription.payload_mode = payload_mode.value
+    if is_enabled is not None:
+        subscription.is_enabled = is_enabled
+    return subscription
@@ -1,19 +1,125 @@
 from __future__ import annotations
 
+import threading
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     env: str = "sandbox"
+    startup_warmup: Literal["background", "blocking", "off"] = "background"
     database_url: str
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pgbouncer_mode: bool = False
+    read_replica_url: str | None = None
+    read_replica_max_lag_seconds: float = 5.0
+    read_replica_check_interval_seconds: float = 2.0
+    async_db: bool = False
+    async_database_url: str | None = None
+    sqlite_pool_size: int = 5
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_busy_retries: int = 3
+    sqlite_begin_mode: Literal["DEFERRED", "IMMEDIATE", "EXCLUSIVE"] = "IMMEDIATE"
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    sqlite_mmap_size: int = 268_435_456
+    sqlite_cache_size_kib: int = 65_536
     api_key: str
     pix_charge_exp_minutes: int = 15
+    pix_key: str = "123e4567-e12b-12d1-a456-426655440000"
+    pix_merchant_name: str = "Ventra Sandbox"
+    pix_merchant_city: str = "Sao Paulo"
     webhook_url: str | None = None
     webhook_secret: str | None = None
+    webhook_push_enabled: bool = True
+    webhook_payload_mode: Literal["thin", "fat"] = "thin"
+    events_poll_interval_seconds: float = 1.0
     ventrasim_base_url: str | None = None
     ventra_internal_token: str | None = None
+    webhook_resolver_cache: Literal["memory", "file", "db"] = "memory"
+    webhook_resolver_cache_dir: str | None = None
+    webhook_resolver_refresh_seconds: float = 5.0
+    pix_inbox_workers: int = 2
+    pix_inbox_batch_size: int = 100
+    pix_inbox_poll_interval_seconds: float = 0.5
+    pix_inbox_max_attempts: int = 5
+    rate_limit_enabled: bool = True
+    rate_limit_write_per_second: float = 20.0
+    rate_limit_write_burst: int = 40
+    rate_limit_read_per_second: float = 100.0
+    rate_limit_read_burst: int = 200
+    rate_limit_redis_url: str | None = None
+    shed_max_in_flight: int = 256
+    shed_max_pool_wait_seconds: float = 1.0
+    shed_max_pending_webhooks: int = 1000
+    shed_retry_after_seconds: int = 1
+    sql_profiling: bool = False
+    sql_profiling_allow_header: bool = True
+    sql_slow_query_ms: float = 250.0
+    sql_repeat_threshold: int = 5
+    tracing_sample_rate: float = 0.1
+    tracing_buffer_size: int = 2048
+    tracing_jsonl_path: str | None = None
+    traffic_capture_path: str | None = None
+    jobs_enabled: bool = True
+    jobs_jitter: float = 0.1
+    jobs_batch_size: int = 500
+    jobs_expire_charges_interval_seconds: float = 30.0
+    jobs_cleanup_interval_seconds: float = 3600.0
+    jobs_lock_dir: str | None = None
+    jobs_lock_database_url: str | None = None
+    idempotency_key_ttl_hours: int = 24
+    events_retention_days: int = 7
+    traffic_capture_max_body_bytes: int = 65_536
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 
-settings = Settings()
+class _LazySettings:
+    """Reads the environment on first attribute access instead of at import.
+
+    Importing the app then needs no DATABASE_URL/API_KEY, and workers only
+    pay for parsing .env when they actually start serving.
+    """
+
+    def __init__(self) -> None:
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "_settings", None)
+
+    def _load(self) -> Settings:
+        if self._settings is None:
+            with self._lock:
+                if self._settings is None:
+                    object.__setattr__(self, "_settings", Settings())
+        return self._settings
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._load(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._load(), name)
+
+
+settings: Settings = _LazySettings()  # type: ignore[assignment]
+
+
+class _AppShapeSettings(BaseSettings):
+    """Settings that decide which routes the app object has; loadable without the rest of the environment."""
+
+    async_db: bool = False
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
+
+def async_db_enabled() -> bool:
+    loaded = object.__getattribute__(settings, "_settings")
+    if loaded is not None:
+        return loaded.async_db
+    return _AppShapeSettings().async_db
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = "x-debug-trace"
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    name: str
+    start: float
+    attributes: dict = field(default_factory=dict)
+    duration_ms: float | None = None
+    error: str | None = None
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def finish(self) -> None:
+        if self.duration_ms is None:
+            self.duration_ms = (time.perf_counter() - self._started) * 1000
+            exporter().export(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Exporter:
+    """Keeps finished spans in a ring buffer and optionally appends them to a JSON-lines file."""
+
+    def __init__(self, capacity: int, path: str | None = None) -> None:
+        self._lock = threading.Lock()
+        self._spans: deque[dict] = deque(maxlen=capacity)
+        self._path = path
+        self._file = None
+
+    def export(self, span: Span) -> None:
+        record = span.to_dict()
+        with self._lock:
+            self._spans.append(record)
+            if self._path:
+                try:
+                    if self._file is None:
+                        self._file = open(self._path, "a", encoding="utf-8")
+                    self._file.write(json.dumps(record, default=str) + "\n")
+                    if span.parent_id is None:
+                        self._file.flush()
+                except OSError as exc:
+                    logger.warning("cannot write trace file %s: %s", self._path, exc)
+                    self._path = None
+
+    def spans(self, trace_id: str | None = None) -> list[dict]:
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id is not None:
+            spans = [span for span in spans if span["trace_id"] == trace_id]
+        return spans
+
+    def traces(self, limit: int = 20) -> list[dict]:
+        """Most recent traces, each with its spans in start order."""
+        grouped: dict[str, list[dict]] = {}
+        for span in self.spans():
+            grouped.setdefault(span["trace_id"], []).append(span)
+        recent = list(grouped.items())[-limit:]
+        return [
+            {"trace_id": trace_id, "spans": sorted(spans, key=lambda span: span["start"])}
+            for trace_id, spans in reversed(recent)
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+_exporter: Exporter | None = None
+_exporter_lock = threading.Lock()
+_current: ContextVar[Span | None] = ContextVar("trace_span", default=None)
+
+
+def exporter() -> Exporter:
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = Exporter(settings.tracing_buffer_size, settings.tracing_jsonl_path)
+    return _exporter
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def should_sample(forced: bool = False) -> bool:
+    rate = settings.tracing_sample_rate
+    return forced or (rate > 0 and (rate >= 1 or random.random() < rate))
+
+
+@contextmanager
+def start_trace(name: str, *, sampled: bool | None = None, **attributes):
+    """Open a root span; yields None (and records nothing) when not sampled."""
+    if not (should_sample() if sampled is None else sampled):
+        token = _current.set(None)
+        try:
+            yield None
+        finally:
+            _current.reset(token)
+        return
+    root = Span(_new_id(128), _new_id(64), None, name, time.time(), attributes)
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as exc:
+        root.error = type(exc).__name__
+        raise
+    finally:
+        _current.reset(token)
+        root.finish()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Child span of the current one; a no-op outside a sampled trace."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.trace_id, _new_id(64), parent.span_id, name, time.time(), attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = type(exc).__name__
+        raise
+    finally:
+        _current.reset(token)
+        child.finish()
+
+
+def traced(name: str | None = None):
+    """Decorator wrapping each call in a span named ``module.function``."""
+
+    def decorate(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def bind(func):
+    """Run ``func`` later under the span that is current now (e.g. background deliveries)."""
+    parent = _current.get()
+    if parent is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return wrapper
+
+
+def _forced(scope) -> bool:
+    for name, value in scope.get("headers") or ():
+        if name == TRACE_HEADER.encode("ascii"):
+            return value.strip().lower() in (b"1", b"true", b"yes")
+    return False
+
+
+class TracingMiddleware:
+    """Starts a root span per sampled request (TRACING_SAMPLE_RATE, or ``X-Debug-Trace: 1``).
+
+    The span is named after the matched route template and ends when the
+    response has been sent; background work started by the request keeps
+    its trace and shows up as later child spans.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not should_sample(_forced(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        with start_trace(f"{scope['method']} {scope['path']}", sampled=True, method=scope["method"]) as root:
+
+            async def send_traced(message) -> None:
+                if message["type"] == "http.response.start":
+                    root.attributes["status"] = message["status"]
+                    message = {
+                        **message,
+                        "headers": [*message.get("headers", []), (b"x-trace-id", root.trace_id.encode("ascii"))],
+                    }
+                await send(message)
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    route = scope.get("route")
+                    if getattr(route, "path", None):
+                        root.name = f"{scope['method']} {route.path}"
+                    root.finish()
+
+            await self.app(scope, receive, send_traced)
@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import logging
+import queue
+import re
+import statistics
+import threading
+import time
+import uuid
+
+from app.serialization import dumps
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CAPTURED_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# Never written to the log; the replayer sends its own API key.
+SECRET_HEADERS = frozenset(
+    {"x-api-key", "authorization", "proxy-authorization", "cookie", "x-internal-token", "x-signature"}
+)
+# Recomputed by the client on replay.
+SKIPPED_HEADERS = frozenset({"host", "content-length", "connection", "accept-encoding", "user-agent"})
+_DROPPED_HEADERS = SECRET_HEADERS | SKIPPED_HEADERS
+# Tokens that may be ids minted by an earlier captured request (UUIDs, txids).
+_ID_TOKEN = re.compile(r"[0-9A-Za-z][0-9A-Za-z-]{15,}")
+MAX_QUEUED_RECORDS = 10_000
+
+
+def extract_ids(document, prefix: str = "") -> dict[str, str]:
+    """Identifiers in a JSON response, keyed by their path (``id``, ``charge.txid``)."""
+    ids: dict[str, str] = {}
+    if not isinstance(document, dict):
+        return ids
+    for key, value in document.items():
+        if isinstance(value, str) and (key in ("id", "txid") or key.endswith("_id")):
+            ids[prefix + key] = value
+        elif isinstance(value, dict):
+            ids.update(extract_ids(value, f"{prefix}{key}."))
+    return ids
+
+
+_STOP = object()
+
+
+class CaptureLog:
+    """Append-only JSON-lines log of captured requests, one compact record per line.
+
+    Records are queued and written by a background thread, so requests never
+    wait on the disk. When the writer falls MAX_QUEUED_RECORDS behind, new
+    records are dropped and counted rather than held in memory.
+    """
+
+    def __init__(self, path: str, max_queued: int = MAX_QUEUED_RECORDS) -> None:
+        self.path = path
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(max_queued)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def write(self, record: dict) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("traffic capture writer behind; %s records dropped", self.dropped)
+
+    def _run(self) -> None:
+        try:
+            handle = open(self.path, "ab")
+        except OSError as exc:
+            logger.warning("cannot write traffic capture to %s: %s", self.path, exc)
+            handle = None
+        try:
+            while True:
+                record = self._queue.get()
+                try:
+                    if record is _STOP:
+                        return
+                    if handle is not None:
+                        handle.write(dumps(record) + b"\n")
+                        if self._queue.empty():
+                            handle.flush()
+                except OSError as exc:
+                    logger.warning("cannot write traffic capture to %s: %s", self.path, exc)
+                finally:
+                    self._queue.task_done()
+        finally:
+            if handle is not None:
+                handle.close()
+
+    def flush(self) -> None:
+        """Wait until every record written so far is on disk."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(_STOP)
+                self._thread.join(5.0)
+                self._thread = None
+
+
+_log: CaptureLog | None = None
+_log_lock = threading.Lock()
+
+
+def capture_log() -> CaptureLog | None:
+    global _log
+    path = settings.traffic_capture_path
+    if not path:
+        return None
+    if _log is None or _log.path != path:
+        with _log_lock:
+            if _log is None or _log.path != path:
+                if _log is not None:
+                    _log.close()
+                _log = CaptureLog(path)
+    return _log
+
+
+def flush() -> None:
+    log = _log
+    if log is not None:
+        log.flush()
+
+
+def read_log(path: str) -> list[dict]:
+    with open(path, "rb") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _body_field(body: bytes) -> dict:
+    if not body:
+        return {}
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(body).decode("ascii")}
+
+
+class TrafficCaptureMiddleware:
+    """Records mutating requests to TRAFFIC_CAPTURE_PATH for later replay.
+
+    Each record holds the method, path, query, matched route, headers
+    (without credentials), body, response status, duration until the
+    response was sent (what the replayer measures too) and the ids the
+    response returned, which the replayer uses to chain later requests.
+    Bodies above TRAFFIC_CAPTURE_MAX_BODY_BYTES are cut and flagged.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] not in CAPTURED_METHODS:
+            await self.app(scope, receive, send)
+            return
+        log = capture_log()
+        if log is None:
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.traffic_capture_max_body_bytes
+        request_body = bytearray()
+        response_body = bytearray()
+        truncated = False
+        status = 500
+        json_response = False
+        started_at = time.time()
+        start = time.perf_counter()
+        # When the client had the whole response; background tasks run after it.
+        finished: float | None = None
+
+        async def receive_captured():
+            nonlocal truncated
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                room = limit - len(request_body)
+                if len(chunk) > room:
+                    truncated = True
+                request_body.extend(chunk[: max(room, 0)])
+            return message
+
+        async def send_captured(message) -> None:
+            nonlocal status, json_response, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        json_response = value.startswith(b"application/json")
+            elif message["type"] == "http.response.body" and json_response and status < 400:
+                if len(response_body) < limit:
+                    response_body.extend(message.get("body", b""))
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished = time.perf_counter()
+
+        try:
+            await self.app(scope, receive_captured, send_captured)
+        finally:
+            record = {
+                "t": round(started_at, 6),
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "route": getattr(scope.get("route"), "path", None),
+                "headers": {
+                    name.decode("latin-1").lower(): value.decode("latin-1")
+                    for name, value in scope.get("headers") or ()
+                    if name.decode("latin-1").lower() not in _DROPPED_HEADERS
+                },
+                **_body_field(bytes(request_body)),
+                "status": status,
+                "ms": round(((finished or time.perf_counter()) - start) * 1000, 3),
+            }
+            if truncated:
+                record["truncated"] = True
+            if response_body:
+                try:
+                    record["ids"] = extract_ids(json.loads(response_body))
+                except ValueError:
+                    pass
+            log.write(record)
+
+
+class Replayer:
+    """Replays a capture against another deployment, keeping the flows consistent.
+
+    Requests start at their recorded offsets divided by ``speed`` (0 means
+    as fast as ``concurrency`` allows). Ids returned by a replayed response
+    replace the recorded ones in every later path, query and body, and
+    requests touching the same id run in their recorded order, so a
+    release never overtakes the payment before it. Idempotency keys get a
+    per-run suffix so a replay is never answered from the capture's stored
+    responses.
+    """
+
+    def __init__(self, client, *, api_key: str, speed: float = 1.0, concurrency: int = 8) -> None:
+        self.client = client
+        self.api_key = api_key
+        self.speed = speed
+        self.concurrency = concurrency
+        self.run_id = uuid.uuid4().hex[:8]
+        # recorded id -> id minted by the replay (None when that request failed)
+        self._ids: dict[str, asyncio.Future] = {}
+        # recorded id -> completion of the last scheduled request touching it
+        self._last: dict[str, asyncio.Future] = {}
+        self.results: list[dict] = []
+
+    def _rewrite(self, text: str, mapping: dict[str, str]) -> str:
+        if not mapping:
+            return text
+        return _ID_TOKEN.sub(lambda match: mapping.get(match.group(0), match.group(0)), text)
+
+    @staticmethod
+    def _tokens(record: dict) -> set[str]:
+        return set(_ID_TOKEN.findall(" ".join((record["path"], record.get("query", ""), record.get("body", "")))))
+
+    async def _resolve(self, record: dict, minted: set[str]) -> dict[str, str] | None:
+        mapping = {}
+        for token in self._tokens(record):
+            future = self._ids.get(token)
+            if future is None or token in minted:
+                continue
+            new = await future
+            if new is None:
+                return None
+            mapping[token] = new
+        return mapping
+
+    async def _replay_one(
+        self,
+        record: dict,
+        minted: dict[str, str],
+        previous: set[asyncio.Future],
+        done: asyncio.Future,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        result = {
+            "method": record["method"],
+            "route": record.get("route") or record["path"],
+            "recorded_status": record["status"],
+            "recorded_ms": record["ms"],
+        }
+        new_ids: dict[str, str] = {}
+        try:
+            for future in previous:
+                await future
+            mapping = await self._resolve(record, set(minted.values()))
+            if mapping is None or record.get("truncated") or "body_b64" in record:
+                result["status"] = "skipped"
+                return
+            headers = {**record.get("headers", {}), "x-api-key": self.api_key}
+            if "idempotency-key" in headers:
+                headers["idempotency-key"] = f"{headers['idempotency-key']}:{self.run_id}"
+            path = self._rewrite(record["path"], mapping)
+            if record.get("query"):
+                path = f"{path}?{self._rewrite(record['query'], mapping)}"
+            body = self._rewrite(record.get("body", ""), mapping).encode("utf-8")
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await self.client.request(record["method"], path, content=body, headers=headers)
+                except Exception as exc:
+                    result.update(status="error", error=type(exc).__name__)
+                    return
+                result["ms"] = round((time.perf_counter() - start) * 1000, 3)
+            result["status"] = response.status_code
+            if minted and response.status_code < 400:
+                try:
+                    new_ids = extract_ids(response.json())
+                except ValueError:
+                    pass
+        finally:
+            for key, old in minted.items():
+                self._ids[old].set_result(new_ids.get(key))
+            done.set_result(None)
+            self.results.append(result)
+
+    async def run(self, records: list[dict]) -> list[dict]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        tasks = []
+        records = sorted(records, key=lambda record: record["t"])
+        if records:
+            first = records[0]["t"]
+            start = loop.time()
+            for record in records:
+                if self.speed > 0:
+                    delay = start + (record["t"] - first) / self.speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                # Registered before later records are scheduled so they wait on this one.
+                produced = record.get("ids") or {}
+                minted = {key: old for key, old in produced.items() if old not in self._ids}
+                for old in minted.values():
+                    self._ids[old] = loop.create_future()
+                touched = self._tokens(record) | set(produced.values())
+                previous = {self._last[token] for token in touched if token in self._last}
+                done = loop.create_future()
+                for token in touched:
+                    self._last[token] = done
+                tasks.append(asyncio.ensure_future(self._replay_one(record, minted, previous, done, semaphore)))
+        await asyncio.gather(*tasks)
+        return self.results
+
+
+def _percentile(values: list[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def _failed(status) -> bool:
+    return not isinstance(status, int) or status >= 400
+
+
+def compare_results(results: list[dict]) -> dict:
+    """Latency and error rate per route, recorded vs replayed."""
+    routes: dict[str, list[dict]] = {}
+    for result in results:
+        routes.setdefault(f"{result['method']} {result['route']}", []).append(result)
+    report = {}
+    for route, items in sorted(routes.items()):
+        replayed = [item for item in items if item["status"] != "skipped"]
+        recorded_ms = [item["recorded_ms"] for item in replayed]
+        replay_ms = [item["ms"] for item in replayed if "ms" in item]
+        entry = {
+            "requests": len(items),
+            "skipped": len(items) - len(replayed),
+            "status_mismatches": sum(1 for item in replayed if item["status"] != item["recorded_status"]),
+            "recorded_error_rate": _rate(sum(_failed(item["recorded_status"]) for item in replayed), len(replayed)),
+            "replay_error_rate": _rate(sum(_failed(item["status"]) for item in replayed), len(replayed)),
+        }
+        for name, fraction in (("p50", 0.5), ("p95", 0.95)):
+            recorded = _percentile(recorded_ms, fraction)
+            replay = _percentile(replay_ms, fraction)
+            entry[f"recorded_{name}_ms"] = recorded
+            entry[f"replay_{name}_ms"] = replay
+            if recorded and replay is not None:
+                entry[f"{name}_delta_pct"] = round((replay - recorded) / recorded * 100, 1)
+        entry["replay_mean_ms"] = round(statistics.fmean(replay_ms), 3) if replay_ms else None
+        report[route] = entry
+    return report
+
+
+def _rate(failed: int, total: int) -> float | None:
+    return round(failed / total, 4) if total else None
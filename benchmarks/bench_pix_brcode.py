@@ -0,0 +1,52 @@
+"""Micro-benchmark for the Pix BR Code payload builder.
+
+Usage: python benchmarks/bench_pix_brcode.py [iterations]
+"""
+from __future__ import annotations
+
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services import pix_brcode  # noqa: E402
+
+PIX_KEY = "123e4567-e12b-12d1-a456-426655440000"
+
+
+def main(iterations: int) -> None:
+    txids = [uuid.uuid4().hex[: pix_brcode.MAX_TXID_LENGTH] for _ in range(1024)]
+    build = pix_brcode.build_payload
+
+    start = time.perf_counter()
+    for index in range(iterations):
+        build(
+            amount_cents=1000 + index % 9000,
+            txid=txids[index & 1023],
+            pix_key=PIX_KEY,
+            merchant_name="Ventra Sandbox",
+            merchant_city="Sao Paulo",
+        )
+    elapsed = time.perf_counter() - start
+
+    payload = build(
+        amount_cents=1000,
+        txid=txids[0],
+        pix_key=PIX_KEY,
+        merchant_name="Ventra Sandbox",
+        merchant_city="Sao Paulo",
+    )
+    crc_start = time.perf_counter()
+    data = payload.encode("ascii")
+    for _ in range(iterations):
+        pix_brcode.crc16_ccitt(data)
+    crc_elapsed = time.perf_counter() - crc_start
+
+    print(f"payloads: {iterations / elapsed:,.0f}/s ({elapsed / iterations * 1e6:.2f} us each)")
+    print(f"crc16 over {len(data)} bytes: {iterations / crc_elapsed:,.0f}/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,78 @@
+"""Cold-start benchmark: import, startup and first-request latency of a fresh worker.
+
+Each run starts a new interpreter so module caches are cold, the way an
+autoscaled worker boots. The app uses a throwaway SQLite file.
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CHILD = r"""
+import json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+from app.db import Base, get_engine
+
+client = TestClient(app.main.app)
+client.__enter__()
+started = time.perf_counter()
+Base.metadata.create_all(bind=get_engine())
+schema_ready = time.perf_counter()
+response = client.post("/orders", json={"amount_cents": 1000}, headers={"X-API-KEY": "bench"})
+assert response.status_code == 201, response.text
+first = time.perf_counter()
+client.get("/orders/" + response.json()["id"], headers={"X-API-KEY": "bench"})
+second = time.perf_counter()
+client.__exit__(None, None, None)
+print(json.dumps({
+    "import_s": imported - start,
+    "startup_s": started - imported,
+    "first_request_s": first - schema_ready,
+    "second_request_s": second - first,
+    "ready_s": started - start,
+}))
+"""
+
+
+def run_once(database_path: Path) -> dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+pysqlite:///{database_path}",
+        "API_KEY": "bench",
+        "PIX_INBOX_WORKERS": "0",
+        "RATE_LIMIT_ENABLED": "false",
+        "PYTHONPATH": str(ROOT),
+        "PYTHONWARNINGS": "ignore",
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs: int) -> None:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for index in range(runs):
+            results.append(run_once(Path(tmp) / f"startup-{index}.db"))
+
+    for key in ("import_s", "startup_s", "ready_s", "first_request_s", "second_request_s"):
+        values = [result[key] * 1000 for result in results]
+        print(f"{key[:-2]:>16}: median {statistics.median(values):7.1f} ms  max {max(values):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
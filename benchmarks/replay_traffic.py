@@ -0,0 +1,67 @@
+"""Replay a traffic capture (TRAFFIC_CAPTURE_PATH) against a running deployment.
+
+Ids created during the replay are chained into later requests, so a
+captured create order -> charge -> release flow replays as the same flow.
+Prints latency and error rate per route next to the recorded baseline.
+
+Usage:
+    python benchmarks/replay_traffic.py traffic.jsonl --url https://staging.example --api-key KEY
+        [--speed 1] [--concurrency 8] [--output report.json]
+
+--speed 10 replays ten times faster than recorded; --speed 0 sends as
+fast as the concurrency allows.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx  # noqa: E402
+
+from app.traffic_capture import Replayer, compare_results, read_log  # noqa: E402
+
+
+async def replay(args) -> dict:
+    records = read_log(args.capture)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        replayer = Replayer(client, api_key=args.api_key, speed=args.speed, concurrency=args.concurrency)
+        results = await replayer.run(records)
+    return compare_results(results)
+
+
+def _ms(value) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("capture")
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--api-key", required=True)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    report = asyncio.run(replay(args))
+    for route, entry in report.items():
+        print(
+            f"{route}: {entry['requests']} requests ({entry['skipped']} skipped, "
+            f"{entry['status_mismatches']} status changes)\n"
+            f"    p50 {_ms(entry['recorded_p50_ms'])} -> {_ms(entry['replay_p50_ms'])} ms"
+            f"  p95 {_ms(entry['recorded_p95_ms'])} -> {_ms(entry['replay_p95_ms'])} ms"
+            f"  errors {entry['recorded_error_rate']} -> {entry['replay_error_rate']}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,13 @@ from app.db import Base
 from app.settings import settings
 
 from app.models.charge import Charge
+from app.models.event import Event
 from app.models.idempotency import IdempotencyKey
 from app.models.ledger import LedgerEntry
 from app.models.order import Order
+from app.models.pix_notification import PixNotification
 from app.models.webhook import WebhookSubscription
+from app.models.webhook_endpoint_cache import WebhookEndpointCacheEntry
 
 config = context.config
 
@@ -0,0 +1,26 @@
+"""order listing indexes
+
+Revision ID: 0002_order_listing_indexes
+Revises: 0001_initial
+Create Date: 2026-10-19 09:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002_order_listing_indexes"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_orders_created_at_id", "orders", ["created_at", "id"])
+    op.create_index("ix_orders_status_created_at_id", "orders", ["status", "created_at", "id"])
+    op.create_index("ix_charges_order_id_created_at", "charges", ["order_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_charges_order_id_created_at", table_name="charges")
+    op.drop_index("ix_orders_status_created_at_id", table_name="orders")
+    op.drop_index("ix_orders_created_at_id", table_name="orders")
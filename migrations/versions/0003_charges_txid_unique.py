@@ -0,0 +1,22 @@
+"""unique index on charges.txid
+
+Revision ID: 0003_charges_txid_unique
+Revises: 0002_order_listing_indexes
+Create Date: 2026-10-19 10:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003_charges_txid_unique"
+down_revision = "0002_order_listing_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ux_charges_txid", "charges", ["txid"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ux_charges_txid", table_name="charges")
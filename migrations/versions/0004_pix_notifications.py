@@ -0,0 +1,42 @@
+"""pix notification inbox
+
+Revision ID: 0004_pix_notifications
+Revises: 0003_charges_txid_unique
+Create Date: 2026-10-19 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004_pix_notifications"
+down_revision = "0003_charges_txid_unique"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pix_notifications",
+        sa.Column("id", sa.UUID(as_uuid=True), primary_key=True),
+        sa.Column("end_to_end_id", sa.String(), nullable=False),
+        sa.Column("txid", sa.String(), nullable=False),
+        sa.Column("amount_cents", sa.Integer(), nullable=True),
+        sa.Column("paid_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("received_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ux_pix_notifications_end_to_end_id", "pix_notifications", ["end_to_end_id"], unique=True)
+    op.create_index("ix_pix_notifications_status_received_at", "pix_notifications", ["status", "received_at"])
+    op.create_index("ix_pix_notifications_txid", "pix_notifications", ["txid"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_pix_notifications_txid", table_name="pix_notifications")
+    op.drop_index("ix_pix_notifications_status_received_at", table_name="pix_notifications")
+    op.drop_index("ux_pix_notifications_end_to_end_id", table_name="pix_notifications")
+    op.drop_table("pix_notifications")
@@ -0,0 +1,25 @@
+"""version column on orders and charges
+
+Revision ID: 0005_orders_charges_version
+Revises: 0004_pix_notifications
+Create Date: 2026-10-19 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0005_orders_charges_version"
+down_revision = "0004_pix_notifications"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("orders", sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("1")))
+    op.add_column("charges", sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("1")))
+
+
+def downgrade() -> None:
+    op.drop_column("charges", "version")
+    op.drop_column("orders", "version")
@@ -0,0 +1,26 @@
+"""payload mode on webhook subscriptions
+
+Revision ID: 0007_webhook_payload_mode
+Revises: 0006_events
+Create Date: 2026-10-19 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0007_webhook_payload_mode"
+down_revision = "0006_events"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("payload_mode", sa.String(), nullable=False, server_default="thin"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("webhook_subscriptions", "payload_mode")
@@ -0,0 +1,32 @@
+"""shared cache for the resolved VentraSim webhook endpoint
+
+Revision ID: 0008_webhook_endpoint_cache
+Revises: 0007_webhook_payload_mode
+Create Date: 2026-10-19 16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0008_webhook_endpoint_cache"
+down_revision = "0007_webhook_payload_mode"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "webhook_endpoint_cache",
+        sa.Column("env", sa.String(), primary_key=True),
+        sa.Column("url", sa.Text(), nullable=True),
+        sa.Column("secret", sa.String(), nullable=True),
+        sa.Column("endpoint_id", sa.Integer(), nullable=True),
+        sa.Column("updated_at", sa.String(), nullable=True),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("lease_until", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("webhook_endpoint_cache")
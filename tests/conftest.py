@@ -3,6 +3,10 @@ import os
 os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
 os.environ.setdefault("API_KEY", "test-key")
 os.environ.setdefault("ENV", "sandbox")
+os.environ.setdefault("PIX_INBOX_WORKERS", "0")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("STARTUP_WARMUP", "blocking")
+os.environ.setdefault("JOBS_ENABLED", "false")
 
 import pytest
 from fastapi.testclient import TestClient
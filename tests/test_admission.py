@@ -0,0 +1,129 @@
+import asyncio
+import gc
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import admission
+from app.api.admission import AdmissionMiddleware, BucketLimit, InMemoryRateLimitStore
+from app.services import webhooks_service
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _client(clock, **options):
+    app = FastAPI()
+
+    @app.get("/things")
+    def list_things():
+        return {"ok": True}
+
+    @app.post("/things")
+    def create_thing():
+        return {"ok": True}
+
+    app.add_middleware(
+        AdmissionMiddleware,
+        enabled=True,
+        store=InMemoryRateLimitStore(),
+        limits={"write": BucketLimit(1.0, 2), "read": BucketLimit(10.0, 5)},
+        clock=clock,
+        **options,
+    )
+    return TestClient(app)
+
+
+def test_write_bucket_limits_per_api_key_and_refills(monkeypatch):
+    monkeypatch.setattr(admission, "verify_api_key", lambda value: value in ("a", "b"))
+    clock = FakeClock()
+    client = _client(clock)
+    key_a = {"X-API-KEY": "a"}
+
+    assert client.post("/things", headers=key_a).status_code == 200
+    assert client.post("/things", headers=key_a).status_code == 200
+    limited = client.post("/things", headers=key_a)
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "1"
+
+    # Other keys and the read class have their own buckets.
+    assert client.post("/things", headers={"X-API-KEY": "b"}).status_code == 200
+    assert client.get("/things", headers=key_a).status_code == 200
+
+    clock.now += 1.0
+    assert client.post("/things", headers=key_a).status_code == 200
+    assert client.post("/things", headers=key_a).status_code == 429
+
+
+def test_unverified_keys_share_the_client_address_bucket():
+    clock = FakeClock()
+    client = _client(clock)
+
+    assert client.post("/things", headers={"X-API-KEY": "random-1"}).status_code == 200
+    assert client.post("/things", headers={"X-API-KEY": "random-2"}).status_code == 200
+    assert client.post("/things", headers={"X-API-KEY": "random-3"}).status_code == 429
+
+
+async def _fill(store, keys, now):
+    for key in keys:
+        await store.take(key, BucketLimit(1.0, 2), now)
+
+
+def test_in_memory_store_evicts_least_recently_used_buckets():
+    store = InMemoryRateLimitStore(max_buckets=3)
+
+    asyncio.run(_fill(store, ["a", "b", "c", "a", "d"], 1_000.0))
+
+    assert list(store._buckets) == ["c", "a", "d"]
+
+
+def test_docs_are_exempt():
+    client = _client(FakeClock())
+    for _ in range(10):
+        assert client.get("/openapi.json").status_code == 200
+
+
+def test_sheds_when_webhook_backlog_is_full(monkeypatch):
+    client = _client(FakeClock(), max_pending_webhooks=3)
+    monkeypatch.setattr(admission, "webhook_backlog", lambda: 3)
+
+    response = client.get("/things")
+    assert response.status_code == 503
+    assert response.json() == {"detail": "webhook_backlog_full"}
+    assert "Retry-After" in response.headers
+
+
+def test_sheds_when_too_many_requests_in_flight():
+    middleware = AdmissionMiddleware(
+        None,
+        enabled=True,
+        store=InMemoryRateLimitStore(),
+        max_in_flight=2,
+        max_pool_wait_seconds=0,
+        max_pending_webhooks=0,
+    )
+    assert middleware.overload_reason() is None
+    middleware.in_flight = 2
+    assert middleware.overload_reason() == "too_many_requests_in_flight"
+
+
+def test_queued_webhook_deliveries_are_counted_until_sent_or_dropped():
+    sent = []
+    before = webhooks_service.pending_deliveries()
+
+    delivery = webhooks_service._QueuedDelivery(lambda *args: sent.append(args), 3)
+    assert webhooks_service.pending_deliveries() == before + 3
+    delivery("payload")
+    assert sent == [("payload",)]
+    assert webhooks_service.pending_deliveries() == before
+
+    dropped = webhooks_service._QueuedDelivery(lambda: None, 2)
+    assert webhooks_service.pending_deliveries() == before + 2
+    del dropped
+    gc.collect()
+    assert webhooks_service.pending_deliveries() == before
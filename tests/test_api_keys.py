@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from app import runtime_settings
+
+
+@pytest.fixture()
+def key_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(runtime_settings, "RUNTIME_DIR", tmp_path)
+    monkeypatch.setattr(runtime_settings, "API_KEY_FILE", tmp_path / "api_key.json")
+    runtime_settings.reload_api_keys()
+    yield tmp_path / "api_key.json"
+    monkeypatch.undo()
+    runtime_settings.reload_api_keys()
+
+
+def test_env_key_is_used_without_runtime_file(key_file):
+    assert runtime_settings.verify_api_key("test-key")
+    assert not runtime_settings.verify_api_key("other")
+    assert not runtime_settings.verify_api_key(None)
+
+
+def test_rotation_keeps_previous_keys_and_stores_hashes(key_file):
+    runtime_settings.set_api_key("second")
+    runtime_settings.set_api_key("third")
+
+    assert runtime_settings.verify_api_key("test-key")
+    assert runtime_settings.verify_api_key("second")
+    assert runtime_settings.verify_api_key("third")
+    assert "second" not in key_file.read_text()
+
+    runtime_settings.set_api_key("fourth")
+    assert not runtime_settings.verify_api_key("test-key")
+    assert runtime_settings.verify_api_key("fourth")
+
+
+def test_revoke_existing_drops_other_keys(key_file):
+    runtime_settings.set_api_key("second")
+    runtime_settings.set_api_key("third", revoke_existing=True)
+
+    assert runtime_settings.verify_api_key("third")
+    assert not runtime_settings.verify_api_key("second")
+    assert not runtime_settings.verify_api_key("test-key")
+
+
+def test_external_file_change_is_picked_up(key_file, monkeypatch):
+    assert runtime_settings.verify_api_key("test-key")
+    key_file.write_text(json.dumps({"api_key": "legacy-plain"}), encoding="utf-8")
+
+    # Within the reload interval the cached keys are used without touching disk.
+    assert runtime_settings.verify_api_key("test-key")
+
+    monkeypatch.setattr(runtime_settings, "API_KEY_RELOAD_INTERVAL_SECONDS", 0.0)
+    assert runtime_settings.verify_api_key("legacy-plain")
+    assert not runtime_settings.verify_api_key("test-key")
+
+
+def test_settings_endpoint_rotates_key(client, key_file):
+    response = client.post("/settings/api-key", json={"api_key": "rotated"}, headers={"X-API-KEY": "test-key"})
+    assert response.status_code == 200
+
+    assert client.get("/balance", headers={"X-API-KEY": "rotated"}).status_code == 200
+    assert client.get("/balance", headers={"X-API-KEY": "test-key"}).status_code == 200
+    assert client.get("/balance", headers={"X-API-KEY": "wrong"}).status_code == 401
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import exc as sa_exc
+
+from app.db import build_engine
+from app.db_pool import InstrumentedQueuePool, pool_status
+from app.settings import settings
+
+
+def test_pool_reports_checkouts_and_timeouts(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "sqlite_pool_size", 1)
+    monkeypatch.setattr(settings, "db_max_overflow", 0)
+    monkeypatch.setattr(settings, "db_pool_timeout_seconds", 0.05)
+    engine = build_engine(f"sqlite+pysqlite:///{tmp_path / 'pool.db'}")
+    try:
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+        held = engine.connect()
+        status = pool_status(engine)
+        assert status["checked_out"] == 1
+        assert status["idle"] == 0
+
+        with pytest.raises(sa_exc.TimeoutError):
+            engine.connect()
+        held.close()
+
+        status = pool_status(engine)
+        assert status["checked_out"] == 0
+        assert status["idle"] == 1
+        assert status["checkouts"] == 1
+        assert status["timeouts"] == 1
+        assert status["wait_seconds_max"] >= 0.05
+    finally:
+        engine.dispose()
+
+
+def test_db_pool_endpoint(client):
+    res = client.get("/system/db-pool")
+    assert res.status_code == 200
+    assert res.json()["primary"]["pool"] == "StaticPool"
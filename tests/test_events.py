@@ -0,0 +1,129 @@
+import asyncio
+import json
+import threading
+import time
+from uuid import UUID
+
+from sqlalchemy import event as sa_event, update
+
+from app import jobs
+from app.api.routers import events
+from app.db import SessionLocal
+from app.models.order import Order
+from app.services import webhooks_service
+from app.settings import settings
+
+
+def _paid_order(client):
+    order = client.post("/orders", json={"amount_cents": 2500}).json()
+    charge = client.post(f"/orders/{order['id']}/charges/pix").json()
+    client.post(f"/charges/{charge['id']}/simulate-paid")
+    return order
+
+
+def test_events_are_paged_in_commit_order(client):
+    order = _paid_order(client)
+    client.post(f"/orders/{order['id']}/release")
+
+    page = client.get("/events", params={"limit": 2}).json()
+    assert [event["seq"] for event in page["events"]] == [1, 2]
+    assert page["next_cursor"] == 2
+
+    rest = client.get("/events", params={"after": page["next_cursor"]}).json()
+    names = [event["event"] for event in page["events"] + rest["events"]]
+    assert names[0] == "charge.created"
+    assert names[-1] == "order.released"
+    assert rest["events"][-1]["data"]["order_id"] == order["id"]
+
+    empty = client.get("/events", params={"after": rest["next_cursor"]}).json()
+    assert empty == {"events": [], "next_cursor": rest["next_cursor"]}
+
+
+def test_long_poll_returns_when_an_event_is_committed(client, monkeypatch):
+    monkeypatch.setattr(settings, "webhook_push_enabled", False)
+
+    def emit_later():
+        time.sleep(0.2)
+        db = SessionLocal()
+        try:
+            with db.begin():
+                webhooks_service.emit_event(db, "webhook.test", {"n": 1})
+        finally:
+            db.close()
+
+    threading.Thread(target=emit_later).start()
+    start = time.perf_counter()
+    page = client.get("/events", params={"wait": 10}).json()
+    assert time.perf_counter() - start < 5
+    assert [event["event"] for event in page["events"]] == ["webhook.test"]
+
+
+def test_pull_only_mode_skips_push_delivery(client, monkeypatch):
+    monkeypatch.setattr(settings, "webhook_push_enabled", False)
+    send_webhook = webhooks_service.send_webhook
+    client.post("/webhooks/test", json={"event": "webhook.test", "data": {}})
+    assert not send_webhook.called
+    assert client.get("/events").json()["events"][0]["event"] == "webhook.test"
+
+
+class _Request:
+    async def is_disconnected(self):
+        return False
+
+
+def test_stream_sends_server_sent_events(client):
+    client.post("/webhooks/test", json={"event": "webhook.test", "data": {"n": 1}})
+
+    async def first_chunk():
+        stream = events._stream(_Request(), after=0)
+        try:
+            return await stream.__anext__()
+        finally:
+            await stream.aclose()
+
+    lines = asyncio.run(first_chunk()).decode("utf-8").split("\n")
+    assert lines[0] == "id: 1"
+    assert lines[1] == "event: webhook.test"
+    assert json.loads(lines[2].removeprefix("data: "))["data"] == {"n": 1}
+    assert lines[3] == ""
+
+
+def test_events_are_written_last_and_dropped_with_their_savepoint(client, monkeypatch):
+    monkeypatch.setattr(settings, "webhook_push_enabled", False)
+    order_id = client.post("/orders", json={"amount_cents": 2500}).json()["id"]
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()[:3]))
+
+    db = SessionLocal()
+    sa_event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        with db.begin():
+            webhooks_service.emit_event(db, "kept", {})
+            try:
+                with db.begin_nested():
+                    webhooks_service.emit_event(db, "rolled.back", {})
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            db.execute(update(Order).where(Order.id == UUID(order_id)).values(currency="USD"))
+    finally:
+        sa_event.remove(db.get_bind(), "before_cursor_execute", record)
+        db.close()
+
+    writes = [statement for statement in statements if statement.startswith(("INSERT", "UPDATE", "DELETE"))]
+    assert writes == ["UPDATE orders SET", "INSERT INTO events"]
+    assert [event["event"] for event in client.get("/events").json()["events"]] == ["kept"]
+
+
+def test_seq_is_not_reused_after_pruning(client, monkeypatch):
+    _paid_order(client)
+    cursor = client.get("/events").json()["next_cursor"]
+    monkeypatch.setattr(settings, "events_retention_days", 0)
+    assert jobs.prune_events() == cursor
+
+    _paid_order(client)
+    fresh = client.get("/events", params={"after": cursor}).json()["events"]
+    assert [event["event"] for event in fresh][0] == "charge.created"
+    assert fresh[0]["seq"] == cursor + 1
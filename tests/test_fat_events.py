@@ -0,0 +1,109 @@
+import pytest
+
+from app.repos import webhook_repo
+from app.services import webhooks_service
+from app.settings import settings
+
+
+@pytest.fixture()
+def subscriptions(client, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "webhook_url", None)
+    monkeypatch.setattr(settings, "ventrasim_base_url", None)
+    with db_session.begin():
+        thin = webhook_repo.create(db_session, url="http://thin.test/hook", secret="s1")
+        fat = webhook_repo.create(db_session, url="http://fat.test/hook", secret="s2")
+    response = client.patch(f"/webhooks/subscriptions/{fat.id}", json={"payload_mode": "fat"})
+    assert response.status_code == 200
+    assert response.json()["payload_mode"] == "fat"
+    return thin, fat
+
+
+def _delivered(url):
+    return {
+        call.args[2]["event"]: call.args[2]
+        for call in webhooks_service.send_webhook.call_args_list
+        if call.args[0] == url
+    }
+
+
+def test_fat_subscriptions_get_resource_snapshots(client, subscriptions):
+    order = client.post("/orders", json={"amount_cents": 4200}).json()
+    charge = client.post(f"/orders/{order['id']}/charges/pix").json()
+    client.post(f"/charges/{charge['id']}/simulate-paid")
+    client.post(f"/orders/{order['id']}/release")
+
+    thin = _delivered("http://thin.test/hook")
+    fat = _delivered("http://fat.test/hook")
+
+    assert thin["charge.paid"]["data"] == {"order_id": order["id"], "charge_id": charge["id"]}
+    paid = fat["charge.paid"]
+    assert paid["id"] == thin["charge.paid"]["id"]
+    assert paid["data"]["order"]["status"] == "PAID_IN_ESCROW"
+    assert paid["data"]["charge"]["status"] == "PAID"
+    assert [leg["account"] for leg in paid["data"]["ledger_entries"]] == ["CUSTOMER", "ESCROW"]
+
+    released = fat["order.released"]["data"]
+    assert released["order"]["status"] == "RELEASED"
+    assert [(leg["direction"], leg["account"]) for leg in released["ledger_entries"]] == [
+        ("DEBIT", "ESCROW"),
+        ("CREDIT", "MERCHANT"),
+    ]
+    assert fat["charge.created"]["data"]["charge"]["txid"] == charge["txid"]
+
+    feed = client.get("/events").json()["events"]
+    assert feed[-1]["data"]["order"]["status"] == "RELEASED"
+
+
+def test_bulk_settlement_snapshots_each_order(client, subscriptions):
+    order_ids = []
+    for amount in (1000, 2000):
+        order = client.post("/orders", json={"amount_cents": amount}).json()
+        charge = client.post(f"/orders/{order['id']}/charges/pix").json()
+        client.post(f"/charges/{charge['id']}/simulate-paid")
+        order_ids.append(order["id"])
+
+    assert client.post("/orders/refund", json={"order_ids": order_ids}).status_code == 200
+
+    refunded = [
+        call.args[2]
+        for call in webhooks_service.send_webhook.call_args_list
+        if call.args[0] == "http://fat.test/hook" and call.args[2]["event"] == "order.refunded"
+    ]
+    assert [payload["data"]["order"]["id"] for payload in refunded] == order_ids
+    for payload in refunded:
+        assert payload["data"]["order"]["status"] == "REFUNDED"
+        assert {leg["amount_cents"] for leg in payload["data"]["ledger_entries"]} == {
+            payload["data"]["order"]["amount_cents"]
+        }
+
+
+def test_unknown_subscription_is_404(client):
+    response = client.patch("/webhooks/subscriptions/00000000-0000-0000-0000-000000000000", json={"is_enabled": False})
+    assert response.status_code == 404
+
+
+def test_default_subscription_patches_apply_to_webhook_url(client, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "webhook_url", "http://default.test/hook")
+    monkeypatch.setattr(settings, "webhook_secret", "default-secret")
+    monkeypatch.setattr(settings, "webhook_payload_mode", "thin")
+    monkeypatch.setattr(webhooks_service, "current_webhook_endpoint", lambda env: None)
+    with db_session.begin():
+        webhooks_service.ensure_default_subscription(db_session)
+    default = next(
+        sub for sub in client.get("/webhooks/subscriptions").json() if sub["url"] == "http://default.test/hook"
+    )
+
+    assert client.patch(f"/webhooks/subscriptions/{default['id']}", json={"payload_mode": "fat"}).status_code == 200
+    order = client.post("/orders", json={"amount_cents": 4200}).json()
+    client.post(f"/orders/{order['id']}/charges/pix")
+    created = _delivered("http://default.test/hook")["charge.created"]
+    assert created["data"]["charge"]["status"] == "PENDING"
+
+    assert client.patch(f"/webhooks/subscriptions/{default['id']}", json={"is_enabled": False}).status_code == 200
+    with db_session.begin():
+        # A restart re-syncs the secret but keeps the pause.
+        webhooks_service.ensure_default_subscription(db_session)
+    webhooks_service.send_webhook.reset_mock()
+    order = client.post("/orders", json={"amount_cents": 1000}).json()
+    client.post(f"/orders/{order['id']}/charges/pix")
+    assert _delivered("http://default.test/hook") == {}
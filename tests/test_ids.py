@@ -0,0 +1,24 @@
+import time
+
+from app.domain.ids import uuid7, uuid7_timestamp_ms
+
+
+def test_uuid7_layout_and_ordering():
+    before_ms = time.time_ns() // 1_000_000
+    ids = [uuid7() for _ in range(5000)]
+    after_ms = time.time_ns() // 1_000_000
+
+    assert all(value.version == 7 for value in ids)
+    assert all(value.variant == "specified in RFC 4122" for value in ids)
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert before_ms <= uuid7_timestamp_ms(ids[0]) <= uuid7_timestamp_ms(ids[-1]) <= after_ms + 1
+
+
+def test_new_rows_get_time_ordered_ids(client):
+    order_id = client.post("/orders", json={"amount_cents": 1000, "currency": "BRL"}).json()["id"]
+    charge_id = client.post(f"/orders/{order_id}/charges/pix").json()["id"]
+
+    assert order_id[14] == "7"
+    assert charge_id[14] == "7"
+    assert order_id < charge_id
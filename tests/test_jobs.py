@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from app import jobs
+from app.models.charge import Charge
+from app.models.idempotency import IdempotencyKey
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeLock:
+    kind = "fake"
+
+    def __init__(self, leader=True):
+        self.leader = leader
+        self.attempts = []
+
+    def acquire(self, name):
+        self.attempts.append(name)
+        return self.leader
+
+    def release_all(self):
+        pass
+
+
+def test_file_lock_elects_one_holder_per_job(tmp_path):
+    first = jobs.FileLeaderLock(str(tmp_path))
+    second = jobs.FileLeaderLock(str(tmp_path))
+
+    assert first.acquire("sweep")
+    assert first.acquire("sweep")
+    assert not second.acquire("sweep")
+    assert second.acquire("other")
+
+    first.release_all()
+    assert second.acquire("sweep")
+    second.release_all()
+
+
+def test_runner_runs_due_jobs_with_jitter_and_records_failures():
+    clock = FakeClock()
+    calls = []
+
+    def ok():
+        calls.append("ok")
+        return 3
+
+    def broken():
+        raise RuntimeError("boom")
+
+    runner = jobs.JobRunner(
+        [jobs.Job("ok", ok, 10.0), jobs.Job("broken", broken, 10.0)],
+        FakeLock(),
+        jitter=0.2,
+        clock=clock,
+        rng=lambda: 1.0,
+    )
+    # First runs are spread over interval * jitter.
+    assert runner.run_pending() == 2.0
+    assert calls == []
+
+    clock.now += 2.0
+    assert runner.run_pending() == 12.0
+    ok_status, broken_status = runner.status()
+    assert ok_status["runs"] == 1 and ok_status["last_result"] == 3 and ok_status["leader"]
+    assert broken_status["failures"] == 1
+    assert broken_status["last_error"] == "RuntimeError: boom"
+    assert ok_status["last_duration_ms"] is not None
+
+
+def test_runner_skips_jobs_led_elsewhere():
+    clock = FakeClock()
+    calls = []
+    lock = FakeLock(leader=False)
+    runner = jobs.JobRunner([jobs.Job("ok", lambda: calls.append(1), 5.0)], lock, jitter=0, clock=clock)
+
+    runner.run_pending()
+    clock.now += 5.0
+    runner.run_pending()
+
+    assert calls == []
+    assert lock.attempts == ["ok", "ok"]
+    assert runner.status()[0]["leader"] is False
+
+
+def test_expire_charges_job(client, db_session):
+    order = client.post("/orders", json={"amount_cents": 1000}).json()
+    overdue = client.post(f"/orders/{order['id']}/charges/pix").json()
+    charge = db_session.get(Charge, UUID(overdue["id"]))
+    charge.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    db_session.commit()
+
+    assert jobs.expire_charges() == 1
+    db_session.expire_all()
+    assert db_session.get(Charge, UUID(overdue["id"])).status == "EXPIRED"
+    assert jobs.expire_charges() == 0
+
+
+def test_purge_idempotency_keys_job(client, db_session):
+    client.post("/orders", json={"amount_cents": 1000}, headers={"Idempotency-Key": "old"})
+    client.post("/orders", json={"amount_cents": 1000}, headers={"Idempotency-Key": "new"})
+    old = db_session.query(IdempotencyKey).filter_by(key="old").one()
+    old.created_at = datetime.now(timezone.utc) - timedelta(days=2)
+    db_session.commit()
+
+    assert jobs.purge_idempotency_keys() == 1
+    assert [row.key for row in db_session.query(IdempotencyKey).all()] == ["new"]
+
+
+def test_jobs_endpoint_reports_disabled_runner(client):
+    assert client.get("/system/jobs").json() == {"enabled": False, "leader_lock": None, "jobs": []}
@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from app import metrics
+from app.services import orders_service
+
+
+def _sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not found")
+
+
+def test_shards_from_all_threads_are_summed():
+    metrics.reset()
+
+    def work():
+        for _ in range(1000):
+            metrics.increment("orders_created")
+            metrics.observe_request("GET", "/orders", 200, 0.003)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    requests, latency, events = metrics.snapshot()
+    assert events["orders_created"] == 4000
+    assert requests[("GET", "/orders", 200)] == 4000
+    assert latency[("GET", "/orders")][0] == 4000
+
+    # Shards of finished threads are folded in and still counted.
+    assert metrics.snapshot()[2]["orders_created"] == 4000
+
+
+def test_metrics_endpoint_reports_routes_and_business_counters(client):
+    metrics.reset()
+    order_id = client.post("/orders", json={"amount_cents": 1500, "currency": "BRL"}).json()["id"]
+    charge_id = client.post(f"/orders/{order_id}/charges/pix").json()["id"]
+    client.post(f"/charges/{charge_id}/simulate-paid")
+    client.post(f"/orders/{order_id}/release")
+    client.get(f"/orders/{order_id}")
+    client.get("/orders/not-a-uuid")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+
+    assert _sample(text, "ventra_orders_created_total") == 1
+    assert _sample(text, "ventra_charges_paid_total") == 1
+    assert _sample(text, "ventra_orders_released_total") == 1
+    assert _sample(text, 'ventra_http_requests_total{method="GET",route="/orders/{order_id}",status="200"}') == 1
+    assert _sample(text, 'ventra_http_requests_total{method="GET",route="/orders/{order_id}",status="422"}') == 1
+    assert (
+        _sample(text, 'ventra_http_request_duration_seconds_count{method="POST",route="/orders/{order_id}/release"}')
+        == 1
+    )
+    assert "# TYPE ventra_db_pool_checked_out gauge" in text
+    assert _sample(text, "ventra_webhook_queue_depth") >= 0
+
+
+def test_business_counters_wait_for_commit(db_session):
+    metrics.reset()
+    with pytest.raises(RuntimeError):
+        with db_session.begin():
+            orders_service.create_order(db_session, amount_cents=1000, currency="BRL")
+            assert metrics.snapshot()[2]["orders_created"] == 0
+            raise RuntimeError
+
+    with db_session.begin():
+        orders_service.create_order(db_session, amount_cents=1000, currency="BRL")
+        try:
+            with db_session.begin_nested():
+                orders_service.create_order(db_session, amount_cents=2000, currency="BRL")
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        with db_session.begin_nested():
+            orders_service.create_order(db_session, amount_cents=3000, currency="BRL")
+
+    assert metrics.snapshot()[2]["orders_created"] == 2
+
+
+def test_metrics_need_an_api_key(client):
+    assert client.get("/metrics", headers={"X-API-KEY": ""}).status_code == 401
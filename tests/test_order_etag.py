@@ -0,0 +1,18 @@
+def test_get_order_supports_conditional_requests(client):
+    order_id = client.post("/orders", json={"amount_cents": 1000, "currency": "BRL"}).json()["id"]
+
+    first = client.get(f"/orders/{order_id}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    cached = client.get(f"/orders/{order_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+    client.post(f"/orders/{order_id}/charges/pix")
+
+    changed = client.get(f"/orders/{order_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["charge"]["status"] == "PENDING"
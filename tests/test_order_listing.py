@@ -0,0 +1,50 @@
+def _create_order(client, amount_cents):
+    return client.post("/orders", json={"amount_cents": amount_cents, "currency": "BRL"}).json()["id"]
+
+
+def test_list_orders_pages_with_cursor(client):
+    created = {_create_order(client, 100 * (i + 1)) for i in range(5)}
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        res = client.get("/orders", params=params)
+        assert res.status_code == 200
+        page = res.json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 5
+    assert set(seen) == created
+
+
+def test_list_orders_filters_and_includes_latest_charge(client):
+    small = _create_order(client, 500)
+    large = _create_order(client, 5000)
+    charge_id = client.post(f"/orders/{large}/charges/pix").json()["id"]
+    client.post(f"/charges/{charge_id}/simulate-paid")
+
+    res = client.get("/orders", params={"status": "PAID_IN_ESCROW"})
+    items = res.json()["items"]
+    assert [item["id"] for item in items] == [large]
+    assert items[0]["charge"]["id"] == charge_id
+    assert items[0]["charge"]["status"] == "PAID"
+
+    res = client.get("/orders", params={"max_amount_cents": 1000})
+    items = res.json()["items"]
+    assert [item["id"] for item in items] == [small]
+    assert items[0]["charge"] is None
+
+
+def test_list_orders_rejects_unknown_cursor(client):
+    _create_order(client, 100)
+
+    res = client.get("/orders", params={"cursor": "00000000-0000-7000-8000-000000000000"})
+
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,53 @@
+import pytest
+
+from app.services import pix_brcode
+
+# Static BR Code example from the BCB "Manual de Padrões para Iniciação do Pix".
+BCB_EXAMPLE = (
+    "00020126580014br.gov.bcb.pix0136123e4567-e12b-12d1-a456-426655440000"
+    "5204000053039865802BR5913Fulano de Tal6008BRASILIA62070503***63041D3D"
+)
+
+
+def test_crc16_matches_reference_vectors():
+    assert pix_brcode.crc16_ccitt(b"123456789") == 0x29B1
+    assert f"{pix_brcode.crc16_ccitt(BCB_EXAMPLE[:-4].encode('ascii')):04X}" == BCB_EXAMPLE[-4:]
+
+
+def test_build_payload_encodes_dynamic_fields():
+    payload = pix_brcode.build_payload(
+        amount_cents=12345,
+        txid="abc123",
+        pix_key="123e4567-e12b-12d1-a456-426655440000",
+        merchant_name="Loja São João",
+        merchant_city="São Paulo",
+    )
+
+    assert payload.startswith("000201010212265800")
+    assert "5406123.45" in payload
+    assert "5913Loja Sao Joao" in payload
+    assert "6009Sao Paulo" in payload
+    assert "62100506abc123" in payload
+    assert payload[-8:-4] == "6304"
+    assert f"{pix_brcode.crc16_ccitt(payload[:-4].encode('ascii')):04X}" == payload[-4:]
+
+
+def test_build_payload_rejects_invalid_txid():
+    with pytest.raises(ValueError):
+        pix_brcode.build_payload(
+            amount_cents=100,
+            txid="not-alnum",
+            pix_key="key",
+            merchant_name="Ventra",
+            merchant_city="Sao Paulo",
+        )
+
+
+def test_created_charge_carries_br_code(client):
+    order_id = client.post("/orders", json={"amount_cents": 1990, "currency": "BRL"}).json()["id"]
+    charge = client.post(f"/orders/{order_id}/charges/pix").json()
+
+    assert len(charge["txid"]) == pix_brcode.MAX_TXID_LENGTH
+    assert charge["pix_emv"].startswith("000201")
+    assert "540519.90" in charge["pix_emv"]
+    assert charge["txid"] in charge["pix_emv"]
@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.pix_notification import PixNotification
+from app.repos import pix_notification_repo
+from app.services import pix_inbox_service
+
+
+def _create_charge(client, amount_cents=1000):
+    order_id = client.post("/orders", json={"amount_cents": amount_cents, "currency": "BRL"}).json()["id"]
+    return order_id, client.post(f"/orders/{order_id}/charges/pix").json()
+
+
+def test_ingest_dedupes_and_worker_applies_payment(client, db_session):
+    order_id, charge = _create_charge(client, 1050)
+    notification = {"endToEndId": "E0000000020261019", "txid": charge["txid"], "valor": "10.50"}
+
+    first = client.post("/pix/notifications", json={"pix": [notification, notification]})
+    assert first.status_code == 202
+    assert first.json() == {"accepted": 1, "duplicates": 1}
+
+    again = client.post("/pix/notifications", json=notification)
+    assert again.json() == {"accepted": 0, "duplicates": 1}
+
+    # A second end-to-end id for the same txid is accepted but not re-applied.
+    retry = dict(notification, endToEndId="E0000000020261019-2")
+    assert client.post("/pix/notifications", json=retry).json()["accepted"] == 1
+
+    assert pix_inbox_service.run_once() == 2
+
+    assert client.get(f"/orders/{order_id}").json()["status"] == "PAID_IN_ESCROW"
+    statuses = sorted(row.status for row in db_session.execute(select(PixNotification)).scalars())
+    assert statuses == ["DUPLICATE", "PROCESSED"]
+    assert pix_inbox_service.run_once() == 0
+
+
+def test_worker_rejects_amount_mismatch(client, db_session):
+    order_id, charge = _create_charge(client, 1000)
+    client.post("/pix/notifications", json={"endToEndId": "E1", "txid": charge["txid"], "valor": "9.99"})
+
+    pix_inbox_service.run_once()
+
+    row = db_session.execute(select(PixNotification)).scalar_one()
+    assert row.status == "FAILED"
+    assert row.last_error == "Paid amount does not match order"
+    assert client.get(f"/orders/{order_id}").json()["status"] == "AWAITING_PAYMENT"
+
+
+def test_unexpected_error_retries_then_fails_without_blocking_the_queue(client, db_session, monkeypatch):
+    _, poison = _create_charge(client, 1000)
+    order_id, charge = _create_charge(client, 2000)
+    client.post("/pix/notifications", json={"endToEndId": "E-poison", "txid": poison["txid"], "valor": "10.00"})
+    client.post("/pix/notifications", json={"endToEndId": "E-ok", "txid": charge["txid"], "valor": "20.00"})
+    monkeypatch.setattr(pix_inbox_service.settings, "pix_inbox_max_attempts", 2)
+    confirm = pix_inbox_service.charges_service.confirm_payment_by_txid
+
+    def flaky_confirm(db, txid, **kwargs):
+        if txid == poison["txid"]:
+            raise RuntimeError("boom")
+        return confirm(db, txid, **kwargs)
+
+    monkeypatch.setattr(pix_inbox_service.charges_service, "confirm_payment_by_txid", flaky_confirm)
+
+    assert pix_inbox_service.run_once() == 2
+    assert client.get(f"/orders/{order_id}").json()["status"] == "PAID_IN_ESCROW"
+    row = pix_notification_repo.get_by_end_to_end_id(db_session, "E-poison")
+    assert (row.status, row.attempts, row.last_error) == ("PENDING", 1, "RuntimeError: boom")
+
+    assert pix_inbox_service.run_once() == 1
+    db_session.expire_all()
+    row = pix_notification_repo.get_by_end_to_end_id(db_session, "E-poison")
+    assert (row.status, row.attempts) == ("FAILED", 2)
+    assert pix_inbox_service.run_once() == 0
+
+
+def test_attempt_is_recorded_when_the_batch_rolls_back(client, db_session, monkeypatch):
+    _, charge = _create_charge(client)
+    client.post("/pix/notifications", json={"endToEndId": "E1", "txid": charge["txid"], "valor": "10.00"})
+
+    def failing_apply(db, notification, background_tasks=None):
+        notification.attempts += 1
+        raise RuntimeError("commit lost")
+
+    monkeypatch.setattr(pix_inbox_service, "_apply", failing_apply)
+
+    with pytest.raises(RuntimeError):
+        pix_inbox_service.run_once()
+
+    row = pix_notification_repo.get_by_end_to_end_id(db_session, "E1")
+    assert (row.status, row.attempts, row.last_error) == ("PENDING", 1, "RuntimeError: commit lost")
@@ -0,0 +1,49 @@
+import time
+
+from app import db_replica
+from app.api import deps
+from app.settings import settings
+
+
+def _wait_for_check():
+    deadline = time.monotonic() + 2
+    while db_replica._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _reset_replica_state(monkeypatch):
+    monkeypatch.setattr(db_replica, "_checked_at", None)
+    monkeypatch.setattr(db_replica, "_healthy", False)
+
+
+def test_reads_use_primary_without_replica(client):
+    assert settings.read_replica_url is None
+    assert db_replica.replica_available() is False
+    assert client.get("/system/replica").json()["configured"] is False
+
+
+def test_replica_used_when_lag_within_limit(monkeypatch):
+    _reset_replica_state(monkeypatch)
+    monkeypatch.setattr(settings, "read_replica_url", "sqlite+pysqlite:///:memory:")
+    monkeypatch.setattr(db_replica, "_measure_lag", lambda: 0.5)
+    used = []
+    monkeypatch.setattr(deps, "get_replica_db", lambda: iter([used.append("replica") or "replica-session"]))
+
+    db_replica.replica_available()
+    _wait_for_check()
+
+    assert db_replica.replica_available() is True
+    assert next(deps.read_db_session()) == "replica-session"
+    assert used == ["replica"]
+
+
+def test_replica_skipped_when_lagging(monkeypatch):
+    _reset_replica_state(monkeypatch)
+    monkeypatch.setattr(settings, "read_replica_url", "sqlite+pysqlite:///:memory:")
+    monkeypatch.setattr(db_replica, "_measure_lag", lambda: settings.read_replica_max_lag_seconds + 10)
+
+    db_replica.replica_available()
+    _wait_for_check()
+
+    assert db_replica.replica_available() is False
+    assert db_replica.status()["lag_seconds"] > settings.read_replica_max_lag_seconds
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.api.schemas import ChargeResponse, LedgerEntryResponse, OrderResponse
+from app.serialization import charge_to_dict, dumps, isoformat, ledger_entry_to_dict, order_to_dict
+
+
+def test_isoformat_matches_pydantic():
+    for value in (
+        datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        datetime(2026, 1, 2, 3, 4, 5, 120000, tzinfo=timezone.utc),
+        datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-3))),
+        datetime(2026, 1, 2, 3, 4, 5),
+    ):
+        order = SimpleNamespace(
+            id=uuid4(), status="CREATED", amount_cents=100, currency="BRL", created_at=value, updated_at=value
+        )
+        dumped = OrderResponse.model_validate(order, from_attributes=True).model_dump(mode="json")
+        assert isoformat(value) == dumped["created_at"]
+
+
+def test_serializers_match_response_models():
+    now = datetime.now(timezone.utc)
+    order = SimpleNamespace(
+        id=uuid4(), status="PAID_IN_ESCROW", amount_cents=1500, currency="BRL", created_at=now, updated_at=now
+    )
+    charge = SimpleNamespace(
+        id=uuid4(), order_id=order.id, status="PAID", expires_at=now, pix_emv="000201", txid="abc123"
+    )
+    entry = SimpleNamespace(
+        id=uuid4(),
+        order_id=order.id,
+        type="PAYMENT_CONFIRMED",
+        amount_cents=1500,
+        direction="CREDIT",
+        account="ESCROW",
+        created_at=now,
+        meta={"charge_id": str(charge.id)},
+    )
+
+    assert order_to_dict(order) == OrderResponse.model_validate(order, from_attributes=True).model_dump(mode="json")
+    assert charge_to_dict(charge) == ChargeResponse.model_validate(charge, from_attributes=True).model_dump(
+        mode="json"
+    )
+    assert ledger_entry_to_dict(entry) == LedgerEntryResponse.model_validate(
+        entry, from_attributes=True
+    ).model_dump(mode="json")
+
+
+def test_dumps_returns_compact_bytes():
+    assert dumps({"a": 1, "b": [None, "ç"]}) == '{"a":1,"b":[null,"ç"]}'.encode("utf-8")
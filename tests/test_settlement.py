@@ -0,0 +1,49 @@
+from sqlalchemy import select
+
+from app.models.ledger import LedgerEntry
+
+
+def _paid_order(client, amount_cents=1000):
+    order_id = client.post("/orders", json={"amount_cents": amount_cents, "currency": "BRL"}).json()["id"]
+    charge_id = client.post(f"/orders/{order_id}/charges/pix").json()["id"]
+    assert client.post(f"/charges/{charge_id}/simulate-paid").status_code == 200
+    return order_id
+
+
+def test_bulk_release_reports_per_order_results(client, db_session):
+    paid = [_paid_order(client, 1000), _paid_order(client, 2500)]
+    unpaid = client.post("/orders", json={"amount_cents": 700, "currency": "BRL"}).json()["id"]
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    res = client.post("/orders/release", json={"order_ids": [*paid, unpaid, missing]})
+    assert res.status_code == 200
+    body = res.json()
+    assert body["settled"] == 2
+    assert body["failed"] == 2
+    by_id = {result["order_id"]: result for result in body["results"]}
+    assert all(by_id[order_id]["status"] == "RELEASED" for order_id in paid)
+    assert by_id[unpaid]["error"] == "Order not paid in escrow"
+    assert by_id[missing]["error"] == "Order not found"
+
+    for order_id in paid:
+        assert client.get(f"/orders/{order_id}").json()["status"] == "RELEASED"
+
+    entries = db_session.execute(select(LedgerEntry)).scalars().all()
+    assert len(entries) == 8
+
+    balance = client.get("/balance").json()
+    assert balance["available_balance_cents"] == 3500
+    assert balance["escrow_balance_cents"] == 0
+
+
+def test_bulk_refund_returns_funds_to_customer(client):
+    order_id = _paid_order(client, 1200)
+
+    res = client.post("/orders/refund", json={"order_ids": [order_id, order_id]})
+    assert res.status_code == 200
+    assert res.json()["settled"] == 1
+
+    assert client.get(f"/orders/{order_id}").json()["status"] == "REFUNDED"
+    balance = client.get("/balance").json()
+    assert balance["escrow_balance_cents"] == 0
+    assert balance["available_balance_cents"] == 0
@@ -0,0 +1,78 @@
+import logging
+
+from sqlalchemy import text
+
+from app import db_profiler
+from app.db import SessionLocal
+from app.settings import settings
+
+
+def test_debug_header_reports_query_counts(client):
+    order_id = client.post("/orders", json={"amount_cents": 1500, "currency": "BRL"}).json()["id"]
+    charge_id = client.post(f"/orders/{order_id}/charges/pix").json()["id"]
+
+    plain = client.post(f"/orders/{order_id}/charges/pix")
+    assert "X-SQL-Queries" not in plain.headers
+
+    response = client.post(f"/charges/{charge_id}/simulate-paid", headers={"X-Debug-SQL": "1"})
+    assert response.status_code == 200
+    assert int(response.headers["X-SQL-Queries"]) > 0
+    assert float(response.headers["X-SQL-Time-ms"]) >= float(response.headers["X-SQL-Lock-ms"]) > 0
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+
+def test_debug_header_needs_a_valid_api_key(client):
+    order_id = client.post("/orders", json={"amount_cents": 1500, "currency": "BRL"}).json()["id"]
+
+    response = client.get(f"/orders/{order_id}", headers={"X-Debug-SQL": "1", "X-API-KEY": "wrong"})
+
+    assert response.status_code == 401
+    assert "X-SQL-Queries" not in response.headers
+
+
+def test_repeated_statements_are_flagged_as_n_plus_one():
+    profile = db_profiler.QueryProfile()
+    token = db_profiler._current.set(profile)
+    try:
+        db = SessionLocal()
+        try:
+            for value in range(4):
+                db.execute(text("SELECT :value"), {"value": value})
+            db.execute(text("SELECT 42"))
+        finally:
+            db.close()
+    finally:
+        db_profiler._current.reset(token)
+
+    assert profile.queries == 5
+    assert profile.repeated(3) == [("SELECT ?", 4)]
+    assert sorted(sql for _, sql in profile.slowest()) == ["SELECT 42", "SELECT ?"]
+
+
+def test_slow_queries_are_logged_with_parameter_fingerprint(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "sql_slow_query_ms", 0.000001)
+    db = SessionLocal()
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.sql.slow"):
+            db.execute(text("SELECT :secret"), {"secret": "4111-1111"})
+    finally:
+        db.close()
+
+    records = [record.getMessage() for record in caplog.records if record.name == "app.sql.slow"]
+    assert records and "fingerprint=" in records[0]
+    assert "4111-1111" not in records[0]
+
+
+def test_fingerprint_ignores_values_but_not_types():
+    sql = "SELECT * FROM orders WHERE id = :id"
+    assert db_profiler.fingerprint(sql, {"id": 1}) == db_profiler.fingerprint(sql, {"id": 2})
+    assert db_profiler.fingerprint(sql, {"id": 1}) != db_profiler.fingerprint(sql, {"id": "1"})
+
+
+def test_locking_statements_are_classified():
+    profile = db_profiler.QueryProfile()
+    profile.record("BEGIN IMMEDIATE", 0.002)
+    profile.record("UPDATE charges SET status=? WHERE id = ? RETURNING id", 0.003)
+    profile.record("SELECT id FROM orders WHERE id IN (?) ORDER BY id FOR UPDATE", 0.004)
+    profile.record("SELECT id FROM orders", 0.010)
+    assert round(profile.lock_seconds, 6) == 0.009
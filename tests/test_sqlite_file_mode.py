@@ -0,0 +1,118 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app import db_sqlite
+from app.db import Base, async_database_url, build_async_engine, build_engine
+from app.models.order import Order
+from app.settings import settings
+
+
+def test_memory_url_keeps_static_pool():
+    engine = build_engine("sqlite+pysqlite:///:memory:")
+    assert isinstance(engine.pool, StaticPool)
+
+
+def test_file_database_uses_wal_and_pool(tmp_path):
+    engine = build_engine(f"sqlite+pysqlite:///{tmp_path / 'ventra.db'}")
+    try:
+        assert isinstance(engine.pool, QueuePool)
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+    finally:
+        engine.dispose()
+
+
+def test_file_database_serializes_concurrent_writers(tmp_path):
+    engine = build_engine(f"sqlite+pysqlite:///{tmp_path / 'ventra.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    errors = []
+
+    def writer():
+        try:
+            for _ in range(20):
+                with factory() as db, db.begin():
+                    db.execute(text("SELECT 1"))
+                    db.add(Order(amount_cents=100, currency="BRL", status="CREATED"))
+        except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    try:
+        assert errors == []
+        with factory() as db:
+            assert db.execute(select(func.count()).select_from(Order)).scalar_one() == 80
+    finally:
+        engine.dispose()
+
+
+def test_async_busy_retry_does_not_block_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "sqlite_busy_timeout_ms", 20)
+    monkeypatch.setattr(settings, "sqlite_busy_retries", 2)
+    blocking_sleeps = []
+    monkeypatch.setattr(db_sqlite.time, "sleep", blocking_sleeps.append)
+    url = f"sqlite+pysqlite:///{tmp_path / 'ventra.db'}"
+    engine = build_engine(url)
+    async_engine = build_async_engine(async_database_url(url))
+
+    async def begin_while_locked():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            with pytest.raises(OperationalError):
+                async with async_engine.begin():
+                    pass
+        finally:
+            task.cancel()
+        return ticks
+
+    try:
+        with engine.begin():
+            ticks = asyncio.run(begin_while_locked())
+    finally:
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
+
+    assert blocking_sleeps == []
+    # The 0.05s + 0.1s backoff let the loop keep running.
+    assert ticks >= 10
+
+
+def test_read_only_sessions_do_not_wait_for_the_write_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "sqlite_busy_timeout_ms", 20)
+    monkeypatch.setattr(settings, "sqlite_busy_retries", 0)
+    engine = build_engine(f"sqlite+pysqlite:///{tmp_path / 'ventra.db'}")
+    Base.metadata.create_all(bind=engine)
+    writes = sessionmaker(bind=engine)
+    reads = sessionmaker(bind=db_sqlite.read_only(engine))
+    try:
+        with writes() as writer, writer.begin():
+            writer.add(Order(amount_cents=100, currency="BRL", status="CREATED"))
+            writer.flush()
+            with reads() as reader, reader.begin():
+                assert reader.execute(select(func.count()).select_from(Order)).scalar_one() == 0
+            with pytest.raises(OperationalError, match="locked"):
+                with writes() as other, other.begin():
+                    other.execute(text("SELECT 1"))
+    finally:
+        engine.dispose()
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.main import ROUTERS, app, include_routers
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_app_imports_without_environment_and_builds_engine_lazily(tmp_path):
+    code = "import app.db, app.main\nassert app.db._engine is None\nassert len(app.main.app.routes) > 10\n"
+    env = {key: value for key, value in os.environ.items() if key not in ("DATABASE_URL", "API_KEY")}
+    env["PYTHONPATH"] = str(ROOT)
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_startup_includes_routes_once(client):
+    routes = list(app.routes)
+    include_routers(app)
+    assert list(app.routes) == routes
+    assert len(routes) >= len(ROUTERS)
+    assert client.get("/orders").status_code == 200
+
+
+def test_routes_are_served_without_lifespan():
+    # Not entered as a context manager, so startup never runs.
+    client = TestClient(app, headers={"X-API-KEY": "test-key"})
+    assert client.get("/orders").status_code == 200
@@ -1,3 +1,7 @@
+from uuid import UUID
+
+from app.repos import order_repo
+
 
 def test_release_requires_paid_in_escrow(client):
     order_res = client.post("/orders", json={"amount_cents": 1000, "currency": "BRL"})
@@ -13,3 +17,33 @@ def test_refund_requires_paid_in_escrow(client):
 
     refund_res = client.post(f"/orders/{order_id}/refund")
     assert refund_res.status_code == 409
+
+
+def test_repeated_transitions_are_rejected(client):
+    order_res = client.post("/orders", json={"amount_cents": 1000, "currency": "BRL"})
+    order_id = order_res.json()["id"]
+    charge_id = client.post(f"/orders/{order_id}/charges/pix").json()["id"]
+
+    assert client.post(f"/charges/{charge_id}/simulate-paid").status_code == 200
+    assert client.post(f"/charges/{charge_id}/simulate-paid").status_code == 409
+    assert client.post(f"/charges/{charge_id}/cancel").status_code == 409
+
+    assert client.post(f"/orders/{order_id}/release").status_code == 200
+    assert client.post(f"/orders/{order_id}/refund").status_code == 409
+
+
+def test_transition_honours_expected_version(client, db_session):
+    order_id = client.post("/orders", json={"amount_cents": 1000, "currency": "BRL"}).json()["id"]
+
+    with db_session.begin():
+        order = order_repo.get(db_session, UUID(order_id))
+        version = order.version
+        stale = order_repo.transition(
+            db_session, order.id, "PAID_IN_ESCROW", ["AWAITING_PAYMENT"], expected_version=version + 1
+        )
+        assert stale is None
+        moved = order_repo.transition(
+            db_session, order.id, "PAID_IN_ESCROW", ["AWAITING_PAYMENT"], expected_version=version
+        )
+        assert moved.status == "PAID_IN_ESCROW"
+        assert moved.version == version + 1
@@ -0,0 +1,71 @@
+import json
+
+from app import tracing
+from app.services import webhooks_service
+from app.settings import settings
+
+
+def test_forced_trace_covers_router_service_and_repo_layers(client, monkeypatch):
+    monkeypatch.setattr(settings, "tracing_sample_rate", 0.0)
+    order_id = client.post("/orders", json={"amount_cents": 1500, "currency": "BRL"}).json()["id"]
+    charge_id = client.post(f"/orders/{order_id}/charges/pix").json()["id"]
+
+    untraced = client.post(f"/orders/{order_id}/release")
+    assert "X-Trace-Id" not in untraced.headers
+
+    response = client.post(f"/charges/{charge_id}/simulate-paid", headers={"X-Debug-Trace": "1"})
+    trace_id = response.headers["X-Trace-Id"]
+
+    spans = client.get("/system/traces", params={"trace_id": trace_id}).json()["traces"][0]["spans"]
+    by_name = {span["name"]: span for span in spans}
+    root = by_name["POST /charges/{charge_id}/simulate-paid"]
+    assert root["parent_id"] is None
+    assert root["attributes"]["status"] == 200
+    assert by_name["charges_service.simulate_paid"]["parent_id"] == root["span_id"]
+    service = by_name["charges_service.simulate_paid"]
+    assert by_name["charges_service._confirm_payment"]["parent_id"] == service["span_id"]
+    assert "charge_repo.transition" in by_name
+    assert "ledger_repo.add_entry" in by_name
+    assert all(span["trace_id"] == trace_id for span in spans)
+
+
+def test_background_delivery_keeps_the_queueing_span(monkeypatch):
+    calls = []
+
+    @tracing.traced("test.send")
+    def fake_send(payload):
+        calls.append(tracing.current_span())
+
+    with tracing.start_trace("test.request", sampled=True) as root:
+        with tracing.span("test.emit") as emit:
+            delivery = webhooks_service._QueuedDelivery(fake_send, 1)
+
+    assert tracing.current_span() is None
+    delivery({"event": "x"})
+
+    sent = calls[0]
+    assert sent.trace_id == root.trace_id
+    assert sent.parent_id == emit.span_id
+
+
+def test_untraced_calls_record_nothing(monkeypatch):
+    monkeypatch.setattr(settings, "tracing_sample_rate", 0.0)
+    tracing.exporter().clear()
+    with tracing.start_trace("test.unsampled") as root:
+        with tracing.span("child") as child:
+            pass
+    assert root is None and child is None
+    assert tracing.exporter().spans() == []
+
+
+def test_jsonl_export(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = tracing.Exporter(capacity=2, path=str(path))
+    for index in range(3):
+        span = tracing.Span(f"t{index}", f"s{index}", None, "root", 0.0)
+        span.duration_ms = 1.0
+        exporter.export(span)
+
+    assert [span["trace_id"] for span in exporter.spans()] == ["t1", "t2"]
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["trace_id"] for line in lines] == ["t0", "t1", "t2"]
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import httpx
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.order import Order
+from app import traffic_capture
+from app.settings import settings
+from app.traffic_capture import Replayer, compare_results, read_log
+
+
+def _capture_flow(client, monkeypatch, path):
+    monkeypatch.setattr(settings, "traffic_capture_path", str(path))
+    order = client.post("/orders", json={"amount_cents": 1500}, headers={"Idempotency-Key": "flow-1"}).json()
+    charge = client.post(f"/orders/{order['id']}/charges/pix").json()
+    client.post(f"/charges/{charge['id']}/simulate-paid")
+    client.post(f"/orders/{order['id']}/release")
+    client.get(f"/orders/{order['id']}")
+    monkeypatch.setattr(settings, "traffic_capture_path", None)
+    traffic_capture.flush()
+    return order
+
+
+def test_capture_records_mutating_requests_without_credentials(client, monkeypatch, tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    order = _capture_flow(client, monkeypatch, path)
+
+    records = read_log(str(path))
+    assert [record["route"] for record in records] == [
+        "/orders",
+        "/orders/{order_id}/charges/pix",
+        "/charges/{charge_id}/simulate-paid",
+        "/orders/{order_id}/release",
+    ]
+    first = records[0]
+    assert first["status"] == 201 and first["ms"] > 0
+    assert first["body"] == '{"amount_cents":1500}'
+    assert first["ids"]["id"] == order["id"]
+    assert first["headers"]["idempotency-key"] == "flow-1"
+    assert "x-api-key" not in first["headers"]
+
+
+def test_replay_chains_new_ids_through_the_flow(client, monkeypatch, tmp_path, db_session):
+    path = tmp_path / "traffic.jsonl"
+    captured = _capture_flow(client, monkeypatch, path)
+
+    async def replay():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://replay") as replay_client:
+            replayer = Replayer(replay_client, api_key="test-key", speed=0, concurrency=4)
+            return await replayer.run(read_log(str(path)))
+
+    results = asyncio.run(replay())
+
+    assert [result["status"] for result in results] == [201, 201, 200, 200]
+    orders = db_session.query(Order).all()
+    assert len(orders) == 2
+    assert {order.status for order in orders} == {"RELEASED"}
+    assert captured["id"] in {str(order.id) for order in orders}
+
+    report = compare_results(results)
+    entry = report["POST /orders/{order_id}/release"]
+    assert entry["status_mismatches"] == 0
+    assert entry["replay_error_rate"] == 0
+    assert entry["replay_p50_ms"] is not None
+
+
+def test_recorded_duration_stops_when_the_response_is_sent(monkeypatch, tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    monkeypatch.setattr(settings, "traffic_capture_path", str(path))
+    toy = FastAPI()
+
+    @toy.post("/slow-delivery")
+    def slow_delivery(background_tasks: BackgroundTasks):
+        background_tasks.add_task(time.sleep, 0.3)
+        return {"ok": True}
+
+    toy.add_middleware(traffic_capture.TrafficCaptureMiddleware)
+    TestClient(toy).post("/slow-delivery")
+    traffic_capture.flush()
+
+    assert read_log(str(path))[0]["ms"] < 200
@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.repos import charge_repo
+from app.services import charges_service
+
+
+def _create_charge(client):
+    order_id = client.post("/orders", json={"amount_cents": 1000, "currency": "BRL"}).json()["id"]
+    return client.post(f"/orders/{order_id}/charges/pix").json()
+
+
+def test_get_charge_by_txid(client):
+    charge = _create_charge(client)
+
+    res = client.get(f"/charges/by-txid/{charge['txid']}")
+    assert res.status_code == 200
+    assert res.json()["id"] == charge["id"]
+
+    assert client.get("/charges/by-txid/unknown").status_code == 404
+
+
+def test_confirm_payment_by_txid(client, db_session):
+    charge = _create_charge(client)
+
+    with db_session.begin():
+        order, paid, expired = charges_service.confirm_payment_by_txid(db_session, charge["txid"])
+
+    assert not expired
+    assert paid.status == "PAID"
+    assert order.status == "PAID_IN_ESCROW"
+
+
+def test_txid_is_unique(client, db_session):
+    charge = _create_charge(client)
+
+    with pytest.raises(IntegrityError):
+        with db_session.begin():
+            existing = charge_repo.get_by_txid(db_session, charge["txid"])
+            charge_repo.create(
+                db_session,
+                order_id=existing.order_id,
+                status="PENDING",
+                expires_at=existing.expires_at,
+                pix_emv="duplicate",
+                txid=charge["txid"],
+            )
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from app.services import webhook_endpoint_cache
+from app.services import webhook_endpoint_resolver as resolver
+from app.services.webhook_endpoint_cache import DatabaseEndpointCache, FileEndpointCache
+from app.settings import settings
+
+
+@pytest.fixture()
+def ventrasim(monkeypatch, tmp_path):
+    """A fake VentraSim whose active endpoint the test can change; counts fetches."""
+    state = {"fetches": 0, "url": "http://sim.local/hook-1", "id": 1}
+
+    def fake_get(url, headers, timeout):
+        state["fetches"] += 1
+        body = {"id": state["id"], "url": state["url"], "secret": "s3cret", "updatedAt": "2026-10-19T00:00:00Z"}
+        return httpx.Response(200, json=body, request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(resolver.httpx, "get", fake_get)
+    monkeypatch.setattr(settings, "ventrasim_base_url", "http://sim.local")
+    monkeypatch.setattr(settings, "ventra_internal_token", "token")
+    monkeypatch.setattr(settings, "webhook_resolver_cache", "file")
+    monkeypatch.setattr(settings, "webhook_resolver_cache_dir", str(tmp_path / "endpoints"))
+    resolver._cache.clear()
+    yield state
+    resolver._cache.clear()
+
+
+def _new_worker():
+    # Another process starts with an empty in-process cache.
+    resolver._cache.clear()
+
+
+def test_workers_share_one_fetch(ventrasim):
+    first = resolver.resolve_webhook_endpoint("sandbox")
+    _new_worker()
+    second = resolver.resolve_webhook_endpoint("sandbox")
+
+    assert ventrasim["fetches"] == 1
+    assert second.url == first.url == "http://sim.local/hook-1"
+
+
+def test_stale_entry_is_served_while_another_worker_refreshes(ventrasim, tmp_path):
+    resolver.resolve_webhook_endpoint("sandbox")
+    cache = FileEndpointCache(str(tmp_path / "endpoints"))
+    stale = cache.get("sandbox")
+    cache.put(
+        resolver.ResolvedWebhookEndpoint(
+            env="sandbox",
+            url=stale.url,
+            secret=stale.secret,
+            endpoint_id=stale.endpoint_id,
+            updated_at=stale.updated_at,
+            fetched_at=stale.fetched_at - timedelta(seconds=resolver.CACHE_TTL_SECONDS + 1),
+        )
+    )
+    assert cache.try_lease("sandbox", 60)
+    ventrasim["url"] = "http://sim.local/hook-2"
+    _new_worker()
+
+    assert resolver.resolve_webhook_endpoint("sandbox").url == "http://sim.local/hook-1"
+    assert ventrasim["fetches"] == 1
+
+    cache.release("sandbox")
+    _new_worker()
+    assert resolver.resolve_webhook_endpoint("sandbox").url == "http://sim.local/hook-2"
+    assert ventrasim["fetches"] == 2
+
+
+def test_file_lease_is_exclusive_until_released_or_expired(tmp_path):
+    first = FileEndpointCache(str(tmp_path))
+    second = FileEndpointCache(str(tmp_path))
+
+    assert first.try_lease("sandbox", 60)
+    assert not second.try_lease("sandbox", 60)
+    first.release("sandbox")
+    assert second.try_lease("sandbox", 60)
+    # A holder that died mid-fetch loses the lease once it is older than the timeout.
+    assert first.try_lease("sandbox", 0)
+
+
+def test_refresh_endpoint_propagates_a_changed_endpoint(client, ventrasim):
+    resolver.resolve_webhook_endpoint("sandbox")
+    ventrasim["url"] = "http://sim.local/hook-2"
+    ventrasim["id"] = 2
+
+    response = client.post("/system/webhook-endpoint/refresh", params={"env": "sandbox"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["endpoint_id"] == 2 and body["url"] == "http://sim.local/hook-2"
+    assert "secret" not in body
+    _new_worker()
+    assert resolver.resolve_webhook_endpoint("sandbox").endpoint_id == 2
+    assert ventrasim["fetches"] == 2
+
+
+def test_database_cache_round_trip():
+    cache = DatabaseEndpointCache()
+    assert cache.get("sandbox") is None
+
+    assert cache.try_lease("sandbox", 60)
+    assert not cache.try_lease("sandbox", 60)
+    endpoint = resolver.ResolvedWebhookEndpoint(
+        env="sandbox",
+        url="http://sim.local/hook-1",
+        secret="s3cret",
+        endpoint_id=1,
+        updated_at=None,
+        fetched_at=datetime.now(timezone.utc),
+    )
+    cache.put(endpoint)
+    cache.release("sandbox")
+
+    assert cache.get("sandbox") == endpoint
+    assert cache.try_lease("sandbox", 60)
+    cache.invalidate("sandbox")
+    assert cache.get("sandbox") is None
+
+
+def test_emitting_events_never_fetches(client, ventrasim):
+    # Nothing resolved in this process yet: the request falls back instead of calling VentraSim.
+    assert client.post("/webhooks/test", json={}).status_code == 200
+    assert ventrasim["fetches"] == 0
+
+    resolver.refresh("sandbox")
+    assert resolver.current_webhook_endpoint("sandbox").url == "http://sim.local/hook-1"
+    assert client.post("/webhooks/test", json={}).status_code == 200
+    assert ventrasim["fetches"] == 1
+
+
+def test_database_cache_is_refused_on_sqlite(monkeypatch):
+    monkeypatch.setattr(settings, "webhook_resolver_cache", "db")
+
+    with pytest.raises(ValueError):
+        webhook_endpoint_cache.shared_cache()
+
+
+def test_file_cache_refuses_a_directory_others_can_read(tmp_path):
+    shared = tmp_path / "endpoints"
+    shared.mkdir(mode=0o755)
+    shared.chmod(0o755)
+
+    with pytest.raises(ValueError, match="0700"):
+        FileEndpointCache(str(shared))